@@ -1,18 +1,38 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
+import json
+import queue
 import tempfile
+import threading
+import time
 import os
 from pathlib import Path
 
-from models.multi_language_parser import parse_file_any_language, parse_folder_multi_language
+from models.multi_language_parser import (
+    ParseReport,
+    parse_file_any_language,
+    parse_folder_multi_language,
+)
 from models.multi_language_renderer import (
+    build_ai_mermaid,
     render_ai_diagram,
     has_renderable_content,
 )
-from models.ai_engine import analyze_with_gemini
+from models.ai_engine import AnalysisCancelled, analyze_with_gemini
 from models.github_parser import parse_github_repo, validate_github_url
+from models.source_guard import SkippedFile
+from models.env_config import env_float, env_int
+
+
+# Worker processes used to parse cloned repos (1 = serial)
+PARSE_JOBS = env_int("HIRO_PARSE_JOBS", 1, minimum=1)
+
+# Seconds between partial Mermaid diagrams on the streaming endpoint
+STREAM_MERMAID_INTERVAL = env_float("HIRO_STREAM_MERMAID_INTERVAL", 0.5, above=0)
 
 app = FastAPI(
     title="HIRO API",
@@ -50,14 +70,20 @@ class DiagramResponse(BaseModel):
     edge_count:   int
     cached:       bool
     success:      bool
+    skipped_files: list = []
+    analysis:     dict = {}
     error:        Optional[str] = None
 
 
 # ── HELPERS ────────────────────────────────────────────────────────────
 
-def facts_to_response(all_facts: dict) -> DiagramResponse:
+def facts_to_response(all_facts: dict, skipped_files: Optional[list] = None,
+                      on_event=None) -> DiagramResponse:
     """
     Shared helper — runs AI engine and builds response.
+    skipped_files lists files left out as too large or generated; analysis
+    is how the result was produced (mode, token plan, cache hit). on_event
+    follows the AI answer as it streams in (see analyze_with_gemini).
     """
     has_any = any(
         has_renderable_content(f)
@@ -72,13 +98,8 @@ def facts_to_response(all_facts: dict) -> DiagramResponse:
                    "Make sure the repo contains .py, .java, .js, .ts, or .jsx files."
         )
 
-    # Check if result will come from cache
-    from models.ai_engine import build_facts_summary, compute_facts_hash, load_from_cache
-    summary    = build_facts_summary(all_facts)
-    facts_hash = compute_facts_hash(summary)
-    is_cached  = load_from_cache(facts_hash) is not None
-
-    ai_result    = analyze_with_gemini(all_facts)
+    ai_result    = analyze_with_gemini(all_facts, on_event=on_event)
+    analysis     = ai_result.get("analysis", {})
     mermaid_code, description = render_ai_diagram(ai_result)
 
     project_name = ai_result.get("project_name", "Software Project")
@@ -99,8 +120,10 @@ def facts_to_response(all_facts: dict) -> DiagramResponse:
         file_count=file_count,
         node_count=node_count,
         edge_count=len(edges),
-        cached=is_cached,
-        success=True
+        cached=analysis.get("cached", False),
+        success=True,
+        skipped_files=skipped_files or [],
+        analysis=analysis,
     )
 
 
@@ -115,6 +138,7 @@ def root():
         "description": "AI-powered architectural diagram generator",
         "endpoints": {
             "POST /analyze/github": "Analyze a GitHub repository by URL",
+            "GET  /analyze/github/stream?url=": "Same, as Server-Sent Events with partial diagrams",
             "POST /analyze/code":   "Analyze a single file of code",
             "GET  /health":         "Health check",
             "GET  /cache/clear":    "Clear the diagram cache",
@@ -167,7 +191,8 @@ def analyze_github(request: AnalyzeGithubRequest):
         )
 
     try:
-        all_facts = parse_github_repo(url)
+        report    = ParseReport()
+        all_facts = parse_github_repo(url, jobs=PARSE_JOBS, compact=True, report=report)
 
         if not all_facts:
             raise HTTPException(
@@ -176,7 +201,7 @@ def analyze_github(request: AnalyzeGithubRequest):
                        "HIRO supports: .py, .java, .js, .jsx, .ts, .tsx"
             )
 
-        return facts_to_response(all_facts)
+        return facts_to_response(all_facts, report.skipped)
 
     except HTTPException:
         raise
@@ -187,6 +212,126 @@ def analyze_github(request: AnalyzeGithubRequest):
         )
 
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/analyze/github/stream")
+def analyze_github_stream(url: str, request: Request):
+    """
+    /analyze/github as Server-Sent Events, for EventSource clients:
+      status   {"stage": "parsing" | "analyzing", ...}
+      node     each diagram node as soon as the model has written it
+      edge     each diagram edge, likewise
+      mermaid  {"mermaid", "nodes", "edges"}: the partial diagram so far,
+               at most every HIRO_STREAM_MERMAID_INTERVAL seconds
+      retry    a failed pass is retried; drop the nodes and edges it sent
+               ({"prefix": ...}: only ids starting with it, else all)
+      result   the DiagramResponse, as /analyze/github returns it
+      error    {"detail": ...}
+    Map-reduce analyses stream every partition's items with ids prefixed
+    "p<n>_"; the result's diagram is the merged one. When the client goes
+    away the analysis stops at its next streamed item, closing the Groq
+    stream, instead of running on for nobody.
+    """
+    url = url.strip()
+    if not url:
+        raise HTTPException(status_code=400, detail="URL cannot be empty.")
+    if not validate_github_url(url):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid GitHub URL. Format: https://github.com/username/repository"
+        )
+
+    events = queue.Queue()
+    gone   = threading.Event()   # set once the client has disconnected
+
+    def on_event(kind, item):
+        if gone.is_set():
+            raise AnalysisCancelled()
+        events.put((kind, item))
+
+    def run():
+        try:
+            events.put(("status", {"stage": "parsing"}))
+            report    = ParseReport()
+            all_facts = parse_github_repo(url, jobs=PARSE_JOBS, compact=True, report=report)
+            if gone.is_set():
+                return
+            if not all_facts:
+                raise HTTPException(
+                    status_code=422,
+                    detail="No supported files found. "
+                           "HIRO supports: .py, .java, .js, .jsx, .ts, .tsx"
+                )
+            events.put(("status", {
+                "stage": "analyzing",
+                "files": sum(len(fl) for fl in all_facts.values()),
+            }))
+            response = facts_to_response(all_facts, report.skipped, on_event=on_event)
+            events.put(("result", response.model_dump()))
+        except AnalysisCancelled:
+            print(f"→ Stream client for {url} disconnected — analysis stopped")
+        except HTTPException as e:
+            events.put(("error", {"detail": e.detail}))
+        except Exception as e:
+            events.put(("error", {"detail": f"Analysis failed: {str(e)}"}))
+        finally:
+            events.put((None, None))
+
+    threading.Thread(target=run, daemon=True).start()
+
+    async def stream():
+        nodes, edges = {}, []
+        changed, last_sent = False, 0.0
+        try:
+            while not await request.is_disconnected():
+                try:
+                    kind, item = await asyncio.to_thread(events.get, timeout=STREAM_MERMAID_INTERVAL)
+                except queue.Empty:
+                    kind = item = None
+                    if not changed:
+                        continue
+                else:
+                    if kind is None:
+                        break
+                    if kind == "node":
+                        if item.get("id") is None or not item.get("label"):
+                            continue
+                        nodes[item["id"]] = item
+                        changed = True
+                    elif kind == "edge":
+                        edges.append(item)
+                        changed = True
+                    elif kind == "retry":
+                        prefix = (item or {}).get("prefix", "")
+                        nodes = {k: n for k, n in nodes.items() if not str(k).startswith(prefix)}
+                        edges = [e for e in edges
+                                 if not str(e.get("from")).startswith(prefix)
+                                 and not str(e.get("to")).startswith(prefix)]
+                        changed = True
+                    yield _sse(kind, item)
+
+                now = time.monotonic()
+                if changed and now - last_sent >= STREAM_MERMAID_INTERVAL:
+                    partial = {"diagram": {"nodes": list(nodes.values()), "edges": edges}}
+                    yield _sse("mermaid", {
+                        "mermaid": build_ai_mermaid(partial),
+                        "nodes":   len(nodes),
+                        "edges":   len(edges),
+                    })
+                    changed, last_sent = False, now
+        finally:
+            # However the stream ended, nobody reads the worker's events now
+            gone.set()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/analyze/code", response_model=DiagramResponse)
 def analyze_code(request: AnalyzeCodeRequest):
     """
@@ -237,6 +382,11 @@ def analyze_code(request: AnalyzeCodeRequest):
 
         return facts_to_response(all_facts)
 
+    except SkippedFile as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"File not analyzed: {e}"
+        )
     except HTTPException:
         raise
     except Exception as e:
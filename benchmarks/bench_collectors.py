@@ -0,0 +1,112 @@
+"""
+Benchmark for the set-backed collectors in models.extractors
+Generates CSS, Python, JavaScript and Java inputs at doubling sizes, each
+repeating most of its names (selectors, calls, hooks, injected fields) so
+deduplication has work to do, and times the extractors. With O(1)
+deduplication the time per item stays flat as the input grows; with the
+old list scans it grew with the input. The last table times the two
+deduplication strategies alone on the same stream of names.
+
+Usage: python benchmarks/bench_collectors.py [max_items]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.extractors import extract_css, extract_java, extract_javascript, extract_python
+from models.extractors.collectors import OrderedSet
+from models.universe_parser import get_parser
+
+
+def generate_css(n):
+    return "".join(
+        f".c{i} #i{i}, div.x{i % 50} {{ color: red; }}\n"
+        f"@media (max-width: {i}px) {{ .m{i} {{ margin: 0; }} }}\n"
+        for i in range(n)
+    )
+
+
+def generate_python(n):
+    return "".join(f"def f{i}():\n    f{(i + 1) % n}()\n    f{(i + 2) % n}()\n\n" for i in range(n))
+
+
+def generate_javascript(n):
+    return "".join(
+        f"function f{i}() {{ useHook{i % 7}(); return f{(i + 1) % n}(); }}\n"
+        f"const g{i} = () => f{i}();\n"
+        for i in range(n)
+    )
+
+
+def generate_java(n):
+    fields = "".join(f"    @Autowired private Repo{i} repo{i};\n" for i in range(n))
+    methods = "".join(f"    public void m{i}() {{ repo{i}.save(); }}\n" for i in range(n))
+    return f"@Service\npublic class BigService {{\n{fields}{methods}}}\n"
+
+
+INPUTS = [
+    ("css",        generate_css,        extract_css),
+    ("python",     generate_python,     extract_python),
+    ("javascript", generate_javascript, extract_javascript),
+    ("java",       generate_java,       extract_java),
+]
+
+
+def best_time(run, repeats=3):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def dedupe_with_list(names):
+    items = []
+    for name in names:
+        if name not in items:
+            items.append(name)
+    return items
+
+
+def dedupe_with_ordered_set(names):
+    items = OrderedSet()
+    for name in names:
+        items.add(name)
+    return items.items
+
+
+def main():
+    max_items = int(sys.argv[1]) if len(sys.argv) > 1 else 16000
+
+    sizes = []
+    size = max_items
+    while size >= 1000:
+        sizes.insert(0, size)
+        size //= 2
+
+    print(f"{'language':<11} {'items':>7} {'time (ms)':>10} {'us / item':>10}")
+    for language, generate, extract in INPUTS:
+        parser = get_parser(language)
+        for n in sizes:
+            code = generate(n).encode()
+            tree = parser.parse(code)
+            elapsed = best_time(lambda: extract(tree, code))
+            print(f"{language:<11} {n:>7} {elapsed * 1000:>10.1f} {elapsed * 1e6 / n:>10.2f}")
+
+    print(f"\n{'names':>7} {'list scan (ms)':>15} {'OrderedSet (ms)':>16}")
+    for n in sizes:
+        # Every name three times, as calls to the same function repeat
+        names = [f"f{i % n}" for i in range(3 * n)]
+        assert dedupe_with_list(names) == dedupe_with_ordered_set(names)
+        listed = best_time(lambda: dedupe_with_list(names))
+        hashed = best_time(lambda: dedupe_with_ordered_set(names))
+        print(f"{n:>7} {listed * 1000:>15.1f} {hashed * 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
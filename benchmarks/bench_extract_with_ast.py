@@ -0,0 +1,63 @@
+"""
+Benchmark for models.parser.extract_with_ast
+Generates modules with hundreds of classes whose methods call into other
+classes through self.<attr>.<method>, and times the analysis at doubling
+sizes. Linear analysis means the time roughly doubles with the size.
+
+Usage: python benchmarks/bench_extract_with_ast.py [max_classes]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.parser import extract_with_ast
+
+
+def generate_module(class_count, methods_per_class=4):
+    """Source for a module of services that each use the next service."""
+    lines = []
+    for i in range(class_count):
+        target = (i + 1) % class_count
+        lines.append(f"class Service{i}:")
+        lines.append(f"    def __init__(self, service{target}):")
+        lines.append(f"        self.peer = service{target}")
+        for m in range(methods_per_class):
+            lines.append(f"    def handle_{i}_{m}(self, item):")
+            lines.append(f"        self.peer.handle_{target}_{m}(item)")
+            lines.append(f"        return self.peer.handle_{target}_{(m + 1) % methods_per_class}(item)")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def time_analysis(code, repeats=3):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        extract_with_ast(code)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    max_classes = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+
+    sizes = []
+    size = 100
+    while size <= max_classes:
+        sizes.append(size)
+        size *= 2
+
+    print(f"{'classes':>8} {'lines':>8} {'time (ms)':>10} {'ms / class':>11}")
+    for class_count in sizes:
+        code = generate_module(class_count)
+        elapsed = time_analysis(code)
+        print(f"{class_count:>8} {code.count(chr(10)) + 1:>8} "
+              f"{elapsed * 1000:>10.1f} {elapsed * 1000 / class_count:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
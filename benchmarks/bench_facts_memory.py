@@ -0,0 +1,97 @@
+"""
+Benchmark for models.file_facts.FactsStore
+Parses a folder once, then holds `copies` copies of its facts (each file
+under a different directory, as in a monorepo of similar packages) either
+as plain facts dicts or in a FactsStore. Each variant runs in its own
+process and reports the RSS the facts add and the process's peak RSS
+(Linux only: reads /proc/self/statm).
+
+Usage: python benchmarks/bench_facts_memory.py <folder> [copies]
+"""
+
+import contextlib
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.file_facts import FactsStore
+from models.multi_language_parser import parse_folder_multi_language
+
+
+def load_facts(folder):
+    with contextlib.redirect_stdout(io.StringIO()):
+        all_facts = parse_folder_multi_language(folder, use_cache=False)
+    # Round-trip through JSON so no strings are shared with the parser
+    return json.dumps(all_facts)
+
+
+def copies_of(encoded, folder, copies):
+    """Yields (language, facts) for every file of every copy, freshly decoded."""
+    root = str(Path(folder))
+    for copy in range(copies):
+        for language, facts_list in json.loads(encoded).items():
+            for facts in facts_list:
+                facts['filepath'] = facts['filepath'].replace(
+                    root, f"{root}/pkg{copy}", 1)
+                yield language, facts
+
+
+def current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def run_variant(variant, folder, copies):
+    encoded = load_facts(folder)
+    before  = current_rss_mb()
+    started = time.perf_counter()
+
+    if variant == "compact":
+        held = FactsStore(folder)
+        for language, facts in copies_of(encoded, folder, copies):
+            held.add(facts, language)
+    else:
+        held = {}
+        for language, facts in copies_of(encoded, folder, copies):
+            held.setdefault(language, []).append(facts)
+
+    elapsed = time.perf_counter() - started
+    held_mb = current_rss_mb() - before
+
+    files = sum(len(facts_list) for facts_list in held.values())
+    # ru_maxrss is in KB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"files": files, "held_mb": held_mb,
+                      "peak_rss_mb": peak, "seconds": elapsed}))
+
+
+def main():
+    # Each variant's child process: <variant> <folder> <copies>
+    if len(sys.argv) > 3 and sys.argv[1] in ("dict", "compact"):
+        run_variant(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+        return
+    if len(sys.argv) < 2:
+        sys.exit(__doc__.strip().splitlines()[-1])
+
+    folder = sys.argv[1]
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    print(f"{'variant':>8} {'files':>8} {'held (MB)':>10} {'peak RSS (MB)':>14} {'build (s)':>10}")
+    for variant in ("dict", "compact"):
+        output = subprocess.run(
+            [sys.executable, __file__, variant, folder, str(copies)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        stats = json.loads(output.strip().splitlines()[-1])
+        print(f"{variant:>8} {stats['files']:>8} {stats['held_mb']:>10.1f} "
+              f"{stats['peak_rss_mb']:>14.1f} {stats['seconds']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
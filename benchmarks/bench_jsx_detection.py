@@ -0,0 +1,132 @@
+"""
+Benchmark for JSX detection in models.extractors.js_extractor
+Generates React files of nested components (components defined inside
+components, 20 deep) up to 5k lines and decides for every capitalised
+function whether it returns JSX, two ways: walking the function's whole
+subtree for a JSX node, as has_jsx_in_subtree used to for each candidate,
+and one jsx_pack query per file plus a bisect per candidate, as
+extract_javascript does now. Also times extract_javascript on each file.
+
+Usage: python benchmarks/bench_jsx_detection.py [max_lines]
+"""
+
+import sys
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.extractors import extract_javascript
+from models.extractors.js_extractor import jsx_pack
+from models.extractors.query_engine import capture_starts, run_pack
+from models.universe_parser import get_node_text, get_parser
+
+
+# Functions that become components when capitalised and holding JSX
+CANDIDATES_PACK = """
+(function_declaration
+  name: (identifier) @candidate.name) @candidate
+
+(variable_declarator
+  name: (identifier) @candidate.name
+  value: [(arrow_function) (function_expression)] @candidate.value) @candidate
+"""
+
+
+def generate_react(line_count, depth=20):
+    """Chains of `depth` components, each declared inside the one before."""
+    lines = ["import React, { useState, useEffect } from 'react';", ""]
+    chain = 0
+    while len(lines) < line_count:
+        for level in range(depth):
+            indent = "  " * level
+            lines.append(f"{indent}const Panel{chain}_{level} = ({{ items }}) => {{")
+            lines.append(f"{indent}  const [open, setOpen] = useState(false);")
+            lines.append(f"{indent}  useEffect(() => {{ setOpen(items.length > 0); }}, [items]);")
+        for level in reversed(range(depth)):
+            indent = "  " * level
+            lines.append(f"{indent}  return <div className=\"panel\">{{open && "
+                         f"<span>{{items.map(i => <b key={{i}}>{{i}}</b>)}}</span>}}</div>;")
+            lines.append(f"{indent}}};")
+        lines.append("")
+        chain += 1
+    return "\n".join(lines) + "\n"
+
+
+def candidates(tree, code):
+    """The function nodes extract_javascript checks for JSX."""
+    found = []
+    for _, captures in run_pack(CANDIDATES_PACK, tree):
+        if get_node_text(captures['candidate.name'], code)[:1].isupper():
+            found.append(captures.get('candidate.value', captures['candidate']))
+    return found
+
+
+def subtree_has_jsx(node):
+    cursor = node.walk()
+    depth  = 0
+    while True:
+        if 'jsx' in cursor.node.type:
+            return True
+        if cursor.goto_first_child():
+            depth += 1
+            continue
+        while depth and not cursor.goto_next_sibling():
+            cursor.goto_parent()
+            depth -= 1
+        if not depth:
+            return False
+
+
+def detect_by_subtree(tree, nodes):
+    return [subtree_has_jsx(node) for node in nodes]
+
+
+def detect_by_starts(tree, nodes):
+    starts = capture_starts(jsx_pack(tree.language), tree)
+    found = []
+    for node in nodes:
+        i = bisect_left(starts, node.start_byte)
+        found.append(i < len(starts) and starts[i] < node.end_byte)
+    return found
+
+
+def best_time(run, repeats=5):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    max_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    parser = get_parser('javascript')
+
+    sizes = []
+    size = max_lines
+    while size >= 600:
+        sizes.insert(0, size)
+        size //= 2
+
+    print(f"{'lines':>6} {'functions':>9} {'subtree walks ms':>17} {'one query ms':>13} "
+          f"{'extract_javascript ms':>22}")
+    for line_count in sizes:
+        code  = generate_react(line_count).encode()
+        tree  = parser.parse(code)
+        nodes = candidates(tree, code)
+        lines = code.count(b"\n")
+        assert detect_by_subtree(tree, nodes) == detect_by_starts(tree, nodes)
+
+        walks   = best_time(lambda: detect_by_subtree(tree, nodes))
+        query   = best_time(lambda: detect_by_starts(tree, nodes))
+        extract = best_time(lambda: extract_javascript(tree, code))
+        print(f"{lines:>6} {len(nodes):>9} {walks * 1000:>17.1f} "
+              f"{query * 1000:>13.1f} {extract * 1000:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
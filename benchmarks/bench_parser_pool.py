@@ -0,0 +1,92 @@
+"""
+Benchmark for the parser pool in models.universe_parser
+Parses a generated 20k-file repository held in memory, once building a new
+Parser per file (as parse_file_universal used to) and once through the
+per-thread pool (get_parser), single-threaded and on a thread pool the
+size of FastAPI's. Files are small, like most of a real repository, so
+the per-file cost of building a Parser shows.
+
+Usage: python benchmarks/bench_parser_pool.py [files] [threads]
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tree_sitter import Parser
+
+from models.universe_parser import LANGUAGES, get_parser
+
+
+SOURCES = {
+    'python': (
+        "import os\n\n"
+        "class Handler{i}:\n"
+        "    def run(self, item):\n"
+        "        return os.path.join('out', str(item))\n"
+    ),
+    'javascript': (
+        "const db = require('./db');\n"
+        "function handler{i}(req, res) {{ return db.find(req.id).then(res.json); }}\n"
+        "module.exports = handler{i};\n"
+    ),
+    'java': (
+        "package com.acme;\n"
+        "public class Handler{i} {{ public int run(int x) {{ return x + {i}; }} }}\n"
+    ),
+}
+
+
+def generate_repo(file_count):
+    """[(language, source bytes)] cycling through the languages."""
+    languages = list(SOURCES)
+    return [
+        (languages[i % len(languages)], SOURCES[languages[i % len(languages)]].format(i=i).encode())
+        for i in range(file_count)
+    ]
+
+
+def parse_fresh(files):
+    for language, code in files:
+        Parser(LANGUAGES[language]).parse(code)
+
+
+def parse_pooled(files):
+    for language, code in files:
+        get_parser(language).parse(code)
+
+
+def timed(parse, files, threads=1, repeats=3):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        if threads == 1:
+            parse(files)
+        else:
+            chunks = [files[i::threads] for i in range(threads)]
+            with ThreadPoolExecutor(threads) as pool:
+                list(pool.map(parse, chunks))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    threads    = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    files      = generate_repo(file_count)
+
+    print(f"{file_count} files")
+    print(f"{'threads':>8} {'fresh (s)':>10} {'pooled (s)':>11} {'saved / file (us)':>18}")
+    for count in (1, threads):
+        fresh  = timed(parse_fresh, files, count)
+        pooled = timed(parse_pooled, files, count)
+        print(f"{count:>8} {fresh:>10.3f} {pooled:>11.3f} "
+              f"{(fresh - pooled) / file_count * 1e6:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
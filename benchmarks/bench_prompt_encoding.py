@@ -0,0 +1,59 @@
+"""
+Benchmark for models.prompt_encoding
+Parses a folder, builds the summaries the analysis would send (the single
+summary, its aggressive form, and every map-reduce partition's) and
+reports their estimated tokens as indented JSON and as rendered for the
+prompt. No Groq calls are made.
+
+Usage: python benchmarks/bench_prompt_encoding.py <folder> [<folder> ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from models.ai_engine import FactsDigest, plan_partitions
+from models.multi_language_parser import iter_folder_facts
+from models.prompt_encoding import render_with_stats
+
+
+def digest_folder(folder):
+    digest = FactsDigest(keep_all=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for language, facts in iter_folder_facts(folder, use_cache=False):
+            digest.add(language, facts)
+    return digest
+
+
+def measure(summaries):
+    tokens = json_tokens = 0
+    for summary in summaries:
+        _, stats = render_with_stats(summary)
+        tokens      += stats["tokens"]
+        json_tokens += stats["json_tokens"]
+    return tokens, json_tokens
+
+
+def main():
+    print(f"{'folder':<30} {'summary':<12} {'calls':>5} {'JSON':>9} {'encoded':>9} {'saved':>7}")
+    for folder in sys.argv[1:]:
+        digest = digest_folder(folder)
+        variants = [
+            ("single",     [digest.summary()]),
+            ("aggressive", [digest.summary(aggressive=True)]),
+            ("partitions", [p.summary for p in plan_partitions(digest)]),
+        ]
+        for name, summaries in variants:
+            tokens, json_tokens = measure(summaries)
+            saved = 1 - tokens / json_tokens if json_tokens else 0.0
+            print(f"{Path(folder).name:<30} {name:<12} {len(summaries):>5} "
+                  f"{json_tokens:>9} {tokens:>9} {saved:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
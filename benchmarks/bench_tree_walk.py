@@ -0,0 +1,125 @@
+"""
+Benchmark for TreeCursor traversal
+Generates JavaScript files of callback pyramids at doubling sizes and
+walks each syntax tree twice: recursing through node.children (how the
+extractors used to walk) and iterating one TreeCursor (how iter_children
+and the query packs walk now). Reports wall time and the peak Python
+memory of each walk, then runs extract_javascript on the same files and
+on one pyramid too deep for a recursive walk.
+
+Usage: python benchmarks/bench_tree_walk.py [max_functions]
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.extractors import extract_javascript
+from models.universe_parser import get_parser
+
+
+def generate_module(function_count, depth=6):
+    """Functions that each nest `depth` callbacks, like async code before promises."""
+    lines = []
+    for i in range(function_count):
+        lines.append(f"function load{i}(req, res) {{")
+        for level in range(depth):
+            lines.append("  " * (level + 1) + f"db.query('q{level}', function (err, rows{level}) {{")
+        lines.append("  " * (depth + 1) + f"res.json(rows{depth - 1});")
+        for level in reversed(range(depth)):
+            lines.append("  " * (level + 1) + "});")
+        lines.append("}")
+    return "\n".join(lines)
+
+
+def generate_pyramid(depth):
+    """One component whose callbacks nest `depth` deep."""
+    opening = "step(function () { " * depth
+    return f"function App() {{ {opening}return 1; {'}); ' * depth}return <div />; }}"
+
+
+def walk_children(node):
+    count = 1
+    for child in node.children:
+        count += walk_children(child)
+    return count
+
+
+def walk_cursor(node):
+    count  = 0
+    cursor = node.walk()
+    while True:
+        count += 1
+        if cursor.goto_first_child():
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                return count
+
+
+def measure(walk, parse, repeats=3):
+    """
+    (best seconds, peak traced bytes, walk result). Every walk gets a
+    freshly parsed tree: nodes cache their children list once built.
+    """
+    best = None
+    for _ in range(repeats):
+        root = parse().root_node
+        started = time.perf_counter()
+        result = walk(root)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    root = parse().root_node
+    tracemalloc.start()
+    walk(root)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    max_functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    parser = get_parser('javascript')
+
+    sizes = []
+    size = 250
+    while size <= max_functions:
+        sizes.append(size)
+        size *= 2
+
+    print(f"{'functions':>9} {'nodes':>8} {'children ms':>12} {'peak KB':>8} "
+          f"{'cursor ms':>10} {'peak KB':>8} {'extract ms':>11} {'peak KB':>8}")
+    for count in sizes:
+        code  = generate_module(count).encode()
+        trees = [None]   # the tree being walked, for extract_javascript
+
+        def parse():
+            trees[0] = parser.parse(code)
+            return trees[0]
+
+        children_time, children_peak, nodes = measure(walk_children, parse)
+        cursor_time, cursor_peak, _ = measure(walk_cursor, parse)
+        extract_time, extract_peak, _ = measure(
+            lambda root: extract_javascript(trees[0], code), parse)
+        print(f"{count:>9} {nodes:>8} {children_time * 1000:>12.1f} {children_peak / 1024:>8.0f} "
+              f"{cursor_time * 1000:>10.1f} {cursor_peak / 1024:>8.0f} "
+              f"{extract_time * 1000:>11.1f} {extract_peak / 1024:>8.0f}")
+
+    depth = 3000
+    code = generate_pyramid(depth).encode()
+    tree = parser.parse(code)
+    try:
+        walk_children(tree.root_node)
+        recursive = "completed"
+    except RecursionError:
+        recursive = "RecursionError"
+    components = [c['name'] for c in extract_javascript(tree, code)['components']]
+    print(f"\n{depth}-deep callback pyramid: recursive walk {recursive}, "
+          f"cursor walk {walk_cursor(tree.root_node)} nodes, extract_javascript components {components}")
+
+
+if __name__ == "__main__":
+    main()
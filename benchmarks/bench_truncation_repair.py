@@ -0,0 +1,227 @@
+"""
+Benchmark for recovering truncated model answers
+Generates a fixed corpus of architecture answers shaped like the model's
+(indented, compact and markdown-fenced; labels and descriptions holding
+braces, "}," and escaped quotes), cuts each one at many offsets, as the
+token limit does, and recovers what it can with the legacy repair (trim
+to the last "}," and close the brackets still open, copied here as it
+was) and with the incremental parser the analysis now uses.
+
+  repaired   cuts after at least one complete node that gave a result
+             with nodes (a failed repair costs another Groq pass)
+  recall     complete nodes / edges / components in the cut text that
+             were recovered
+  precision  recovered items identical to one written in full
+
+No Groq calls are made.
+
+Usage: python benchmarks/bench_truncation_repair.py [answers] [cuts per answer]
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from models.ai_engine import (DIAGRAM_ITEMS, _extract_json_object, _parsed_answer,
+                              _strip_markdown)
+from models.json_stream import JSONStreamParser
+
+
+ITEM_PATHS = {
+    ("diagram", "nodes"):           "nodes",
+    ("diagram", "edges"):           "edges",
+    ("description", "components"):  "components",
+}
+
+ROLES = ["entry", "router", "controller", "service", "repository", "database",
+         "middleware", "entity", "utility", "external", "client"]
+NAMES = ["users", "orders", "auth", "billing", "attendance", "reports", "mail", "session"]
+DESCRIPTIONS = [
+    "Handles GET /api/{name}/{{id}} and returns the record as JSON",
+    "Validates the payload, e.g. {{\"email\": \"a@b.c\"}}, before saving it",
+    "Maps rows to {name} entities}}, caching them per request",
+    "Renders the \"{name}\" dashboard with totals grouped by month",
+    "Wraps the {name} queries in a transaction; returns {{ok: true}}, or the error",
+    "Exposes {name} over REST under /v1/{name} with JWT checks",
+]
+EDGE_LABELS = ["POST /api/{name}", "queries {name} records", "validates JWT token",
+               "emits {{\"event\": \"{name}.created\"}}", "reads config[\"{name}\"]"]
+
+
+# ── Legacy repair, as it was before the incremental parser ──────────
+
+def _count_depth(text: str):
+    """Return (brace_depth, bracket_depth) of unclosed structures."""
+    depth_brace   = 0
+    depth_bracket = 0
+    in_string     = False
+    escape_next   = False
+
+    for ch in text:
+        if escape_next:
+            escape_next = False
+            continue
+        if ch == '\\' and in_string:
+            escape_next = True
+            continue
+        if ch == '"':
+            in_string = not in_string
+            continue
+        if in_string:
+            continue
+        if ch == '{':
+            depth_brace += 1
+        elif ch == '}':
+            depth_brace -= 1
+        elif ch == '[':
+            depth_bracket += 1
+        elif ch == ']':
+            depth_bracket -= 1
+
+    return depth_brace, depth_bracket
+
+
+def legacy_repair(raw: str) -> dict:
+    raw = _extract_json_object(_strip_markdown(raw.strip()))
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        pass
+
+    trimmed = raw.rstrip()
+    last_complete = max(trimmed.rfind("},"), trimmed.rfind("}\n"), trimmed.rfind("} "))
+    if last_complete != -1:
+        trimmed = trimmed[:last_complete + 1]
+
+    depth_brace, depth_bracket = _count_depth(trimmed)
+    closing = ("]" * max(depth_bracket, 0)) + ("}" * max(depth_brace, 0))
+    try:
+        return json.loads(trimmed + closing)
+    except json.JSONDecodeError:
+        raise ValueError("Could not repair truncated JSON from model response.")
+
+
+def incremental_repair(raw: str, rng) -> dict:
+    parser = JSONStreamParser(DIAGRAM_ITEMS)
+    pos = 0
+    while pos < len(raw):   # fed in stream-sized chunks
+        step = rng.randint(1, 12)
+        parser.feed(raw[pos:pos + step])
+        pos += step
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _parsed_answer(parser)
+
+
+# ── Corpus ───────────────────────────────────────────────────────────
+
+def make_answer(rng):
+    nodes, components = [], []
+    for i in range(rng.randint(3, 40)):
+        name = rng.choice(NAMES)
+        label = rng.choice([f"{name}Service.js", f"{name.title()}Controller",
+                            f"GET /api/{name}/{{id}}", f"{name}_repo.py"])
+        description = rng.choice(DESCRIPTIONS).format(name=name)
+        nodes.append({"id": f"n{i + 1}", "label": label, "role": rng.choice(ROLES),
+                      "language": rng.choice(["javascript", "python", "java", "infrastructure"]),
+                      "description": description})
+        components.append({"name": label, "role": "Layer for " + name,
+                           "what_it_does": description})
+    edges = [{"from": rng.choice(nodes)["id"], "to": rng.choice(nodes)["id"],
+              "label": rng.choice(EDGE_LABELS).format(name=rng.choice(NAMES))}
+             for _ in range(int(len(nodes) * rng.uniform(0.8, 2.0)))]
+    return {
+        "project_name": "Attendance {portal}",
+        "diagram": {"nodes": nodes, "edges": edges},
+        "description": {"overview": "A portal; {\"stack\": \"express\"}, four services.",
+                        "components": components,
+                        "architecture_pattern": "Layered MVC: routes -> controllers -> services."},
+    }
+
+
+def render_answer(answer, style):
+    """(text, [(items key, item, end offset)]) for an answer in one style."""
+    indent = 2 if style == "indented" else None
+    text = json.dumps(answer, indent=indent)
+    items = []
+    start = 0
+    for path, key in ITEM_PATHS.items():
+        container = answer[path[0]][path[1]]
+        for item in container:
+            # Each item is written after the one before it
+            item_text = json.dumps(item, indent=indent)
+            if indent is not None:
+                item_text = item_text.replace("\n", "\n" + " " * indent * 3)
+            at = text.index(item_text, start)
+            items.append((key, item, at + len(item_text)))
+            start = at + len(item_text)
+    if style == "fenced":
+        text = "```json\n" + text + "\n```"
+        items = [(key, item, end + 8) for key, item, end in items]
+    return text, items
+
+
+def score(result, complete, totals):
+    recovered = {}
+    if isinstance(result, dict):
+        diagram = result.get("diagram") or {}
+        description = result.get("description") or {}
+        recovered = {"nodes": diagram.get("nodes") or [], "edges": diagram.get("edges") or [],
+                     "components": description.get("components") or []}
+    for key, expected in complete.items():
+        got = recovered.get(key, [])
+        totals[key + "_expected"] += len(expected)
+        totals[key + "_recovered"] += len(got)
+        totals[key + "_correct"] += sum(1 for item in got if item in expected)
+    return bool(recovered.get("nodes"))
+
+
+def main():
+    answers = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    cuts    = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+    rng     = random.Random(25)
+
+    methods = {"legacy": lambda raw: legacy_repair(raw),
+               "incremental": lambda raw: incremental_repair(raw, rng)}
+    totals = {name: {"cases": 0, "repaired": 0} for name in methods}
+    for stats in totals.values():
+        for key in ("nodes", "edges", "components"):
+            stats.update({key + "_expected": 0, key + "_recovered": 0, key + "_correct": 0})
+
+    for n in range(answers):
+        answer = make_answer(rng)
+        style = ("indented", "compact", "fenced")[n % 3]
+        text, items = render_answer(answer, style)
+        first_node = min(end for key, _, end in items if key == "nodes")
+        for _ in range(cuts):
+            cut = rng.randint(first_node, len(text) - 1)
+            complete = {key: [item for k, item, end in items if k == key and end <= cut]
+                        for key in ("nodes", "edges", "components")}
+            for name, repair in methods.items():
+                try:
+                    result = repair(text[:cut])
+                except ValueError:
+                    result = None
+                totals[name]["cases"] += 1
+                totals[name]["repaired"] += score(result, complete, totals[name])
+
+    print(f"{answers} answers × {cuts} cuts, each after at least one complete node\n")
+    print(f"{'method':<12} {'repaired':>9} {'nodes':>13} {'edges':>13} {'components':>13}")
+    print(f"{'':<12} {'':>9} {'recall/prec':>13} {'recall/prec':>13} {'recall/prec':>13}")
+    for name, stats in totals.items():
+        row = f"{name:<12} {stats['repaired'] / stats['cases']:>9.1%}"
+        for key in ("nodes", "edges", "components"):
+            recall = stats[key + "_correct"] / max(stats[key + "_expected"], 1)
+            precision = stats[key + "_correct"] / max(stats[key + "_recovered"], 1)
+            row += f" {recall:>6.1%}/{precision:>6.1%}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
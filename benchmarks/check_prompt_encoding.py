@@ -0,0 +1,176 @@
+"""
+Quality check for models.prompt_encoding
+The compact encoding is only worth its saved tokens if Groq draws the
+same diagram from it as from the indented JSON. Three commands:
+
+  coverage <folder>...          offline: every file, class, method and
+                                dependency in each summary (single,
+                                aggressive, every partition) must appear
+                                in its compact rendering
+  record <folder> <recording>   analyzes the folder with the JSON encoding
+                                and saves the diagram as the reference
+  compare <folder> <recording>  analyzes the folder with the compact
+                                encoding and compares its diagram with the
+                                recording: summarized files drawn as nodes,
+                                node labels and edges (by label) shared
+
+record and compare call Groq (GROQ_API_KEY) with the diagram cache in a
+temporary directory, so neither reads a cached answer. compare exits with
+status 1 when the compact diagram draws fewer of the summarized files
+than the recording, or shares less than MIN_EDGE_OVERLAP of its edges.
+
+Usage: python benchmarks/check_prompt_encoding.py coverage <folder> [<folder> ...]
+       python benchmarks/check_prompt_encoding.py record|compare <folder> <recording.json>
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from models import diagram_cache, prompt_encoding
+from models.ai_engine import FactsDigest, analyze_digest, plan_partitions
+from models.multi_language_parser import iter_folder_facts
+
+
+# Share of the recording's edges the compact diagram must also draw
+MIN_EDGE_OVERLAP = 0.8
+
+
+def digest_folder(folder, keep_all=None):
+    digest = FactsDigest(keep_all=keep_all)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for language, facts in iter_folder_facts(folder, use_cache=False):
+            digest.add(language, facts)
+    return digest
+
+
+def summary_values(value):
+    """Every name in a summary: dict keys are fields, not facts."""
+    if isinstance(value, dict):
+        if {"from", "to"} <= value.keys():
+            # A call: caller and callee must stay paired, as "a -> b"
+            receiver = f"{value['receiver']}." if value.get("receiver") else ""
+            yield f"{value['from']} -> {receiver}{value['to']}"
+            if value.get("file"):
+                yield str(value["file"])
+            return
+        for key, item in value.items():
+            if key == "dir":
+                # Directories are written as a tree, one part per line
+                yield from (part for part in str(item).split("/") if part)
+            else:
+                yield from summary_values(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from summary_values(item)
+    elif value not in (None, ""):
+        yield str(value)
+
+
+def check_coverage(folders):
+    missing_total = 0
+    print(f"{'folder':<30} {'summary':<12} {'values':>7} {'missing':>8}")
+    for folder in folders:
+        digest = digest_folder(folder, keep_all=True)
+        variants = [
+            ("single",     [digest.summary()]),
+            ("aggressive", [digest.summary(aggressive=True)]),
+            ("partitions", [p.summary for p in plan_partitions(digest)]),
+        ]
+        for name, summaries in variants:
+            values = missing = 0
+            for summary in summaries:
+                encoded = prompt_encoding.encode_summary(summary)
+                for value in summary_values(summary):
+                    values += 1
+                    if value not in encoded:
+                        missing += 1
+                        print(f"  ✗ {name}: {value!r} not in the compact encoding")
+            missing_total += missing
+            print(f"{Path(folder).name:<30} {name:<12} {values:>7} {missing:>8}")
+    return missing_total == 0
+
+
+def analyze(folder, encoding):
+    """The folder's diagram with the given prompt encoding, never from the cache."""
+    digest = digest_folder(folder)
+    prompt_encoding.ENCODING = encoding
+    with tempfile.TemporaryDirectory() as cache_dir:
+        diagram_cache.CACHE_DIR = Path(cache_dir)
+        result = analyze_digest(digest)
+    files = sorted({f["filename"] for files in digest.summary().values() for f in files})
+    return {"encoding": encoding, "files": files, "diagram": result["diagram"]}
+
+
+def _key(label):
+    return str(label).strip().lower()
+
+
+def diagram_shape(recording):
+    """(node label keys, edge label-key pairs, summarized files drawn as nodes)."""
+    nodes  = recording["diagram"].get("nodes", [])
+    labels = {node.get("id"): _key(node.get("label")) for node in nodes if isinstance(node, dict)}
+    edges  = {
+        (labels[edge.get("from")], labels[edge.get("to")])
+        for edge in recording["diagram"].get("edges", [])
+        if isinstance(edge, dict) and edge.get("from") in labels and edge.get("to") in labels
+    }
+    node_keys = set(labels.values())
+    drawn = {f for f in recording["files"] if _key(f) in node_keys or _key(Path(f).stem) in node_keys}
+    return node_keys, edges, drawn
+
+
+def overlap(recorded, current):
+    return len(recorded & current) / len(recorded) if recorded else 1.0
+
+
+def compare(recording, current):
+    recorded_nodes, recorded_edges, recorded_drawn = diagram_shape(recording)
+    nodes, edges, drawn = diagram_shape(current)
+    recorded_files, files = len(recording["files"]), len(current["files"])
+    shared_edges = overlap(recorded_edges, edges)
+
+    recorded_head = f"recorded ({recording['encoding']})"
+    current_head  = f"now ({current['encoding']})"
+    print(f"{'':<12} {recorded_head:>16} {current_head:>16}")
+    print(f"{'files drawn':<12} {f'{len(recorded_drawn)}/{recorded_files}':>16} "
+          f"{f'{len(drawn)}/{files}':>16}")
+    print(f"{'nodes':<12} {len(recorded_nodes):>16} {len(nodes):>16}")
+    print(f"{'edges':<12} {len(recorded_edges):>16} {len(edges):>16}")
+    print(f"node labels shared: {overlap(recorded_nodes, nodes):.1%}, "
+          f"edges shared: {shared_edges:.1%}")
+
+    ok = True
+    if files and recorded_files and len(drawn) / files < len(recorded_drawn) / recorded_files:
+        print("✗ the compact encoding drew fewer of the summarized files as nodes")
+        ok = False
+    if shared_edges < MIN_EDGE_OVERLAP:
+        print(f"✗ fewer than {MIN_EDGE_OVERLAP:.0%} of the recorded edges were drawn")
+        ok = False
+    return ok
+
+
+def main():
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else (None, [])
+    if command == "coverage" and args:
+        sys.exit(0 if check_coverage(args) else 1)
+    if command in ("record", "compare") and len(args) == 2:
+        folder, recording = args
+        if command == "record":
+            Path(recording).write_text(json.dumps(analyze(folder, "json"), indent=2))
+            print(f"✓ Recorded the JSON-encoded diagram in {recording}")
+            return
+        current = analyze(folder, "compact")
+        sys.exit(0 if compare(json.loads(Path(recording).read_text()), current) else 1)
+    sys.exit("\n".join(__doc__.strip().splitlines()[-2:]))
+
+
+if __name__ == "__main__":
+    main()
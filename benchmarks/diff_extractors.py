@@ -0,0 +1,136 @@
+"""
+Differential check for models.extractors
+Runs the extractors of a baseline git revision (the recursive walkers,
+before the query packs) and the current ones on the same syntax tree of
+every source file in the given folders, and compares the facts they
+return in full. Keys added since the baseline (external_calls) are left
+out of the comparison; every other key must be identical, list order
+included. Exits with status 1 when any file differs.
+
+The baseline's extractors are read with `git show <revision>:...` into a
+temporary package, so no checkout is touched.
+
+Usage: python benchmarks/diff_extractors.py <baseline revision> <folder> [<folder> ...]
+"""
+
+import importlib
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from models.extractors import (extract_css, extract_html, extract_java, extract_javascript,
+                               extract_python, extract_typescript)
+from models.multi_language_parser import discover_source_files
+from models.source_guard import SkippedFile
+from models.universe_parser import detect_language, parse_file_universal
+
+
+EXTRACTORS = {
+    'python':     ('extract_python', extract_python),
+    'java':       ('extract_java', extract_java),
+    'javascript': ('extract_javascript', extract_javascript),
+    'typescript': ('extract_typescript', extract_typescript),
+    'tsx':        ('extract_typescript', extract_typescript),
+    'html':       ('extract_html', extract_html),
+    'css':        ('extract_css', extract_css),
+}
+EXTENSIONS = ['.py', '.java', '.js', '.jsx', '.ts', '.tsx', '.html', '.htm', '.css', '.scss']
+
+BASELINE_PACKAGE = 'baseline_extractors'
+
+
+def load_baseline(revision, workdir):
+    """The baseline revision's models/extractors as an importable package."""
+    package = Path(workdir) / BASELINE_PACKAGE
+    package.mkdir()
+    listing = subprocess.run(
+        ['git', 'ls-tree', '--name-only', f'{revision}:models/extractors'],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    for name in listing:
+        if not name.endswith('.py'):
+            continue
+        source = subprocess.run(
+            ['git', 'show', f'{revision}:models/extractors/{name}'],
+            cwd=ROOT, check=True, capture_output=True, text=True,
+        ).stdout
+        (package / name).write_text(source.replace('models.extractors', BASELINE_PACKAGE))
+    sys.path.insert(0, str(workdir))
+    return importlib.import_module(BASELINE_PACKAGE)
+
+
+def first_difference(old, new, path='facts'):
+    """Where two facts values first differ, or None."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() | new.keys():
+            if key not in old or key not in new:
+                return f'{path}[{key!r}] only in {"new" if key in new else "baseline"}'
+            found = first_difference(old[key], new[key], f'{path}[{key!r}]')
+            if found:
+                return found
+        return None
+    if isinstance(old, list) and isinstance(new, list):
+        for index, (a, b) in enumerate(zip(old, new)):
+            found = first_difference(a, b, f'{path}[{index}]')
+            if found:
+                return found
+        if len(old) != len(new):
+            return f'{path}: {len(old)} items in baseline, {len(new)} now'
+        return None
+    return None if old == new else f'{path}: {old!r} != {new!r}'
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit(__doc__.strip().splitlines()[-1])
+    revision, folders = sys.argv[1], sys.argv[2:]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        baseline = load_baseline(revision, workdir)
+        compared = differing = baseline_errors = 0
+        baseline_time = current_time = 0.0
+
+        for folder in folders:
+            buckets = discover_source_files(folder, EXTENSIONS)
+            for path in sorted(p for paths in buckets.values() for p in paths):
+                language = detect_language(path)
+                try:
+                    tree, language, code = parse_file_universal(path)
+                except SkippedFile:
+                    continue
+                code = bytes(code)
+                name, extract = EXTRACTORS[language]
+
+                started = time.perf_counter()
+                try:
+                    old = getattr(baseline, name)(tree, code)
+                except RecursionError:
+                    # The recursive walkers cannot read very deep trees
+                    baseline_errors += 1
+                    continue
+                baseline_time += time.perf_counter() - started
+
+                started = time.perf_counter()
+                new = extract(tree, code)
+                current_time += time.perf_counter() - started
+
+                new = {key: value for key, value in new.items() if key in old}
+                compared += 1
+                difference = first_difference(old, new)
+                if difference:
+                    differing += 1
+                    print(f'✗ {path}: {difference}')
+
+    print(f'{compared} files compared, {differing} differ'
+          f' ({baseline_errors} skipped: too deep for the baseline)')
+    print(f'extractor time: baseline {baseline_time:.2f}s, current {current_time:.2f}s')
+    sys.exit(1 if differing else 0)
+
+
+if __name__ == '__main__':
+    main()
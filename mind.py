@@ -7,14 +7,35 @@ import sys
 from pathlib import Path
 
 
+def pop_jobs_option(argv):
+    """
+    Removes `--jobs N` from argv and returns N (default 1).
+    Exits with a usage error if N is not a positive integer.
+    """
+    if "--jobs" not in argv:
+        return 1
+
+    idx = argv.index("--jobs")
+    value = argv[idx + 1] if idx + 1 < len(argv) else ""
+    del argv[idx:idx + 2]
+
+    if not value.isdigit() or int(value) < 1:
+        print(f"✗ --jobs expects a positive integer, got '{value}'")
+        sys.exit(1)
+    return int(value)
+
+
 def main():
+    jobs = pop_jobs_option(sys.argv)
+
     if len(sys.argv) < 2:
         print("HIRO - Multi-Language Architecture Analyzer")
         print()
         print("Usage:")
         print("  python mind.py --file <filepath>")
-        print("  python mind.py --folder <folder_path>")
-        print("  python mind.py --github <github_url>")
+        print("  python mind.py --folder <folder_path> [--jobs N]")
+        print("  python mind.py --github <github_url> [--jobs N]")
+        print("  python mind.py --watch <folder_path>")
         print("  python mind.py --clear-cache")
         print("  python mind.py --cache-info")
         print()
@@ -30,6 +51,7 @@ def main():
         print("  python mind.py --file app.py")
         print("  python mind.py --folder ./my-project")
         print("  python mind.py --github https://github.com/user/repo")
+        print("  python mind.py --folder ./my-project --jobs 8")
         sys.exit(1)
 
     mode = sys.argv[1]
@@ -37,12 +59,17 @@ def main():
     # ── Cache management commands (no target needed) ──────────
     if mode == "--clear-cache":
         from models.diagram_cache import clear_cache
+        from models.facts_cache import clear_facts_cache
         clear_cache()
+        clear_facts_cache()
         sys.exit(0)
 
     if mode == "--cache-info":
         from models.diagram_cache import cache_info
+        from models.facts_cache import facts_cache_info
         cache_info()
+        print()
+        facts_cache_info()
         sys.exit(0)
     # ─────────────────────────────────────────────────────────
 
@@ -74,21 +101,24 @@ def main():
         print(f"🔍 HIRO analyzing folder: {target}")
         print()
 
-        from models.multi_language_parser import parse_folder_multi_language
-        from models.ai_engine import analyze_with_gemini
+        from models.multi_language_parser import iter_folder_facts
+        from models.ai_engine import FactsDigest, analyze_digest
         from models.multi_language_renderer import render_ai_diagram
 
         try:
-            all_facts = parse_folder_multi_language(target)
+            # Files are digested as they are parsed; their facts are not kept
+            digest = FactsDigest()
+            for language, facts in iter_folder_facts(target, jobs=jobs, verbose=True):
+                digest.add(language, facts)
 
             print("=== DEBUG: FILES FOUND ===")
-            for lang, facts_list in all_facts.items():
-                print(f"{lang}: {len(facts_list)} files")
+            for lang, count in digest.file_counts.items():
+                print(f"{lang}: {count} files")
             print("==========================")
             print()
 
             print("🤖 Running AI architecture analysis...")
-            result = analyze_with_gemini(all_facts)
+            result = analyze_digest(digest)
             render_ai_diagram(result)
             print("✓ Analysis complete")
         except Exception as e:
@@ -97,6 +127,26 @@ def main():
             traceback.print_exc()
             sys.exit(1)
 
+    elif mode == "--watch":
+        print(f"👀 HIRO watching folder: {target}")
+        print()
+
+        from models.incremental_parser import watch_folder
+        from models.multi_language_renderer import build_mermaid_multi_language
+
+        def write_diagram(all_facts):
+            Path("diagram.mmd").write_text(
+                build_mermaid_multi_language(all_facts), encoding="utf-8"
+            )
+
+        try:
+            watch_folder(target, on_change=write_diagram)
+        except Exception as e:
+            print(f"✗ Error: {e}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
     elif mode == "--github":
         print(f"🔍 HIRO analyzing GitHub repository: {target}")
         print()
@@ -135,7 +185,7 @@ def main():
             sys.exit(1)
 
         try:
-            all_facts = parse_github_repo(target)
+            all_facts = parse_github_repo(target, jobs=jobs, compact=True)
 
             print("=== DEBUG: FILES FOUND ===")
             for lang, facts_list in all_facts.items():
@@ -156,7 +206,7 @@ def main():
     else:
         print(f"✗ Unknown mode: {mode}")
         print()
-        print("Valid modes: --file, --folder, --github")
+        print("Valid modes: --file, --folder, --github, --watch")
         print("Run 'python mind.py' for help")
         sys.exit(1)
 
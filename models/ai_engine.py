@@ -1,47 +1,77 @@
 """
 AI Engine — Groq (llama-3.3-70b-versatile) — with truncation repair + retry
 Production-grade architecture analysis.
+
+Codebases with more files than one summary holds are analyzed map-reduce:
+partitioned by directory, one concurrent Groq call per partition, and the
+partial diagrams merged into one.
 """
 
 import os
 import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from groq import Groq
 from dotenv import load_dotenv
 from models.diagram_cache import get_cached, save_to_cache
+from models.env_config import env_int
+from models.file_facts import FactsStore
+from models.import_resolver import DependencyGraphBuilder
+from models.json_stream import JSONStreamParser
+from models.prompt_encoding import render_summary, render_with_stats
+from models.symbol_table import SymbolTable, facts_file
+from models.token_budget import DETAIL_LEVELS, plan_tokens
 
 load_dotenv()
 
 client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 MODEL  = "llama-3.3-70b-versatile"
 
-# Output token caps
-MAX_OUTPUT_TOKENS  = 8000
+# Output budgets are planned per call (models.token_budget)
 MAX_FILES_PER_LANG = 30   # hard cap per language in the summary sent to LLM
 
+# Map-reduce analysis
+#   HIRO_ANALYSIS_MODE  auto (map-reduce once a language has more files than
+#                       one summary holds) | single | map_reduce
+ANALYSIS_MODE      = os.getenv("HIRO_ANALYSIS_MODE", "auto")
+PARTITION_FILES    = env_int("HIRO_PARTITION_FILES", MAX_FILES_PER_LANG, minimum=1)
+GROQ_CONCURRENCY   = env_int("HIRO_GROQ_CONCURRENCY", 8, minimum=1)
+MERGE_MAX_TOKENS   = 1500
+
 
 # ─────────────────────────────────────────────────────────────────────
 # Summary builder
 # ─────────────────────────────────────────────────────────────────────
 
-def build_facts_summary(all_facts, aggressive=False):
+def build_facts_summary(all_facts, aggressive=False, symbols=None, dependencies=None,
+                        cap=None):
     """
     Converts raw extractor output into a compact JSON summary for the LLM.
 
     aggressive=True  →  strip methods/functions, keep only file names, roles,
                         classes, and direct dependencies. Used when the first
                         attempt truncates.
+    cap              →  files per language (default MAX_FILES_PER_LANG, 20
+                        when aggressive); the token planner lowers it.
+    symbols          →  the analysis' SymbolTable; when given, calls into other
+                        project files are listed with the file they land in.
+    dependencies     →  the file-level dependency graph; when given, each file
+                        lists the project files it imports (exact, resolved).
     """
     summary = {}
 
     for language, facts_list in all_facts.items():
         summary[language] = []
 
-        cap = MAX_FILES_PER_LANG if not aggressive else 20
-        for facts in facts_list[:cap]:
+        limit = cap or (MAX_FILES_PER_LANG if not aggressive else 20)
+        for facts in facts_list[:limit]:
             if not isinstance(facts, dict):
                 continue
 
             filename = facts.get("filename", "unknown")
+            directory = os.path.dirname(str(facts.get("filepath") or ""))
 
             if aggressive:
                 classes = []
@@ -54,7 +84,7 @@ def build_facts_summary(all_facts, aggressive=False):
                         "annotations": cls.get("annotations", [])[:3],
                         "dependencies": cls.get("dependencies", [])[:4],
                     })
-                file_summary = {"filename": filename}
+                file_summary = {"filename": filename, "dir": directory}
                 if classes:
                     file_summary["classes"] = classes
                 spring = facts.get("spring_patterns", {})
@@ -63,12 +93,17 @@ def build_facts_summary(all_facts, aggressive=False):
                 requires = facts.get("requires", [])[:4]
                 if requires:
                     file_summary["requires"] = requires
+                if dependencies is not None:
+                    imported = dependencies.get(facts_file(facts), [])
+                    if imported:
+                        file_summary["depends_on"] = [Path(f).name for f in imported[:4]]
                 summary[language].append(file_summary)
                 continue
 
             # Normal (non-aggressive) path
             file_summary = {
                 "filename": filename,
+                "dir":      directory,
                 "functions": facts.get("functions", [])[:8],
                 "requires":  facts.get("requires", [])[:6],
             }
@@ -105,6 +140,19 @@ def build_facts_summary(all_facts, aggressive=False):
             if calls:
                 file_summary["calls"] = calls[:8]
 
+            if dependencies is not None:
+                imported = dependencies.get(facts_file(facts), [])
+                if imported:
+                    file_summary["depends_on"] = [Path(f).name for f in imported[:6]]
+
+            if symbols is not None:
+                cross_calls = symbols.resolve_calls(facts, dependencies)
+                if cross_calls:
+                    file_summary["cross_file_calls"] = [
+                        {"from": c["from"], "to": c["to"], "file": c["filename"]}
+                        for c in cross_calls[:6]
+                    ]
+
             if any([
                 file_summary.get("functions"),
                 file_summary.get("classes"),
@@ -118,9 +166,80 @@ def build_facts_summary(all_facts, aggressive=False):
         if language in summary and not summary[language]:
             del summary[language]
 
+    _relative_dirs(summary)
     return summary
 
 
+def _relative_dirs(summary):
+    """
+    Makes each file's "dir" relative to the summary's common directory,
+    "/"-separated, and drops it for files directly in that directory.
+    """
+    files = [f for files in summary.values() for f in files]
+    dirs  = [f["dir"] for f in files if f.get("dir")]
+    try:
+        root = os.path.commonpath(dirs) if dirs else ""
+    except ValueError:   # absolute and relative paths mixed
+        root = ""
+    for file_summary in files:
+        directory = file_summary.pop("dir", "")
+        if directory and root:
+            directory = os.path.relpath(directory, root)
+        if directory and directory != ".":
+            # Keep "dir" right after "filename"
+            rest = {k: file_summary.pop(k) for k in list(file_summary) if k != "filename"}
+            file_summary["dir"] = directory.replace(os.sep, "/")
+            file_summary.update(rest)
+
+
+class FactsDigest:
+    """
+    What the analysis needs from a codebase's facts, fed one file at a time:
+    the symbol table, the dependency graph, and the files' facts. Unless
+    map-reduce is off (HIRO_ANALYSIS_MODE=single) or keep_all is False,
+    every file is kept for map-reduce, in a compact FactsStore; otherwise
+    only the first MAX_FILES_PER_LANG files of each language (all that one
+    build_facts_summary reads). Lets a streamed parse be analyzed without
+    holding every file's facts as dicts.
+    """
+
+    def __init__(self, keep_all=None):
+        if keep_all is None:
+            keep_all = ANALYSIS_MODE != "single"
+        self.keep_all    = keep_all
+        self.symbols     = SymbolTable()
+        self.all_facts   = FactsStore() if keep_all else {}   # language → facts
+        self.file_counts = {}   # language → files seen
+        self._graph      = DependencyGraphBuilder()
+        self._dependencies = None
+
+    def add(self, language, facts):
+        self.symbols.add_facts(facts, language)
+        self._graph.add(facts, language)
+        self._dependencies = None
+
+        if self.keep_all:
+            self.all_facts.add(facts, language)
+        else:
+            kept = self.all_facts.setdefault(language, [])
+            if len(kept) < MAX_FILES_PER_LANG:
+                kept.append(facts)
+        self.file_counts[language] = self.file_counts.get(language, 0) + 1
+
+    @property
+    def dependencies(self):
+        if self._dependencies is None:
+            self._dependencies = self._graph.build()
+        return self._dependencies
+
+    def summary(self, aggressive=False, cap=None):
+        return build_facts_summary(
+            self.all_facts, aggressive=aggressive,
+            symbols=None if aggressive else self.symbols,
+            dependencies=self.dependencies, cap=cap,
+        )
+
+
 def count_summary_files(summary):
     return sum(len(v) for v in summary.values())
 
@@ -133,7 +252,7 @@ SYSTEM_PROMPT = """You are a Principal Software Architect at a FAANG-level compa
 You have designed distributed systems, microservices, and enterprise backends for 20+ years.
 Your architecture diagrams are used in board presentations and system design reviews.
 
-You will receive a JSON summary of a codebase and must produce a world-class architecture diagram.
+You will receive a summary of a codebase and must produce a world-class architecture diagram.
 
 DIAGRAM RULES — NON NEGOTIABLE
 
@@ -218,107 +337,105 @@ def _extract_json_object(raw: str) -> str:
     return raw
 
 
-def _count_depth(text: str):
-    """Return (brace_depth, bracket_depth) of unclosed structures."""
-    depth_brace   = 0
-    depth_bracket = 0
-    in_string     = False
-    escape_next   = False
-
-    for ch in text:
-        if escape_next:
-            escape_next = False
-            continue
-        if ch == '\\' and in_string:
-            escape_next = True
-            continue
-        if ch == '"':
-            in_string = not in_string
-            continue
-        if in_string:
-            continue
-        if ch == '{':
-            depth_brace += 1
-        elif ch == '}':
-            depth_brace -= 1
-        elif ch == '[':
-            depth_bracket += 1
-        elif ch == ']':
-            depth_bracket -= 1
-
-    return depth_brace, depth_bracket
-
-
-def _attempt_truncation_repair(raw: str) -> dict:
-    """
-    When the model output is cut off mid-JSON (token limit hit), try to recover
-    a partial but valid result by closing all open structures.
-
-    Steps:
-      1. Try json.loads directly — return immediately if it works.
-      2. Trim back to the last complete object entry (last `},` or `}`).
-      3. Count unclosed braces/brackets and append closing chars.
-      4. If we get at least project_name + diagram.nodes, return the partial result.
+def _parsed_answer(parser: JSONStreamParser) -> dict:
     """
-    # Step 1 — direct parse
-    try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        pass
-
-    # Step 2 — trim trailing incomplete object
-    trimmed = raw.rstrip()
-    # Find the last position that ends a complete JSON object item
-    last_complete = max(trimmed.rfind("},"), trimmed.rfind("}\n"), trimmed.rfind("} "))
-    if last_complete != -1:
-        trimmed = trimmed[:last_complete + 1]
-
-    # Step 3 — close open structures
-    depth_brace, depth_bracket = _count_depth(trimmed)
-    closing = ("]" * max(depth_bracket, 0)) + ("}" * max(depth_brace, 0))
-    repaired = trimmed + closing
-
-    try:
-        result = json.loads(repaired)
-        print("  ⚠  Response was truncated — repaired partial JSON successfully.")
-        result.setdefault("project_name", "Analyzed Project")
-        result.setdefault("diagram", {})
-        result["diagram"].setdefault("nodes", [])
-        result["diagram"].setdefault("edges", [])
-        result.setdefault("description", {
-            "overview": (
-                "Analysis was truncated due to response length. "
-                "Run with --clear-cache and try again, or reduce the repo size."
-            ),
-            "components": [],
-            "architecture_pattern": "See diagram nodes for architecture details.",
-        })
-        return result
-    except json.JSONDecodeError:
-        pass
+    The model's answer from the parser that read it as it streamed in.
 
-    raise ValueError("Could not repair truncated JSON from model response.")
+    A complete answer is returned as is. One cut off mid-JSON (token limit
+    hit) or broken by a syntax error keeps every node, edge and component
+    written in full before that point — the parser knows exactly where each
+    ended, strings with braces in them included — and is used as a partial
+    result when at least one node survived.
+    """
+    if parser.done and isinstance(parser.root, dict):
+        return parser.root
+
+    result  = parser.partial()
+    diagram = result.get("diagram") if isinstance(result, dict) else None
+    if not isinstance(diagram, dict) or not diagram.get("nodes"):
+        reason = parser.error or "response ends before the first complete node"
+        raise ValueError(f"Could not repair truncated JSON from model response ({reason}).")
+
+    diagram.setdefault("edges", [])
+    print(f"  ⚠  Response was truncated — kept {len(diagram['nodes'])} complete nodes "
+          f"and {len(diagram['edges'])} edges.")
+    result.setdefault("project_name", "Analyzed Project")
+    result.setdefault("description", {
+        "overview": (
+            "Analysis was truncated due to response length. "
+            "Run with --clear-cache and try again, or reduce the repo size."
+        ),
+        "components": [],
+        "architecture_pattern": "See diagram nodes for architecture details.",
+    })
+    return result
 
 
 # ─────────────────────────────────────────────────────────────────────
 # Groq API call
 # ─────────────────────────────────────────────────────────────────────
 
-def _call_groq(summary: dict, max_tokens: int) -> dict:
-    """Single Groq API call. Returns parsed result dict."""
-    user_prompt = (
+def build_user_prompt(summary: dict, scope: str = None, rendered: str = None) -> str:
+    """
+    The user message for a summary. scope names the part of a larger
+    codebase the summary covers (map-reduce). rendered is the summary
+    already rendered by render_summary, when the caller has it.
+    """
+    if rendered is None:
+        rendered = render_summary(summary)
+    scope_note = ""
+    if scope is not None:
+        scope_note = (
+            f"This summary is one part ({scope}) of a larger codebase.\n"
+            "depends_on and cross_file_calls may name files outside this part:\n"
+            "do NOT add nodes for those files, they are analyzed separately.\n"
+        )
+    return (
         "Analyze this codebase summary and return the architecture JSON.\n"
         "Every file must be a node. Every dependency must be an edge.\n"
-        "All descriptions must be specific to THIS project.\n\n"
-        f"Codebase summary:\n{json.dumps(summary, indent=2)}\n\n"
+        "All descriptions must be specific to THIS project.\n"
+        f"{scope_note}\n"
+        f"Codebase summary:\n{rendered}\n\n"
         "Return ONLY the JSON object. No explanation. No markdown. No backticks."
     )
 
-    file_count = count_summary_files(summary)
-    print(f"  → Groq call: {file_count} files, max_tokens={max_tokens}")
 
+# Diagram items reported to on_event as soon as the model has written them
+DIAGRAM_ITEMS = {("diagram", "nodes"): "node", ("diagram", "edges"): "edge"}
+
+
+class AnalysisCancelled(Exception):
+    """
+    Raised by an on_event callback whose listener is gone. Closes the Groq
+    stream and ends the analysis instead of counting as a failed pass.
+    """
+
+
+def _call_groq(summary: dict, max_tokens: int, scope: str = None, plan=None,
+               on_event=None) -> dict:
+    """
+    Single Groq API call, streamed. Returns parsed result dict.
+    plan (a TokenPlan) gets the tokens the call actually used.
+    on_event(kind, item) gets each "node" and "edge" of the diagram as soon
+    as the model has finished writing it, long before the whole answer.
+    """
+    rendered, encoding = render_with_stats(summary)
+    user_prompt = build_user_prompt(summary, scope, rendered)
+    if plan is not None:
+        plan.encoding = encoding
+
+    file_count = count_summary_files(summary)
+    where = f" [{scope}]" if scope is not None else ""
+    print(f"  → Groq call{where}: {file_count} files, max_tokens={max_tokens}, "
+          f"summary ~{encoding['tokens']} tokens ({encoding['encoding']}, "
+          f"~{encoding['saved']} fewer than indented JSON)")
+
+    parser = JSONStreamParser(DIAGRAM_ITEMS)
+    pieces = []
+    usage  = finish_reason = None
+    stream = None
     try:
-        response = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model=MODEL,
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -326,82 +443,563 @@ def _call_groq(summary: dict, max_tokens: int) -> dict:
             ],
             temperature=0,
             max_tokens=max_tokens,
+            stream=True,
         )
+        for chunk in stream:
+            # Groq reports usage on the last chunk
+            x_groq = getattr(chunk, "x_groq", None)
+            if getattr(x_groq, "usage", None) is not None:
+                usage = x_groq.usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            text = choice.delta.content
+            if not text:
+                continue
+            pieces.append(text)
+            for path, item in parser.feed(text):
+                if on_event is not None and isinstance(item, dict):
+                    on_event(DIAGRAM_ITEMS[path], item)
+    except AnalysisCancelled:
+        if stream is not None:
+            stream.close()
+        raise
     except Exception as e:
         raise ValueError(f"Groq API error: {str(e)}")
 
-    raw = response.choices[0].message.content
-    if not raw:
+    if plan is not None:
+        plan.record_usage(usage, finish_reason)
+
+    if not "".join(pieces).strip():
         raise ValueError("Groq returned an empty response.")
-    raw = raw.strip()
-    raw = _strip_markdown(raw)
-    raw = _extract_json_object(raw)
 
-    return _attempt_truncation_repair(raw)
+    return _parsed_answer(parser)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Map-reduce analysis
+# ─────────────────────────────────────────────────────────────────────
+
+def partition_files(files, size=PARTITION_FILES):
+    """
+    Splits [(path, item), ...] into groups of at most `size` that follow the
+    directory tree (for Java, the package tree): a directory that fits stays
+    whole and is packed with its sibling directories, a bigger one is split
+    by its subdirectories. Returns [(directory, [item, ...]), ...] with
+    directories relative to the files' common root.
+    """
+    entries = sorted(((Path(path).parts, item) for path, item in files), key=lambda e: e[0])
+    if not entries:
+        return []
+    root_depth = len(os.path.commonprefix([parts[:-1] for parts, _ in entries]))
+
+    groups = []
+    _split_directory(entries, root_depth, size, groups)
+
+    names = []
+    for group in groups:
+        directory = os.path.commonprefix([parts[root_depth:-1] for parts, _ in group])
+        names.append("/".join(directory) or ".")
+
+    # A directory split into several groups numbers them: "src/api (2/3)"
+    totals, seen = Counter(names), Counter()
+    partitions = []
+    for name, group in zip(names, groups):
+        if totals[name] > 1:
+            seen[name] += 1
+            name = f"{name} ({seen[name]}/{totals[name]})"
+        partitions.append((name, [item for _, item in group]))
+    return partitions
+
+
+def _split_directory(entries, depth, size, groups):
+    subdirs = {}   # subdirectory at this depth (None: files directly here) → entries
+    for entry in entries:
+        parts  = entry[0]
+        subdir = parts[depth] if depth < len(parts) - 1 else None
+        subdirs.setdefault(subdir, []).append(entry)
+
+    pack = []
+    for subdir, group in subdirs.items():
+        if len(group) > size:
+            if subdir is not None:
+                _split_directory(group, depth + 1, size, groups)
+            else:
+                groups.extend(group[start:start + size] for start in range(0, len(group), size))
+            continue
+        if pack and len(pack) + len(group) > size:
+            groups.append(pack)
+            pack = []
+        pack.extend(group)
+    if pack:
+        groups.append(pack)
+
+
+class Partition:
+    """One directory group of a map-reduce analysis and its partial result."""
+
+    def __init__(self, name, items):
+        self.name    = name
+        self.items   = items   # (language, index into digest.all_facts[language])
+        self.summary = {}
+        self.files   = []      # summarized files: (path, filename, class names, language)
+        self.plan    = None
+        self.result  = None
+
+    def facts(self, digest):
+        all_facts = {}
+        for language, index in self.items:
+            all_facts.setdefault(language, []).append(digest.all_facts[language][index])
+        return all_facts
+
+    def summarize(self, digest, aggressive=False):
+        all_facts = self.facts(digest)
+        summary = build_facts_summary(
+            all_facts, aggressive=aggressive,
+            symbols=None if aggressive else digest.symbols,
+            dependencies=digest.dependencies, cap=len(self.items),
+        )
+        if not aggressive:
+            self.summary = summary
+            summarized = {f["filename"] for files in summary.values() for f in files}
+            self.files = [
+                (facts_file(facts), facts.get("filename", "unknown"),
+                 [c.get("name") for c in facts.get("classes", []) if isinstance(c, dict)],
+                 language)
+                for language, facts_list in all_facts.items()
+                for facts in facts_list
+                if facts.get("filename", "unknown") in summarized
+            ]
+        return summary
+
+
+def plan_partitions(digest, size=PARTITION_FILES):
+    """The digest's files partitioned by directory, each with its summary."""
+    files = []
+    for language, facts_list in digest.all_facts.items():
+        for index, file_facts in enumerate(facts_list.files):
+            if file_facts.path_id is not None:
+                path = digest.all_facts.path(file_facts.path_id)
+            else:
+                path = facts_list[index].get("filename", "unknown")
+            files.append((path, (language, index)))
+
+    partitions = [Partition(name, items) for name, items in partition_files(files, size)]
+    for partition in partitions:
+        partition.summarize(digest)
+    return [p for p in partitions if p.summary]
+
+
+def _scoped_events(on_event, prefix):
+    """
+    on_event for one partition's calls: node ids get the partition's prefix,
+    so partial diagrams of concurrent partitions do not collide.
+    """
+    if on_event is None:
+        return None
+
+    def scoped(kind, item):
+        if kind == "node":
+            item = dict(item, id=f"{prefix}{item.get('id')}")
+        elif kind == "edge":
+            item = dict(item, **{"from": f"{prefix}{item.get('from')}",
+                                 "to":   f"{prefix}{item.get('to')}"})
+        elif kind == "retry":
+            item = {"prefix": prefix}
+        on_event(kind, item)
+    return scoped
+
+
+def _analyze_partition(partition, digest, on_event=None):
+    """
+    Map step: one partition's diagram, or None when every pass fails.
+    Each pass's summary detail and output budget come from the token planner.
+    """
+    cap = len(partition.items)
+
+    def summarize(aggressive, file_cap):
+        return partition.summarize(digest, aggressive=True) if aggressive else partition.summary
+
+    def render(summary):
+        return SYSTEM_PROMPT + build_user_prompt(summary, partition.name)
+
+    plan, summary = plan_tokens(summarize, render, [(False, cap), (True, cap)])
+    partition.plan = plan
+    try:
+        return _call_groq(summary, plan.max_tokens, scope=partition.name, plan=plan,
+                          on_event=on_event)
+    except ValueError as e:
+        print(f"  ⚠  [{partition.name}] Pass 1 failed: {e}")
+
+    if on_event is not None:
+        on_event("retry", None)
+    retry, small_summary = plan_tokens(summarize, render, [(True, cap)])
+    if plan.aggressive:
+        retry.max_tokens = max(retry.max_tokens, plan.retry_max_tokens())
+    partition.plan = retry
+    try:
+        return _call_groq(small_summary, retry.max_tokens, scope=partition.name, plan=retry,
+                          on_event=on_event)
+    except ValueError as e:
+        print(f"  ⚠  [{partition.name}] Pass 2 failed: {e} — using parsed structure only")
+    return None
+
+
+def _label_key(label):
+    return str(label).strip().lower()
+
+
+def merge_partial_results(partitions, dependencies=None):
+    """
+    Reduce step: one diagram from the partitions' partial results.
+      - nodes for a partition's own files stay per partition; every other
+        node (inferred infrastructure: Database, SMTP Server, ...) is merged
+        across partitions by label
+      - node ids are renumbered, edges remapped and de-duplicated
+      - a summarized file no partial result has a node for gets one, so
+        coverage is complete even where a partition failed
+      - imports between files of different partitions, which no single
+        call saw both ends of, become edges
+    """
+    nodes, edges = [], []
+    shared     = {}      # label key → node, for nodes not owned by a partition
+    edge_keys  = set()
+    path_nodes = {}      # file path → (node id, partition index)
+    components = {}
+
+    def add_edge(source, target, label):
+        if source is None or target is None or source == target or (source, target) in edge_keys:
+            return
+        edge_keys.add((source, target))
+        edges.append({"from": source, "to": target, "label": label})
+
+    def add_node(node):
+        node = dict(node, id=f"n{len(nodes) + 1}")
+        nodes.append(node)
+        return node
+
+    for index, partition in enumerate(partitions):
+        own_labels = set()
+        for _, filename, classes, _ in partition.files:
+            own_labels.update(_label_key(name) for name in [filename, Path(filename).stem, *classes] if name)
+
+        diagram = (partition.result or {}).get("diagram", {})
+        local   = {}   # partial result's node id → merged node id
+        owned   = {}   # label key → merged node id, this partition's files
+        for node in diagram.get("nodes", []):
+            if not isinstance(node, dict) or not node.get("label"):
+                continue
+            key = _label_key(node["label"])
+            if key in own_labels:
+                if key not in owned:
+                    owned[key] = add_node(node)["id"]
+                local[node.get("id")] = owned[key]
+            else:
+                if key not in shared:
+                    shared[key] = add_node(node)
+                local[node.get("id")] = shared[key]["id"]
+
+        for edge in diagram.get("edges", []):
+            if isinstance(edge, dict):
+                add_edge(local.get(edge.get("from")), local.get(edge.get("to")),
+                         edge.get("label", "depends on"))
+
+        for path, filename, classes, language in partition.files:
+            keys = [_label_key(name) for name in [filename, Path(filename).stem, *classes] if name]
+            node_id = next((owned[key] for key in keys if key in owned), None)
+            if node_id is None:
+                node_id = add_node({
+                    "label":       filename,
+                    "role":        "utility",
+                    "language":    language,
+                    "description": f"{filename} in {Path(path).parent.name or '.'}/",
+                })["id"]
+                owned[_label_key(filename)] = node_id
+            path_nodes[path] = (node_id, index)
+
+        for component in (partition.result or {}).get("description", {}).get("components", []):
+            if isinstance(component, dict) and component.get("name"):
+                components.setdefault(_label_key(component["name"]), component)
+
+    for path, targets in (dependencies or {}).items():
+        source = path_nodes.get(path)
+        if source is None:
+            continue
+        for target in targets:
+            target = path_nodes.get(target)
+            if target is None:
+                continue
+            # Within a partition its call drew the edges, unless it failed
+            if target[1] != source[1] or partitions[source[1]].result is None:
+                add_edge(source[0], target[0], "imports")
+
+    return {
+        "diagram":     {"nodes": nodes, "edges": edges},
+        "description": {"components": list(components.values())},
+    }
+
+
+MERGE_PROMPT = """You are a Principal Software Architect. Below are partial analyses of the
+parts of ONE codebase, each covering one directory. Write the analysis of the
+whole codebase from them.
+
+Return ONLY valid JSON, no markdown, no backticks:
+{
+  "project_name": "Full descriptive project name",
+  "overview": "4 sentences: what, who, stack, key capabilities",
+  "architecture_pattern": "3+ sentences: pattern name, data flow with real filenames, layer responsibilities"
+}"""
+
+
+def _merge_descriptions(partitions, merged):
+    """The whole codebase's project name, overview and pattern from the partial ones."""
+    parts = []
+    for partition in partitions:
+        if partition.result is None:
+            continue
+        description = partition.result.get("description", {})
+        parts.append({
+            "part":                 partition.name,
+            "project_name":         partition.result.get("project_name"),
+            "overview":             str(description.get("overview", ""))[:600],
+            "architecture_pattern": str(description.get("architecture_pattern", ""))[:600],
+        })
+    roles = Counter(node.get("role", "module") for node in merged["diagram"]["nodes"])
+
+    names = Counter(part["project_name"] for part in parts if part["project_name"])
+    fallback = {
+        "project_name":         names.most_common(1)[0][0] if names else "Analyzed Project",
+        "overview":             " ".join(part["overview"] for part in parts[:3]),
+        "architecture_pattern": " ".join(part["architecture_pattern"] for part in parts[:3]),
+    }
+    if not parts:
+        return fallback
+
+    try:
+        response = client.chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": MERGE_PROMPT},
+                {"role": "user",   "content": json.dumps({"parts": parts, "node_roles": roles},
+                                                         separators=(",", ":"))},
+            ],
+            temperature=0,
+            max_tokens=MERGE_MAX_TOKENS,
+        )
+        raw    = _extract_json_object(_strip_markdown((response.choices[0].message.content or "").strip()))
+        result = json.loads(raw)
+    except Exception as e:
+        print(f"  ⚠  Merging descriptions failed: {e} — using the partial ones")
+        return fallback
+
+    return {key: result.get(key) or value for key, value in fallback.items()}
+
+
+def analyze_map_reduce(digest, on_event=None):
+    """
+    Map-reduce analysis of a FactsDigest that kept every file: one Groq call
+    per directory partition, GROQ_CONCURRENCY at a time, then one merged
+    diagram covering every summarized file. Wall-clock time is that of the
+    slowest batch of calls plus a small merge call, not that of one huge
+    call, and no file is left out of the summary. on_event gets the
+    partitions' nodes and edges as they stream in, ids prefixed "p<n>_".
+    """
+    partitions = plan_partitions(digest)
+    if not partitions:
+        raise ValueError("No analyzable content found in the codebase.")
+
+    cache_key = {"map_reduce": [[p.name, p.summary] for p in partitions]}
+    cached = _get_cached(cache_key)
+    if cached is not None:
+        return cached
+
+    file_count = sum(len(p.files) for p in partitions)
+    workers    = max(1, min(GROQ_CONCURRENCY, len(partitions)))
+    print(f"Sending to Groq ({MODEL})... ({file_count} files in "
+          f"{len(partitions)} partitions, {workers} concurrent calls)")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            lambda indexed: _analyze_partition(
+                indexed[1], digest, _scoped_events(on_event, f"p{indexed[0]}_")),
+            enumerate(partitions),
+        )
+        for partition, result in zip(partitions, results):
+            partition.result = result
+
+    failed = [p.name for p in partitions if p.result is None]
+    if len(failed) == len(partitions):
+        raise ValueError("All Groq partition calls failed.")
+
+    result = merge_partial_results(partitions, digest.dependencies)
+    summary = _merge_descriptions(partitions, result)
+    result["project_name"] = summary["project_name"]
+    result["description"]["overview"] = summary["overview"]
+    result["description"]["architecture_pattern"] = summary["architecture_pattern"]
+    result["analysis"] = {
+        "mode":              "map_reduce",
+        "partitions":        len(partitions),
+        "failed_partitions": failed,
+        "files":             file_count,
+        "seconds":           round(time.perf_counter() - started, 2),
+        "cached":            False,
+        "tokens_saved":      sum(p.plan.encoding["saved"] for p in partitions
+                                 if p.plan is not None and p.plan.encoding),
+        "plans":             [dict(p.plan.as_dict(), partition=p.name) for p in partitions],
+    }
+    print(f"  ✓ Merged {len(partitions)} partitions: {len(result['diagram']['nodes'])} nodes, "
+          f"{len(result['diagram']['edges'])} edges in {result['analysis']['seconds']}s")
+
+    # Only complete results are cached; a failed partition is retried next time
+    if not failed:
+        save_to_cache(cache_key, result)
+    return result
+
+
+def _get_cached(key):
+    """A cached result, marked as coming from the cache."""
+    cached = get_cached(key)
+    if cached is not None:
+        cached.setdefault("analysis", {})["cached"] = True
+    return cached
+
+
+def _use_map_reduce(digest):
+    if not digest.keep_all or ANALYSIS_MODE == "single":
+        return False
+    if ANALYSIS_MODE == "map_reduce":
+        return True
+    return any(count > MAX_FILES_PER_LANG for count in digest.file_counts.values())
 
 
 # ─────────────────────────────────────────────────────────────────────
 # Public entrypoint
 # ─────────────────────────────────────────────────────────────────────
 
-def analyze_with_gemini(all_facts):
+def analyze_with_gemini(all_facts, on_event=None):
     """
     Sends facts to Groq llama-3.3-70b, returns structured architecture result.
     Results are cached by codebase hash — same repo always returns the same diagram.
 
-    Retry strategy:
-      Pass 1 — normal summary,     max_tokens=8 000
-      Pass 2 — normal summary,     max_tokens=16 000  (bigger output budget)
-      Pass 3 — aggressive summary, max_tokens=8 000   (fewer files, bare-minimum data)
+    Retry strategy (models.token_budget sizes every pass up front):
+      Pass 1 — the most detailed summary whose prompt and expected output
+               fit the model's limits, max_tokens from the expected output
+      Pass 2 — same summary, doubled output budget (when the limits allow)
+      Pass 3 — the next smaller aggressive summary (bare-minimum data)
+    The plan is returned in result["analysis"].
+
+    Codebases too big for one summary go through analyze_map_reduce instead.
+
+    on_event(kind, item) follows the answer as it streams in: "node" and
+    "edge" for each diagram item once complete, "retry" when a failed pass
+    is retried and the items it sent are void (item: {"prefix": ...} for
+    one map-reduce partition's, None for all). on_event raises
+    AnalysisCancelled to stop the analysis; it propagates from here.
     """
-    summary = build_facts_summary(all_facts, aggressive=False)
+    return analyze_facts_stream(
+        ((language, facts)
+         for language, facts_list in all_facts.items()
+         for facts in facts_list),
+        on_event=on_event,
+    )
+
+
+def analyze_facts_stream(facts_stream, on_event=None, keep_all=None):
+    """
+    analyze_with_gemini over (language, facts) pairs as they are parsed —
+    e.g. iter_folder_facts — keeping only a FactsDigest of them (see
+    FactsDigest for keep_all).
+    """
+    digest = FactsDigest(keep_all)
+    for language, facts in facts_stream:
+        digest.add(language, facts)
+    return analyze_digest(digest, on_event=on_event)
+
+
+def analyze_digest(digest, on_event=None):
+    """
+    The Groq analysis of a filled FactsDigest: map-reduce when its files do
+    not fit one summary (see HIRO_ANALYSIS_MODE), a single summary otherwise.
+    """
+    if _use_map_reduce(digest):
+        return analyze_map_reduce(digest, on_event=on_event)
+
+    summary = digest.summary()
 
     if not summary:
         raise ValueError("No analyzable content found in the codebase.")
 
     # ── Cache check ───────────────────────────────────────────
-    cached = get_cached(summary)
+    cached = _get_cached(summary)
     if cached is not None:
         return cached
 
-    file_count = count_summary_files(summary)
-    print(f"Sending to Groq ({MODEL})... ({file_count} files in summary)")
+    def summarize(aggressive, cap):
+        return digest.summary(aggressive=aggressive, cap=cap)
+
+    def render(summary):
+        return SYSTEM_PROMPT + build_user_prompt(summary)
+
+    plan, planned = plan_tokens(summarize, render)
+    print(f"Sending to Groq ({MODEL})... ({plan.files} files in summary)")
+    print(f"  Token plan: {plan.describe()}")
 
     result     = None
     last_error = None
+    passes     = 1
 
-    # Pass 1
+    # Pass 1 — the planned summary and output budget
     try:
-        result = _call_groq(summary, max_tokens=MAX_OUTPUT_TOKENS)
+        result = _call_groq(planned, plan.max_tokens, plan=plan, on_event=on_event)
     except ValueError as e:
         last_error = e
         print(f"  ⚠  Pass 1 failed: {e}")
 
-    # Pass 2 — bigger output window
-    if result is None:
-        print("  Retrying with larger output budget (16 000 tokens)...")
+    # Pass 2 — bigger output window, if the limits leave room for one
+    bigger = plan.retry_max_tokens()
+    if result is None and bigger > plan.max_tokens:
+        passes += 1
+        print(f"  Retrying with larger output budget ({bigger} tokens)...")
+        if on_event is not None:
+            on_event("retry", None)
         try:
-            result = _call_groq(summary, max_tokens=16000)
+            result = _call_groq(planned, bigger, plan=plan, on_event=on_event)
+            plan.max_tokens = bigger
         except ValueError as e:
             last_error = e
             print(f"  ⚠  Pass 2 failed: {e}")
 
-    # Pass 3 — compress the input
+    # Pass 3 — compress the input: the next smaller aggressive level
     if result is None:
+        passes += 1
         print("  Retrying with compressed summary (aggressive trim)...")
-        small_summary = build_facts_summary(all_facts, aggressive=True)
+        level     = DETAIL_LEVELS.index((plan.aggressive, plan.file_cap))
+        remaining = [l for l in DETAIL_LEVELS[level + 1:] if l[0]] or DETAIL_LEVELS[-1:]
+        plan, small_summary = plan_tokens(summarize, render, remaining)
+        print(f"  Token plan: {plan.describe()}")
+        if on_event is not None:
+            on_event("retry", None)
         try:
-            result = _call_groq(small_summary, max_tokens=MAX_OUTPUT_TOKENS)
+            result = _call_groq(small_summary, plan.max_tokens, plan=plan, on_event=on_event)
         except ValueError as e:
             last_error = e
-            print(f"  ⚠  Pass 3 failed: {e}")
+            print(f"  ⚠  Pass {passes} failed: {e}")
 
     if result is None:
         raise ValueError(
             f"All Groq retry attempts failed.\nLast error: {last_error}"
         )
 
+    result["analysis"] = {
+        "mode":   "single",
+        "passes": passes,
+        "cached": False,
+        "plan":   plan.as_dict(),
+    }
+
     # ── Cache successful result ───────────────────────────────
     save_to_cache(summary, result)
 
-    return result
\ No newline at end of file
+    return result
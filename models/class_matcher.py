@@ -0,0 +1,162 @@
+"""
+Class Name Matcher for the folder parser's dependency heuristics
+Matches __init__ arguments, method parameters and self.<attr> names
+against every known class name. The substring rules are the same as the
+original per-class loops, but the class names are indexed once, so each
+lookup costs about the length of the identifier, not the number of classes.
+"""
+
+from bisect import bisect_left
+from functools import cached_property
+
+
+# Suffixes dropped from class names before matching — "studentservice"
+# is matched as "student"
+INIT_ARG_SUFFIXES   = ["service", "manager", "repository", "controller"]
+SELF_ATTR_SUFFIXES  = ["service", "manager", "repository"]
+
+# Parameter-name matching ignores short class names to avoid false
+# positives like "car"
+MIN_PARAM_CLASS_LENGTH = 6
+
+
+def strip_suffixes(class_lower, suffixes):
+    stripped = class_lower
+    for suffix in suffixes:
+        stripped = stripped.replace(suffix, "").strip()
+    return stripped
+
+
+class SubstringIndex:
+    """
+    A fixed set of (key, value) pairs that answers, for any text:
+    - found_in(text):   values whose key occurs inside text (a trie walked
+                        from every start position of text)
+    - containing(text): values whose key contains text (a sorted list of
+                        every suffix of every key, searched with bisect)
+    """
+
+    _END = object()
+
+    def __init__(self, pairs):
+        self._trie = {}
+        self._values = set()
+        suffixes = []
+        for key, value in pairs:
+            self._values.add(value)
+            node = self._trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node.setdefault(self._END, []).append(value)
+            for start in range(len(key)):
+                suffixes.append((key[start:], value))
+
+        suffixes.sort()
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._owners   = [value for _, value in suffixes]
+
+    def found_in(self, text):
+        found = set(self._trie.get(self._END, ()))
+        for start in range(len(text)):
+            node = self._trie
+            for char in text[start:]:
+                node = node.get(char)
+                if node is None:
+                    break
+                if self._END in node:
+                    found.update(node[self._END])
+        return found
+
+    def containing(self, text):
+        if not text:
+            return set(self._values)
+        lo = bisect_left(self._suffixes, text)
+        # Every string starting with `text` sorts before text + U+10FFFF
+        hi = bisect_left(self._suffixes, text + "\U0010ffff", lo)
+        return set(self._owners[lo:hi])
+
+
+class ClassNameMatcher:
+    """
+    Built once per set of class names (a project or a file). Every match_*
+    method returns matching class names in the order of the names given,
+    the same order the old loops over the class list produced.
+    """
+
+    def __init__(self, class_names):
+        self._rank = {}
+        for name in class_names:
+            self._rank.setdefault(name, len(self._rank))
+
+    def _ordered(self, names):
+        return sorted(names, key=self._rank.__getitem__)
+
+    def _lowered(self):
+        return [(name.lower(), name) for name in self._rank]
+
+    @cached_property
+    def _lower_index(self):
+        return SubstringIndex(self._lowered())
+
+    @cached_property
+    def _init_index(self):
+        return SubstringIndex(
+            (strip_suffixes(lower, INIT_ARG_SUFFIXES), name)
+            for lower, name in self._lowered()
+        )
+
+    @cached_property
+    def _attr_index(self):
+        return SubstringIndex(
+            (strip_suffixes(lower, SELF_ATTR_SUFFIXES), name)
+            for lower, name in self._lowered()
+        )
+
+    @cached_property
+    def _param_index(self):
+        return SubstringIndex(
+            (lower.rstrip("s"), name)
+            for lower, name in self._lowered()
+            if len(lower) >= MIN_PARAM_CLASS_LENGTH
+        )
+
+    @cached_property
+    def _param_exact(self):
+        exact = {}
+        for lower, name in self._lowered():
+            if len(lower) >= MIN_PARAM_CLASS_LENGTH:
+                exact.setdefault(lower, []).append(name)
+        return exact
+
+    def match_param(self, arg_name):
+        """
+        Classes hinted at by a method parameter name (lowercase): the class
+        name without trailing s occurs in it, or the class name equals it.
+        Class names shorter than 6 characters never match.
+        """
+        found = self._param_index.found_in(arg_name)
+        found.update(self._param_exact.get(arg_name, ()))
+        return self._ordered(found)
+
+    def match_init_arg(self, arg_name):
+        """
+        Classes an __init__ argument (lowercase) may inject: the argument and
+        the class name, with or without its service/manager/repository/
+        controller suffix, contain one another.
+        """
+        found = self._lower_index.containing(arg_name)
+        found |= self._lower_index.found_in(arg_name)
+        found |= self._init_index.found_in(arg_name)
+        found |= self._init_index.containing(arg_name)
+        return self._ordered(found)
+
+    def match_self_attr(self, attr_name):
+        """
+        Classes a self.<attr> name (lowercase) may refer to: the attribute
+        occurs in the class name, or the class name without its
+        service/manager/repository suffix and the attribute contain one another.
+        """
+        found = self._lower_index.containing(attr_name)
+        found |= self._attr_index.found_in(attr_name)
+        found |= self._attr_index.containing(attr_name)
+        return self._ordered(found)
@@ -0,0 +1,46 @@
+"""
+Env Config — validated numeric HIRO_* settings
+Modules read their limits once, at import. A value that is not a number,
+or is out of range, falls back to the default with a warning: a typo in
+one setting must not stop every module (and the API) that imports it.
+"""
+
+import math
+import os
+
+
+def env_int(name, default, minimum=None):
+    """The integer in environment variable `name`, at least `minimum`."""
+    return _read(name, default, int, minimum, None,
+                 "an integer" if minimum is None else f"an integer of at least {minimum}")
+
+
+def env_float(name, default, minimum=None, above=None):
+    """
+    The number in environment variable `name`, at least `minimum` and
+    greater than `above` when given.
+    """
+    if above is not None:
+        expected = f"a number greater than {above}"
+    elif minimum is not None:
+        expected = f"a number of at least {minimum}"
+    else:
+        expected = "a number"
+    return _read(name, default, float, minimum, above, expected)
+
+
+def _read(name, default, parse, minimum, above, expected):
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = parse(raw.strip())
+    except ValueError:
+        value = None
+    if (value is None
+            or (isinstance(value, float) and not math.isfinite(value))
+            or (minimum is not None and value < minimum)
+            or (above is not None and value <= above)):
+        print(f"⚠  {name} expects {expected}, got '{raw}' — using {default}")
+        return default
+    return value
@@ -9,11 +9,16 @@ from models.extractors.ts_extractor import extract_typescript
 from models.extractors.html_extractor import extract_html
 from models.extractors.css_extractor import extract_css
 
+# Bump whenever any extractor's output changes — cached per-file facts
+# are keyed on this, so old entries stop matching.
+EXTRACTOR_VERSION = 3
+
 __all__ = [
     'extract_python',
     'extract_java',
     'extract_javascript',
     'extract_typescript',
     'extract_html',
-    'extract_css'
+    'extract_css',
+    'EXTRACTOR_VERSION'
 ]
\ No newline at end of file
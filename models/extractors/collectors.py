@@ -0,0 +1,36 @@
+"""
+Ordered, set-backed collectors for the extractors
+Facts stay plain lists in first-seen order; the set only answers "seen
+this already?" so deduplication costs O(1) per item instead of a list scan.
+"""
+
+
+class OrderedSet:
+    """
+    Appends items to a list once each, in first-seen order.
+
+    Pass the facts list to fill as `items` so the facts keep their usual
+    list shape. Unhashable items (like call dicts) need a hashable `key`.
+    """
+
+    def __init__(self, items=None):
+        self.items = [] if items is None else items
+        self._seen = set(self.items)
+
+    def add(self, item, key=None):
+        """Append item unless its key was seen. Returns True if appended."""
+        key = item if key is None else key
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self.items.append(item)
+        return True
+
+    def __contains__(self, key):
+        return key in self._seen
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
@@ -3,6 +3,27 @@ CSS Extractor using Tree-sitter
 """
 
 from models.universe_parser import get_node_text
+from models.extractors.query_engine import run_pack
+from models.extractors.collectors import OrderedSet
+
+
+CSS_PACK = """
+(class_selector
+  (class_name) @class.name) @class
+
+(id_selector
+  (id_name) @id.name) @id
+
+(tag_name) @tag
+
+(rule_set
+  (block
+    (declaration) @declaration))
+
+(media_statement) @media
+
+(keyframes_statement) @keyframes
+"""
 
 
 def extract_css(tree, code):
@@ -14,62 +35,51 @@ def extract_css(tree, code):
         'selectors': [],
         'properties': []
     }
+    classes       = OrderedSet(facts['classes'])
+    ids           = OrderedSet(facts['ids'])
+    selectors     = OrderedSet(facts['selectors'])
+    properties    = OrderedSet(facts['properties'])
+    media_queries = OrderedSet(facts['media_queries'])
 
-    root = tree.root_node
+    for kind, captures in run_pack(CSS_PACK, tree):
+        node = captures[kind]
 
-    def walk(node):
         # Class selectors
-        if node.type == 'class_selector':
-            for child in node.children:
-                if child.type == 'class_name':
-                    class_name = get_node_text(child, code)
-                    if class_name not in facts['classes']:
-                        facts['classes'].append(class_name)
+        if kind == 'class':
+            class_name = get_node_text(captures['class.name'], code)
+            classes.add(class_name)
 
         # ID selectors
-        elif node.type == 'id_selector':
-            for child in node.children:
-                if child.type == 'id_name':
-                    id_name = get_node_text(child, code)
-                    if id_name not in facts['ids']:
-                        facts['ids'].append(id_name)
+        elif kind == 'id':
+            id_name = get_node_text(captures['id.name'], code)
+            ids.add(id_name)
 
         # Tag/element selectors — catch plain CSS like body, h1, p
-        elif node.type == 'tag_name':
+        elif kind == 'tag':
             tag = get_node_text(node, code)
-            if tag and tag not in facts['selectors']:
-                facts['selectors'].append(tag)
-
-        # Rule sets — extract property names
-        elif node.type == 'rule_set':
-            for child in node.children:
-                if child.type == 'block':
-                    for block_child in child.children:
-                        if block_child.type == 'declaration':
-                            prop_node = block_child.child_by_field_name('property')
-                            if prop_node:
-                                prop = get_node_text(prop_node, code)
-                                if prop and prop not in facts['properties']:
-                                    facts['properties'].append(prop)
+            if tag:
+                selectors.add(tag)
+
+        # Rule set declarations — extract property names
+        elif kind == 'declaration':
+            prop_node = node.child_by_field_name('property')
+            if prop_node:
+                prop = get_node_text(prop_node, code)
+                if prop:
+                    properties.add(prop)
 
         # Media queries
-        elif node.type == 'media_statement':
+        elif kind == 'media':
             media_text = get_node_text(node, code)
             if '{' in media_text:
                 media_query = media_text.split('{')[0].strip()
-                if media_query not in facts['media_queries']:
-                    facts['media_queries'].append(media_query)
+                media_queries.add(media_query)
 
         # Keyframes
-        elif node.type == 'keyframes_statement':
+        elif kind == 'keyframes':
             name_node = node.child_by_field_name('name')
             if name_node:
                 anim_name = get_node_text(name_node, code)
                 facts['animations'].append(anim_name)
 
-        for child in node.children:
-            walk(child)
-
-    walk(root)
-
     return facts
\ No newline at end of file
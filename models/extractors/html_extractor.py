@@ -2,7 +2,18 @@
 HTML Extractor using Tree-sitter
 """
 
-from models.universe_parser import get_node_text
+from models.universe_parser import get_node_text, iter_children
+from models.extractors.query_engine import run_pack
+from models.extractors.collectors import OrderedSet
+
+
+HTML_PACK = """
+(element
+  [
+    (start_tag (tag_name) @element.tag)
+    (self_closing_tag (tag_name) @element.tag)
+  ]) @element
+"""
 
 
 def extract_html(tree, code):
@@ -16,20 +27,10 @@ def extract_html(tree, code):
         'all_tags': []
     }
 
-    root = tree.root_node
-
-    def get_tag_name(element_node):
-        for child in element_node.children:
-            if child.type in ['start_tag', 'self_closing_tag']:
-                for tag_child in child.children:
-                    if tag_child.type == 'tag_name':
-                        return get_node_text(tag_child, code)
-        return None
-
     def get_attribute(element_node, attr_name):
-        for child in element_node.children:
+        for child in iter_children(element_node):
             if child.type in ['start_tag', 'self_closing_tag']:
-                for attr_child in child.children:
+                for attr_child in iter_children(child):
                     if attr_child.type == 'attribute':
                         name_node = attr_child.child_by_field_name('name')
                         if name_node and get_node_text(name_node, code) == attr_name:
@@ -38,64 +39,59 @@ def extract_html(tree, code):
                                 return get_node_text(value_node, code).strip('"\'')
         return None
 
-    def walk(node):
-        if node.type == 'element':
-            tag_name = get_tag_name(node)
-
-            if tag_name:
-                # Track ALL tags so we always have something to show
-                if tag_name not in facts['all_tags']:
-                    facts['all_tags'].append(tag_name)
-
-                # Semantic structural elements
-                if tag_name in ['header', 'nav', 'main', 'section', 'article', 'aside', 'footer', 'div', 'body', 'html']:
-                    if tag_name not in facts['structure']:
-                        facts['structure'].append(tag_name)
-
-                # Script tags
-                if tag_name == 'script':
-                    src = get_attribute(node, 'src')
-                    if src:
-                        facts['scripts'].append(src)
-                    else:
-                        # Inline script — still note it
-                        if 'inline_script' not in facts['scripts']:
-                            facts['scripts'].append('inline_script')
-
-                # Stylesheets
-                if tag_name == 'link':
-                    rel = get_attribute(node, 'rel')
-                    if rel == 'stylesheet':
-                        href = get_attribute(node, 'href')
-                        if href:
-                            facts['stylesheets'].append(href)
-
-                # Anchor links
-                if tag_name == 'a':
-                    href = get_attribute(node, 'href')
-                    if href:
-                        facts['links'].append(href)
-
-                # Title
-                if tag_name == 'title':
-                    for child in node.children:
-                        if child.type == 'text':
-                            title_text = get_node_text(child, code).strip()
-                            if title_text:
-                                facts['titles'].append(title_text)
-
-                # Forms
-                if tag_name == 'form':
-                    action = get_attribute(node, 'action') or ''
-                    method = get_attribute(node, 'method') or 'GET'
-                    facts['forms'].append({
-                        'action': action,
-                        'method': method
-                    })
-
-        for child in node.children:
-            walk(child)
-
-    walk(root)
+    all_tags  = OrderedSet(facts['all_tags'])
+    structure = OrderedSet(facts['structure'])
+
+    for _, captures in run_pack(HTML_PACK, tree):
+        node     = captures['element']
+        tag_name = get_node_text(captures['element.tag'], code)
+
+        # Track ALL tags so we always have something to show
+        all_tags.add(tag_name)
+
+        # Semantic structural elements
+        if tag_name in ['header', 'nav', 'main', 'section', 'article', 'aside', 'footer', 'div', 'body', 'html']:
+            structure.add(tag_name)
+
+        # Script tags
+        if tag_name == 'script':
+            src = get_attribute(node, 'src')
+            if src:
+                facts['scripts'].append(src)
+            else:
+                # Inline script — still note it
+                if 'inline_script' not in facts['scripts']:
+                    facts['scripts'].append('inline_script')
+
+        # Stylesheets
+        if tag_name == 'link':
+            rel = get_attribute(node, 'rel')
+            if rel == 'stylesheet':
+                href = get_attribute(node, 'href')
+                if href:
+                    facts['stylesheets'].append(href)
+
+        # Anchor links
+        if tag_name == 'a':
+            href = get_attribute(node, 'href')
+            if href:
+                facts['links'].append(href)
+
+        # Title
+        if tag_name == 'title':
+            for child in iter_children(node):
+                if child.type == 'text':
+                    title_text = get_node_text(child, code).strip()
+                    if title_text:
+                        facts['titles'].append(title_text)
+
+        # Forms
+        if tag_name == 'form':
+            action = get_attribute(node, 'action') or ''
+            method = get_attribute(node, 'method') or 'GET'
+            facts['forms'].append({
+                'action': action,
+                'method': method
+            })
 
     return facts
\ No newline at end of file
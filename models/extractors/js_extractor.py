@@ -2,10 +2,94 @@
 JavaScript/React/Node.js Extractor using Tree-sitter
 """
 
-from models.universe_parser import get_node_text
+from bisect import bisect_left
+
+from models.universe_parser import get_node_text, iter_children
+from models.extractors.query_engine import capture_starts, run_pack
+from models.extractors.collectors import OrderedSet
+
+
+JAVASCRIPT_PACK = """
+(function_declaration
+  name: (identifier) @function.name) @function
+
+[
+  (lexical_declaration)
+  (variable_declaration)
+] @declaration
+
+(class_declaration
+  name: (_) @class.name) @class
+
+(call_expression
+  function: (_) @call.function) @call
+
+(expression_statement
+  .
+  (assignment_expression) @export.assignment) @export
+
+(import_statement
+  source: (_) @import.source) @import
+"""
+
+# Globals every JavaScript runtime provides: calls to these (or to their
+# methods, like console.log or JSON.parse) never go to a project file
+GLOBAL_FUNCTIONS = frozenset({
+    'require', 'parseInt', 'parseFloat', 'isNaN', 'isFinite', 'setTimeout',
+    'setInterval', 'clearTimeout', 'clearInterval', 'setImmediate', 'queueMicrotask',
+    'encodeURI', 'encodeURIComponent', 'decodeURI', 'decodeURIComponent', 'fetch',
+    'alert', 'confirm', 'prompt', 'structuredClone', 'atob', 'btoa', 'Symbol',
+    'BigInt', 'Number', 'String', 'Boolean', 'Array', 'Object', 'Date', 'Error',
+    'RegExp', 'Promise', 'Map', 'Set', 'super',
+})
+GLOBAL_OBJECTS = frozenset({
+    'console', 'JSON', 'Math', 'Object', 'Array', 'Promise', 'Number', 'String',
+    'Date', 'Reflect', 'Symbol', 'Intl', 'process', 'window', 'document',
+    'localStorage', 'sessionStorage', 'navigator', 'globalThis',
+})
+
+
+def call_receiver(func_node, code):
+    """
+    The receiver of a member call's function (db in db.find(...)), its
+    source text with whitespace collapsed.
+    """
+    obj = func_node.child_by_field_name('object')
+    return ''.join(get_node_text(obj, code).split()) if obj is not None else None
+
+
+# Language → pack matching every JSX node type that grammar defines
+_jsx_packs = {}
+
+
+def jsx_pack(language):
+    """Query pack capturing every node whose type mentions 'jsx'."""
+    pack = _jsx_packs.get(language)
+    if pack is None:
+        kinds = sorted({
+            language.node_kind_for_id(i)
+            for i in range(language.node_kind_count)
+            if language.node_kind_is_named(i)
+            and language.node_kind_is_visible(i)
+            and 'jsx' in language.node_kind_for_id(i)
+        })
+        pack = _jsx_packs[language] = '\n'.join(f'({kind}) @jsx' for kind in kinds)
+    return pack
 
 
 def extract_javascript(tree, code):
+    return extract_script(tree, code)
+
+
+def extract_script(tree, code, pack=JAVASCRIPT_PACK, named_kinds=None):
+    """
+    One query run and one loop over a JavaScript-family tree.
+
+    named_kinds maps extra match kinds in `pack` to facts keys — each such
+    match adds the text of its @<kind>.name capture to that list. The
+    TypeScript extractor uses this to collect interfaces, types and enums
+    in the same pass as the JavaScript facts.
+    """
     facts = {
         'components': [],
         'functions':  [],
@@ -14,152 +98,179 @@ def extract_javascript(tree, code):
         'imports':    [],
         'classes':    [],
         'requires':   [],
-        'calls':      []
+        'calls':      [],
+        # Calls to names not defined in this file — resolved across files
+        # by the project symbol table
+        'external_calls': []
     }
+    named_kinds = named_kinds or {}
+    named_facts = {key: [] for key in named_kinds.values()}
+    functions   = OrderedSet(facts['functions'])
+    hooks       = OrderedSet(facts['hooks'])
 
-    root = tree.root_node
-    all_function_names = []
+    # Start bytes of all JSX nodes, found once per file. A node's subtree
+    # contains JSX iff one of them starts inside the node's byte range.
+    jsx_query = jsx_pack(tree.language)
+    jsx_starts = capture_starts(jsx_query, tree) if jsx_query else []
 
     def has_jsx_in_subtree(node):
-        if 'jsx' in node.type:
-            return True
-        for child in node.children:
-            if has_jsx_in_subtree(child):
-                return True
-        return False
-
-    # First pass — collect all function names
-    def collect_names(node):
-        if node.type == 'function_declaration':
-            name_node = node.child_by_field_name('name')
-            if name_node:
-                all_function_names.append(get_node_text(name_node, code))
-        elif node.type in ['lexical_declaration', 'variable_declaration']:
-            for child in node.children:
-                if child.type == 'variable_declarator':
-                    name_node  = child.child_by_field_name('name')
-                    value_node = child.child_by_field_name('value')
-                    if name_node and value_node and value_node.type == 'arrow_function':
-                        all_function_names.append(get_node_text(name_node, code))
-        for child in node.children:
-            collect_names(child)
-
-    collect_names(root)
-
-    def walk(node, current_function=None):
+        i = bisect_left(jsx_starts, node.start_byte)
+        return i < len(jsx_starts) and jsx_starts[i] < node.end_byte
+
+    # Every function / arrow-function name seen so far in the file
+    declared_names = set()
+
+    # Calls in first-seen order: (from, to) → call site number. Calls to a
+    # name not declared yet wait in `pending` until the whole file is seen.
+    resolved_calls = {}
+    pending_calls  = []
+    call_site      = 0
+
+    # Enclosing named functions as (end_byte, name) — calls are attributed
+    # to the innermost one
+    scopes = []
+
+    for kind, captures in run_pack(pack, tree):
+        node = captures[kind]
+        while scopes and node.start_byte >= scopes[-1][0]:
+            scopes.pop()
+        current_function = scopes[-1][1] if scopes else None
+
         # Function declarations
-        if node.type == 'function_declaration':
-            name_node = node.child_by_field_name('name')
-            if name_node:
-                func_name = get_node_text(name_node, code)
-                if func_name and func_name[0].isupper() and has_jsx_in_subtree(node):
-                    facts['components'].append({'name': func_name, 'type': 'functional_component'})
-                else:
-                    if func_name and func_name not in facts['functions']:
-                        facts['functions'].append(func_name)
-                for child in node.children:
-                    walk(child, func_name)
-                return
+        if kind == 'function':
+            func_name = get_node_text(captures['function.name'], code)
+            declared_names.add(func_name)
+            if func_name and func_name[0].isupper() and has_jsx_in_subtree(node):
+                facts['components'].append({'name': func_name, 'type': 'functional_component'})
+            else:
+                if func_name:
+                    functions.add(func_name)
+            scopes.append((node.end_byte, func_name))
 
         # Arrow functions / variable declarations
-        elif node.type in ['lexical_declaration', 'variable_declaration']:
-            for child in node.children:
-                if child.type == 'variable_declarator':
-                    name_node  = child.child_by_field_name('name')
-                    value_node = child.child_by_field_name('value')
-                    if name_node and value_node:
-                        var_name = get_node_text(name_node, code)
-                        if value_node.type == 'arrow_function':
-                            if var_name and var_name[0].isupper() and has_jsx_in_subtree(value_node):
-                                facts['components'].append({'name': var_name, 'type': 'functional_component'})
-                            else:
-                                if var_name and var_name not in facts['functions']:
-                                    facts['functions'].append(var_name)
-                            for sub in value_node.children:
-                                walk(sub, var_name)
-                            continue
-                        elif value_node.type == 'call_expression':
-                            func_node = value_node.child_by_field_name('function')
-                            if func_node and get_node_text(func_node, code) == 'require':
-                                args = value_node.child_by_field_name('arguments')
-                                if args:
-                                    for arg in args.children:
-                                        if arg.type == 'string':
-                                            req_path = get_node_text(arg, code).strip('"\'')
-                                            facts['requires'].append(req_path)
-                for subchild in child.children:
-                    walk(subchild, current_function)
-            return
+        elif kind == 'declaration':
+            for child in iter_children(node):
+                if child.type != 'variable_declarator':
+                    continue
+                name_node  = child.child_by_field_name('name')
+                value_node = child.child_by_field_name('value')
+                if not (name_node and value_node):
+                    continue
+
+                var_name = get_node_text(name_node, code)
+                if value_node.type == 'arrow_function':
+                    declared_names.add(var_name)
+                    if var_name and var_name[0].isupper() and has_jsx_in_subtree(value_node):
+                        facts['components'].append({'name': var_name, 'type': 'functional_component'})
+                    else:
+                        if var_name:
+                            functions.add(var_name)
+                    scopes.append((value_node.end_byte, var_name))
+                elif value_node.type == 'call_expression':
+                    func_node = value_node.child_by_field_name('function')
+                    if func_node and get_node_text(func_node, code) == 'require':
+                        args = value_node.child_by_field_name('arguments')
+                        if args:
+                            for arg in iter_children(args):
+                                if arg.type == 'string':
+                                    req_path = get_node_text(arg, code).strip('"\'')
+                                    facts['requires'].append(req_path)
 
         # Class declarations
-        elif node.type == 'class_declaration':
-            name_node = node.child_by_field_name('name')
-            if name_node:
-                class_name = get_node_text(name_node, code)
-                methods = []
-                body = node.child_by_field_name('body')
-                if body:
-                    for child in body.children:
-                        if child.type == 'method_definition':
-                            method_name_node = child.child_by_field_name('name')
-                            if method_name_node:
-                                method_name = get_node_text(method_name_node, code)
-                                if method_name != 'constructor':
-                                    methods.append(method_name)
-                facts['classes'].append({'name': class_name, 'methods': methods})
+        elif kind == 'class':
+            class_name = get_node_text(captures['class.name'], code)
+            methods = []
+            body = node.child_by_field_name('body')
+            if body:
+                for child in iter_children(body):
+                    if child.type == 'method_definition':
+                        method_name_node = child.child_by_field_name('name')
+                        if method_name_node:
+                            method_name = get_node_text(method_name_node, code)
+                            if method_name != 'constructor':
+                                methods.append(method_name)
+            facts['classes'].append({'name': class_name, 'methods': methods})
 
         # Call expressions
-        elif node.type == 'call_expression':
-            func_node = node.child_by_field_name('function')
-            if func_node:
-                called_name = None
-                if func_node.type == 'identifier':
-                    called_name = get_node_text(func_node, code)
-                elif func_node.type == 'member_expression':
-                    prop = func_node.child_by_field_name('property')
-                    if prop:
-                        called_name = get_node_text(prop, code)
-
-                if called_name:
-                    if called_name.startswith('use') and len(called_name) > 3 and called_name[3].isupper():
-                        if called_name not in facts['hooks']:
-                            facts['hooks'].append(called_name)
-
-                    if current_function and called_name in all_function_names and called_name != current_function:
-                        call = {'from': current_function, 'to': called_name}
-                        if call not in facts['calls']:
-                            facts['calls'].append(call)
+        elif kind == 'call':
+            func_node = captures['call.function']
+            called_name = receiver = None
+            if func_node.type == 'identifier':
+                called_name = get_node_text(func_node, code)
+            elif func_node.type == 'member_expression':
+                prop = func_node.child_by_field_name('property')
+                if prop:
+                    called_name = get_node_text(prop, code)
+                    receiver    = call_receiver(func_node, code)
+
+            if called_name:
+                if called_name.startswith('use') and len(called_name) > 3 and called_name[3].isupper():
+                    hooks.add(called_name)
+
+                if current_function and called_name != current_function:
+                    call_site += 1
+                    if called_name in declared_names:
+                        resolved_calls.setdefault((current_function, called_name), call_site)
+                    else:
+                        pending_calls.append((call_site, current_function, called_name, receiver))
 
         # module.exports
-        elif node.type == 'expression_statement':
-            expr = node.children[0] if node.children else None
-            if expr and expr.type == 'assignment_expression':
-                left  = expr.child_by_field_name('left')
-                right = expr.child_by_field_name('right')
-                if left and get_node_text(left, code).startswith('module.exports'):
-                    if right:
-                        facts['exports'].append(get_node_text(right, code)[:50])
+        elif kind == 'export':
+            expr  = captures['export.assignment']
+            left  = expr.child_by_field_name('left')
+            right = expr.child_by_field_name('right')
+            if left and get_node_text(left, code).startswith('module.exports'):
+                if right:
+                    facts['exports'].append(get_node_text(right, code)[:50])
 
         # ES imports — capture both the module path AND named imports
-        elif node.type == 'import_statement':
-            source_node = node.child_by_field_name('source')
-            if source_node:
-                import_path = get_node_text(source_node, code).strip('"\'')
-                facts['imports'].append(import_path)
+        elif kind == 'import':
+            import_path = get_node_text(captures['import.source'], code).strip('"\'')
+            facts['imports'].append(import_path)
+
+            # Also treat local relative imports as require() equivalents
+            # so the AI can infer cross-file edges
+            if import_path.startswith('.'):
+                facts['requires'].append(import_path)
 
-                # Also treat local relative imports as require() equivalents
-                # so the AI can infer cross-file edges
-                if import_path.startswith('.'):
-                    facts['requires'].append(import_path)
+        # Language extensions (TypeScript interfaces, types, enums)
+        elif kind in named_kinds:
+            named_facts[named_kinds[kind]].append(
+                get_node_text(captures[f'{kind}.name'], code)
+            )
 
-        for child in node.children:
-            walk(child, current_function)
+    # Calls to functions declared further down the file; the rest call
+    # into other files (or libraries), except the runtime's own globals
+    external_calls = OrderedSet(facts['external_calls'])
+    for site, caller, called_name, receiver in pending_calls:
+        if called_name in declared_names:
+            key = (caller, called_name)
+            if resolved_calls.get(key, site + 1) > site:
+                resolved_calls[key] = site
+            continue
+        if receiver is None:
+            if called_name in GLOBAL_FUNCTIONS:
+                continue
+            call = {'from': caller, 'to': called_name}
+        else:
+            # Runtime globals, and calls on a call's result, a literal or
+            # a subscript: none of them names a project module
+            parts = receiver.split('.')
+            if parts[0] in GLOBAL_OBJECTS or not all(
+                    p.replace('$', '_').isidentifier() for p in parts):
+                continue
+            call = {'from': caller, 'to': called_name, 'receiver': receiver}
+        external_calls.add(call, key=(caller, receiver, called_name))
 
-    walk(root)
+    facts['calls'] = [
+        {'from': caller, 'to': called_name}
+        for (caller, called_name), _ in sorted(resolved_calls.items(), key=lambda kv: kv[1])
+    ]
 
     if facts['hooks']:
         facts['react_patterns'] = analyze_react_patterns(facts)
 
+    facts.update(named_facts)
     return facts
 
 
@@ -3,7 +3,52 @@ Python Extractor using Tree-sitter
 Extracts classes, methods, functions, imports, and call relationships from Python code.
 """
 
-from models.universe_parser import get_node_text
+import builtins
+
+from models.universe_parser import get_node_text, iter_children
+from models.extractors.query_engine import run_pack
+from models.extractors.collectors import OrderedSet
+
+
+PYTHON_PACK = """
+(class_definition
+  name: (identifier) @class.name) @class
+
+(class_definition
+  body: (block
+    (function_definition
+      name: (identifier) @method.name) @method))
+
+(module
+  (function_definition
+    name: (identifier) @function.name) @function)
+
+(call
+  function: (_) @call.function) @call
+
+(import_statement
+  (dotted_name) @import)
+
+(import_from_statement
+  module_name: (_) @import_from.module) @import_from
+"""
+
+# Calls to these never leave the interpreter: len(), print(), str.join(), ...
+BUILTIN_NAMES = frozenset(dir(builtins))
+
+
+def call_target(func_node, code):
+    """
+    (receiver, name) of a call's function: ('requests', 'get') for
+    requests.get(...), (None, 'helper') for helper(...). The receiver is
+    its source text with whitespace collapsed.
+    """
+    if func_node.type == 'attribute':
+        obj  = func_node.child_by_field_name('object')
+        attr = func_node.child_by_field_name('attribute')
+        if obj is not None and attr is not None:
+            return ''.join(get_node_text(obj, code).split()), get_node_text(attr, code)
+    return None, get_node_text(func_node, code)
 
 
 def extract_python(tree, code):
@@ -15,135 +60,125 @@ def extract_python(tree, code):
         code: Source code as bytes
 
     Returns:
-        dict with classes, functions, imports, calls
+        dict with classes, functions, imports, calls, external_calls
     """
 
     facts = {
-        'classes':      [],
-        'functions':    [],
-        'imports':      [],
-        'requires':     [],   # mirrors JS convention so AI engine treats them uniformly
-        'calls':        [],
-        'dependencies': []
+        'classes':        [],
+        'functions':      [],
+        'imports':        [],
+        'requires':       [],   # mirrors JS convention so AI engine treats them uniformly
+        'calls':          [],
+        'external_calls': [],   # calls to names not defined in this file
+        'dependencies':   []
     }
 
-    root = tree.root_node
+    matches = run_pack(PYTHON_PACK, tree)
 
-    # ── First pass: collect all top-level function names ──────
-    all_top_level_functions = []
+    # ── First pass: method names and top-level function names ──
     method_names = set()
+    for kind, captures in matches:
+        if kind == 'method':
+            method_names.add(get_node_text(captures['method.name'], code))
+
+    all_top_level_functions = set()
+    for kind, captures in matches:
+        if kind == 'function':
+            fname = get_node_text(captures['function.name'], code)
+            if fname != '__init__' and fname not in method_names:
+                all_top_level_functions.add(fname)
+
+    # ── Main pass over matches, in document order ────────────
+    # Calls only count inside a top-level function: (end_byte, name)
+    current_fn = None
+    calls          = OrderedSet(facts['calls'])
+    external_calls = OrderedSet(facts['external_calls'])
+
+    for kind, captures in matches:
+        node = captures[kind]
+
+        if current_fn and node.start_byte >= current_fn[0]:
+            current_fn = None
+
+        # Class definitions
+        if kind == 'class':
+            class_name = get_node_text(captures['class.name'], code)
+
+            methods      = []
+            dependencies = []
 
-    def collect_method_names(node):
-        if node.type == 'class_definition':
             body = node.child_by_field_name('body')
             if body:
-                for child in body.children:
+                for child in iter_children(body):
                     if child.type == 'function_definition':
-                        name_node = child.child_by_field_name('name')
-                        if name_node:
-                            method_names.add(get_node_text(name_node, code))
-        for child in node.children:
-            collect_method_names(child)
-
-    collect_method_names(root)
-
-    for node in root.children:
-        if node.type == 'function_definition':
-            name_node = node.child_by_field_name('name')
-            if name_node:
-                fname = get_node_text(name_node, code)
-                if fname != '__init__' and fname not in method_names:
-                    all_top_level_functions.append(fname)
-
-    # ── Main walk ─────────────────────────────────────────────
-    def walk(node):
-        # Class definitions
-        if node.type == 'class_definition':
-            class_name_node = node.child_by_field_name('name')
-            if class_name_node:
-                class_name = get_node_text(class_name_node, code)
-
-                methods      = []
-                dependencies = []
-
-                body = node.child_by_field_name('body')
-                if body:
-                    for child in body.children:
-                        if child.type == 'function_definition':
-                            method_name_node = child.child_by_field_name('name')
-                            if method_name_node:
-                                method_name = get_node_text(method_name_node, code)
-                                if method_name != '__init__':
-                                    methods.append(method_name)
-
-                            # Detect injected dependencies via __init__ parameters
-                            if method_name_node and get_node_text(method_name_node, code) == '__init__':
-                                params = child.child_by_field_name('parameters')
-                                if params:
-                                    for param in params.children:
-                                        if param.type in ['identifier', 'typed_parameter']:
-                                            param_name = get_node_text(param, code).split(':')[0].strip()
-                                            if param_name in ('self', 'cls', '*args', '**kwargs'):
-                                                continue
-                                            dependencies.append(param_name)
-
-                facts['classes'].append({
-                    'name':         class_name,
-                    'methods':      methods,
-                    'dependencies': dependencies,
-                })
+                        method_name_node = child.child_by_field_name('name')
+                        if method_name_node:
+                            method_name = get_node_text(method_name_node, code)
+                            if method_name != '__init__':
+                                methods.append(method_name)
+
+                        # Detect injected dependencies via __init__ parameters
+                        if method_name_node and get_node_text(method_name_node, code) == '__init__':
+                            params = child.child_by_field_name('parameters')
+                            if params:
+                                for param in iter_children(params):
+                                    if param.type in ['identifier', 'typed_parameter']:
+                                        param_name = get_node_text(param, code).split(':')[0].strip()
+                                        if param_name in ('self', 'cls', '*args', '**kwargs'):
+                                            continue
+                                        dependencies.append(param_name)
+
+            facts['classes'].append({
+                'name':         class_name,
+                'methods':      methods,
+                'dependencies': dependencies,
+            })
 
         # Top-level function definitions
-        elif node.type == 'function_definition':
-            if node.parent and node.parent.type == 'module':
-                func_name_node = node.child_by_field_name('name')
-                if func_name_node:
-                    func_name = get_node_text(func_name_node, code)
-                    if func_name != '__init__' and func_name not in method_names:
-                        facts['functions'].append(func_name)
-
-                        # Detect calls to other top-level functions
-                        def find_calls(n, current_fn):
-                            if n.type == 'call':
-                                fn_node = n.child_by_field_name('function')
-                                if fn_node:
-                                    called = get_node_text(fn_node, code)
-                                    # Strip attribute access e.g. self.foo → foo
-                                    if '.' in called:
-                                        called = called.split('.')[-1]
-                                    if (called in all_top_level_functions
-                                            and called != current_fn):
-                                        call_entry = {'from': current_fn, 'to': called}
-                                        if call_entry not in facts['calls']:
-                                            facts['calls'].append(call_entry)
-                            for child in n.children:
-                                find_calls(child, current_fn)
-
-                        find_calls(node, func_name)
+        elif kind == 'function':
+            func_name = get_node_text(captures['function.name'], code)
+            if func_name != '__init__' and func_name not in method_names:
+                facts['functions'].append(func_name)
+                current_fn = (node.end_byte, func_name)
+
+        # Calls to other top-level functions
+        elif kind == 'call':
+            if current_fn:
+                called = get_node_text(captures['call.function'], code)
+                # Strip attribute access e.g. self.foo → foo
+                if '.' in called:
+                    called = called.split('.')[-1]
+                if called == current_fn[1]:
+                    continue
+                if called in all_top_level_functions:
+                    calls.add({'from': current_fn[1], 'to': called},
+                              key=(current_fn[1], called))
+                    continue
+                # Other files' functions are resolved by the symbol table,
+                # which needs the receiver: requests.get is not utils.get
+                receiver, name = call_target(captures['call.function'], code)
+                parts = (receiver or name).split('.')
+                # Builtins, and calls on a call's result, a literal or a
+                # subscript: none of them names a project module
+                if parts[0] in BUILTIN_NAMES or not all(p.isidentifier() for p in parts):
+                    continue
+                call = {'from': current_fn[1], 'to': name}
+                if receiver is not None:
+                    call['receiver'] = receiver
+                external_calls.add(call, key=(current_fn[1], receiver, name))
 
         # import x
-        elif node.type == 'import_statement':
-            for child in node.children:
-                if child.type == 'dotted_name':
-                    import_name = get_node_text(child, code)
-                    facts['imports'].append(import_name)
+        elif kind == 'import':
+            facts['imports'].append(get_node_text(node, code))
 
         # from x import y
-        elif node.type == 'import_from_statement':
-            module_name_node = node.child_by_field_name('module_name')
-            if module_name_node:
-                module_name = get_node_text(module_name_node, code)
-                facts['imports'].append(module_name)
-
-                # Relative imports (from .models import ...) become requires
-                # so the AI can draw cross-file edges
-                if module_name.startswith('.'):
-                    facts['requires'].append(module_name)
-
-        # Recurse
-        for child in node.children:
-            walk(child)
+        elif kind == 'import_from':
+            module_name = get_node_text(captures['import_from.module'], code)
+            facts['imports'].append(module_name)
 
-    walk(root)
+            # Relative imports (from .models import ...) become requires
+            # so the AI can draw cross-file edges
+            if module_name.startswith('.'):
+                facts['requires'].append(module_name)
 
-    return facts
\ No newline at end of file
+    return facts
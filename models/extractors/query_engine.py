@@ -0,0 +1,53 @@
+"""
+Query Engine for the tree-sitter extractors
+Each extractor declares the nodes it cares about as a pack of tree-sitter
+Query S-expressions. The engine compiles a pack once per grammar and
+returns its matches in document order, so the tree traversal runs in C and
+the extractor only handles matches.
+"""
+
+from tree_sitter import Query, QueryCursor
+
+
+# (pack source, Language) → compiled Query
+_compiled = {}
+
+
+def compile_pack(pack, language):
+    """Compile a query pack for a grammar, reusing earlier compilations."""
+    key = (pack, language)
+    query = _compiled.get(key)
+    if query is None:
+        query = _compiled[key] = Query(language, pack)
+    return query
+
+
+def run_pack(pack, tree):
+    """
+    Run a query pack over a whole tree.
+
+    Every pattern in a pack has one main capture (a name without a dot,
+    e.g. @class) and optional sub-captures named after it (@class.name).
+    Returns [(kind, captures), ...] where kind is the main capture name and
+    captures maps capture names to nodes. Matches are ordered the way a
+    recursive pre-order walk would visit their main nodes.
+    """
+    query  = compile_pack(pack, tree.language)
+    cursor = QueryCursor(query)
+
+    matches = []
+    for _, captured in cursor.matches(tree.root_node):
+        captures = {name: nodes[0] for name, nodes in captured.items()}
+        kind = next(name for name in captures if '.' not in name)
+        matches.append((kind, captures))
+
+    # Pre-order: earlier start first, and an ancestor before its descendants
+    matches.sort(key=lambda m: (m[1][m[0]].start_byte, -m[1][m[0]].end_byte))
+    return matches
+
+
+def capture_starts(pack, tree):
+    """Sorted start bytes of every node captured by a pack in a tree."""
+    query = compile_pack(pack, tree.language)
+    captured = QueryCursor(query).captures(tree.root_node)
+    return sorted(node.start_byte for nodes in captured.values() for node in nodes)
@@ -0,0 +1,226 @@
+"""
+HIRO Facts Cache
+Stores per-file extractor output keyed by a hash of the file's content,
+its language and the extractor version. Unchanged files skip both
+tree-sitter and the extractor on the next run.
+"""
+
+import json
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from models.diagram_cache import CACHE_DIR
+from models.env_config import env_int
+from models.extractors import EXTRACTOR_VERSION
+
+FACTS_CACHE_DIR = CACHE_DIR / "facts"
+STATS_PATH      = FACTS_CACHE_DIR / "stats.json"
+
+# Oldest entries are evicted once the store grows past this size
+MAX_CACHE_BYTES = env_int("HIRO_FACTS_CACHE_MB", 256, minimum=0) * 1024 * 1024
+
+# Fields that depend on where the file lives, not on its content
+PATH_FIELDS = ("filepath", "filename")
+
+# stats.json is read, updated and rewritten by flush_stats(); parses
+# running on the API's thread pool flush one at a time
+_stats_lock = threading.Lock()
+
+
+class CacheCounters:
+    """
+    Hit/miss counts of one parse run — merged into stats.json by
+    flush_stats(). Every run keeps its own, so runs on concurrent threads
+    never count each other's lookups; worker processes return theirs.
+    """
+
+    __slots__ = ("hits", "misses")
+
+    def __init__(self):
+        self.hits   = 0
+        self.misses = 0
+
+    def add(self, other):
+        self.hits   += other.hits
+        self.misses += other.misses
+
+
+def compute_key(code: bytes, language: str) -> str:
+    """Cache key for one file: content hash + language + extractor version."""
+    digest = hashlib.sha256(code)
+    digest.update(f"\0{language}\0{EXTRACTOR_VERSION}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    # Two-level layout keeps directories small on 100k-file repos
+    return FACTS_CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def get_facts(key: str, counters: CacheCounters = None):
+    """
+    Returns the cached facts for this key, or None on a miss, counted in
+    counters when given. Path fields are not stored — the caller fills them in.
+    """
+    path = _entry_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            facts = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        if counters is not None:
+            counters.misses += 1
+        return None
+
+    if counters is not None:
+        counters.hits += 1
+    try:
+        # Touch the entry so eviction drops the least recently used first
+        os.utime(path)
+    except OSError:
+        pass
+    return facts
+
+
+def put_facts(key: str, facts: dict):
+    """
+    Stores facts for this key. Writes go through a temp file and an atomic
+    rename, so concurrent workers never see a half-written entry.
+    """
+    path = _entry_path(key)
+    entry = {k: v for k, v in facts.items() if k not in PATH_FIELDS}
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠ Facts cache write error: {e} — continuing without caching")
+
+
+def _load_stats() -> dict:
+    try:
+        with open(STATS_PATH, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        stats = {}
+    stats.setdefault("hits", 0)
+    stats.setdefault("misses", 0)
+    stats.setdefault("evictions", 0)
+    return stats
+
+
+def _save_stats(stats: dict):
+    # Temp file + rename, like put_facts: a reader never sees half a file
+    try:
+        FACTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = STATS_PATH.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp, STATS_PATH)
+    except OSError as e:
+        print(f"⚠ Facts cache stats write error: {e}")
+
+
+def _iter_entries():
+    if not FACTS_CACHE_DIR.exists():
+        return
+    for shard in os.scandir(FACTS_CACHE_DIR):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.endswith(".json"):
+                yield entry
+
+
+def flush_stats(counters: CacheCounters):
+    """
+    Merges a run's hit/miss counts into the persistent totals and evicts
+    the least recently used entries if the store is over its limit.
+    Returns (hits, misses) for this run.
+    """
+    evictions = evict()
+    with _stats_lock:
+        stats = _load_stats()
+        stats["hits"]      += counters.hits
+        stats["misses"]    += counters.misses
+        stats["evictions"] += evictions
+        _save_stats(stats)
+    return counters.hits, counters.misses
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES) -> int:
+    """
+    Deletes the least recently used entries until the store fits in
+    max_bytes. Returns how many entries were removed.
+    """
+    entries = []
+    total = 0
+    for entry in _iter_entries():
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, entry.path))
+        total += st.st_size
+
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def clear_facts_cache():
+    """
+    Deletes every cached per-file entry and resets the counters.
+    """
+    deleted = 0
+    for entry in list(_iter_entries()):
+        try:
+            os.unlink(entry.path)
+            deleted += 1
+        except OSError:
+            continue
+    with _stats_lock:
+        try:
+            STATS_PATH.unlink()
+        except OSError:
+            pass
+    print(f"✓ Cleared {deleted} cached file fact(s) from {FACTS_CACHE_DIR}")
+
+
+def facts_cache_info():
+    """
+    Prints size and hit/miss statistics for the per-file facts cache.
+    """
+    count = 0
+    size  = 0
+    for entry in _iter_entries():
+        try:
+            size += entry.stat().st_size
+            count += 1
+        except OSError:
+            continue
+
+    stats   = _load_stats()
+    lookups = stats["hits"] + stats["misses"]
+    rate    = (stats["hits"] / lookups * 100) if lookups else 0.0
+
+    print(f"Facts cache directory: {FACTS_CACHE_DIR}")
+    print(f"Cached files: {count} ({size / (1024 * 1024):.1f} MB "
+          f"of {MAX_CACHE_BYTES / (1024 * 1024):.0f} MB)")
+    print(f"Hits: {stats['hits']}  Misses: {stats['misses']}  "
+          f"Hit rate: {rate:.1f}%  Evictions: {stats['evictions']}")
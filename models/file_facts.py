@@ -0,0 +1,172 @@
+"""
+Compact Facts Store
+The extractors' facts (dicts of lists of dicts) held in a compact form for
+big analyses:
+  - every dict becomes a slotted record whose key tuple is shared by all
+    records with the same keys
+  - every list becomes a tuple (all empty lists are the one empty tuple)
+  - every string is interned, so a method or import name repeated across
+    thousands of files is stored once
+  - filepath / filename become an id into one table of root-relative paths
+FactsStore is a dict of {language: FactsList}; reading a FactsList yields
+ordinary facts dicts, so build_facts_summary, the symbol table and the
+renderers take a store wherever they take all_facts.
+"""
+
+import os
+import sys
+from collections.abc import Sequence
+
+
+# Shared key tuples, one per distinct dict shape
+_shapes = {}
+
+
+def _shape(keys):
+    keys = tuple(sys.intern(key) for key in keys)
+    return _shapes.setdefault(keys, keys)
+
+
+class Record:
+    """A compacted dict: a shared key tuple and a tuple of values."""
+
+    __slots__ = ('keys', 'values')
+
+    def __init__(self, keys, values):
+        self.keys   = keys
+        self.values = values
+
+
+def compact_value(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(compact_value(item) for item in value) if value else ()
+    if isinstance(value, dict):
+        return Record(_shape(value), tuple(compact_value(v) for v in value.values()))
+    return value
+
+
+def expand_value(value):
+    """Inverse of compact_value. Tuples come back as lists."""
+    if isinstance(value, tuple):
+        return [expand_value(item) for item in value]
+    if isinstance(value, Record):
+        return dict(zip(value.keys, map(expand_value, value.values)))
+    return value
+
+
+# Stand-ins for the path fields inside FileFacts.values
+_FILEPATH = object()
+_FILENAME = object()
+
+
+class FileFacts:
+    """One file's facts. path_id indexes its store's path table."""
+
+    __slots__ = ('language', 'path_id', 'keys', 'values')
+
+    def __init__(self, language, path_id, keys, values):
+        self.language = language
+        self.path_id  = path_id
+        self.keys     = keys
+        self.values   = values
+
+
+class FactsList(Sequence):
+    """One language's files. Items are read back as facts dicts."""
+
+    def __init__(self, store):
+        self._store = store
+        self.files  = []
+
+    def __len__(self):
+        return len(self.files)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.expand(facts) for facts in self.files[index]]
+        return self._store.expand(self.files[index])
+
+    def __iter__(self):
+        expand = self._store.expand
+        for facts in self.files:
+            yield expand(facts)
+
+
+class FactsStore(dict):
+    """
+    {language: FactsList} over a shared path table. Paths under root are
+    stored relative to it; the dicts read back carry the original filepath.
+    """
+
+    def __init__(self, root=None):
+        super().__init__()
+        self.root   = os.fspath(root) if root is not None else None
+        self._paths  = []           # path_id → root-relative (or original) path
+        self._rooted = bytearray()  # path_id → 1 if stored relative to root
+
+    def _path_id(self, filepath):
+        stored, rooted = filepath, 0
+        if self.root is not None and filepath.startswith(self.root + os.sep):
+            stored, rooted = filepath[len(self.root) + 1:], 1
+        self._paths.append(stored)
+        self._rooted.append(rooted)
+        return len(self._paths) - 1
+
+    def path(self, path_id):
+        """The original filepath of a path id."""
+        stored = self._paths[path_id]
+        if self._rooted[path_id]:
+            return self.root + os.sep + stored
+        return stored
+
+    def add(self, facts, language=None):
+        """Compacts one file's facts dict into the store."""
+        language = sys.intern(language or facts.get('language', 'unknown'))
+        filepath = facts.get('filepath')
+        path_id  = None
+        values   = []
+
+        if filepath is not None:
+            path_id = self._path_id(str(filepath))
+        for key, value in facts.items():
+            if key == 'filepath' and path_id is not None:
+                values.append(_FILEPATH)
+            elif (key == 'filename' and path_id is not None
+                  and value == os.path.basename(str(filepath))):
+                values.append(_FILENAME)
+            else:
+                values.append(compact_value(value))
+
+        file_facts = FileFacts(language, path_id, _shape(facts), tuple(values))
+        if language not in self:
+            self[language] = FactsList(self)
+        self[language].files.append(file_facts)
+        return file_facts
+
+    def expand(self, file_facts):
+        """The facts dict of one FileFacts, as the extractor produced it."""
+        facts = {}
+        for key, value in zip(file_facts.keys, file_facts.values):
+            if value is _FILEPATH:
+                value = self.path(file_facts.path_id)
+            elif value is _FILENAME:
+                value = os.path.basename(self.path(file_facts.path_id))
+            else:
+                value = expand_value(value)
+            facts[key] = value
+        return facts
+
+    def to_dict(self):
+        """Plain {language: [facts, ...]}, for code that needs real lists."""
+        return {language: list(facts_list) for language, facts_list in self.items()}
+
+    @classmethod
+    def from_all_facts(cls, all_facts, root=None):
+        store = cls(root)
+        for language, facts_list in all_facts.items():
+            for facts in facts_list:
+                if isinstance(facts, dict):
+                    store.add(facts, language)
+        return store
@@ -1,23 +1,74 @@
 import ast
 from pathlib import Path
 
+from models.class_matcher import ClassNameMatcher
+from models.symbol_table import SymbolTable
 
-def get_all_class_names(py_files):
-    """First pass — collect every class name across all files."""
-    all_classes = []
+
+def parse_modules(py_files):
+    """
+    Read and parse every file exactly once.
+    Returns one entry per file with its code, AST and symbols (class
+    names, top-level function names, (class, method) pairs). Files that
+    fail to read or parse keep their exception in "error" and have no tree.
+    """
+    modules = []
     for py_file in py_files:
+        module = {"path": py_file, "code": None, "tree": None, "error": None,
+                  "classes": [], "functions": [], "methods": []}
+        modules.append(module)
         try:
-            code = py_file.read_text()
-            tree = ast.parse(code)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    all_classes.append(node.name)
-        except Exception:
+            module["code"] = py_file.read_text()
+            module["tree"] = ast.parse(module["code"])
+        except Exception as e:
+            module["error"] = e
             continue
+
+        class_nodes = []
+        function_nodes = []
+        for node in ast.walk(module["tree"]):
+            if isinstance(node, ast.ClassDef):
+                class_nodes.append(node)
+            elif isinstance(node, ast.FunctionDef):
+                function_nodes.append(node)
+
+        module["methods"] = [
+            (cls.name, item.name)
+            for cls in class_nodes
+            for item in cls.body
+            if isinstance(item, ast.FunctionDef)
+        ]
+        method_names = {method for _, method in module["methods"]}
+        module["classes"] = [cls.name for cls in class_nodes]
+        module["functions"] = [
+            fn.name for fn in function_nodes
+            if fn.name not in method_names and fn.name != "__init__"
+        ]
+    return modules
+
+
+def build_module_symbol_table(modules):
+    """Project symbol table of the parsed files — one lookup per name."""
+    symbols = SymbolTable()
+    for module in modules:
+        for class_name in module["classes"]:
+            symbols.add(class_name, "class", module["path"], "python")
+        for class_name, method in module["methods"]:
+            symbols.add(method, "method", module["path"], "python", owner=class_name)
+        for function in module["functions"]:
+            symbols.add(function, "function", module["path"], "python")
+    return symbols
+
+
+def get_all_class_names(modules):
+    """First pass — collect every class name across all parsed files."""
+    all_classes = []
+    for module in modules:
+        all_classes.extend(module["classes"])
     return all_classes
 
 
-def detect_class_usage(py_files, all_class_names):
+def detect_class_usage(modules, all_class_names, matcher=None):
     """
     Detects which classes instantiate or use other classes.
     Strategy 1 — direct instantiation like Student()
@@ -25,12 +76,15 @@ def detect_class_usage(py_files, all_class_names):
     Returns list of from/to relationships.
     """
     relationships = []
+    class_name_set = set(all_class_names)
+    if matcher is None:
+        matcher = ClassNameMatcher(all_class_names)
 
-    for py_file in py_files:
+    for module in modules:
+        tree = module["tree"]
+        if tree is None:
+            continue
         try:
-            code = py_file.read_text()
-            tree = ast.parse(code)
-
             for node in ast.walk(tree):
                 if isinstance(node, ast.ClassDef):
                     current_class = node.name
@@ -41,7 +95,7 @@ def detect_class_usage(py_files, all_class_names):
                         if isinstance(sub, ast.Call):
                             if isinstance(sub.func, ast.Name):
                                 called_name = sub.func.id
-                                if (called_name in all_class_names and
+                                if (called_name in class_name_set and
                                         called_name != current_class):
                                     relationships.append({
                                         "from": current_class,
@@ -50,7 +104,7 @@ def detect_class_usage(py_files, all_class_names):
                             elif isinstance(sub.func, ast.Attribute):
                                 if isinstance(sub.func.value, ast.Name):
                                     called_name = sub.func.value.id
-                                    if (called_name in all_class_names and
+                                    if (called_name in class_name_set and
                                             called_name != current_class):
                                         relationships.append({
                                             "from": current_class,
@@ -63,21 +117,13 @@ def detect_class_usage(py_files, all_class_names):
                                 arg_name = arg.arg.lower()
                                 if arg_name == "self":
                                     continue
-                                for class_name in all_class_names:
+                                for class_name in matcher.match_param(arg_name):
                                     if class_name == current_class:
                                         continue
-                                    class_lower = class_name.lower()
-                                    # Only match if class name is at least 6 chars
-                                    # to avoid false positives like "car"
-                                    stripped_class = class_lower.rstrip("s")
-                                    if (len(class_lower) >= 6 and
-                                        (stripped_class == arg_name or
-                                         stripped_class in arg_name or
-                                         arg_name == class_lower)):
-                                        relationships.append({
-                                            "from": current_class,
-                                            "to": class_name
-                                        })
+                                    relationships.append({
+                                        "from": current_class,
+                                        "to": class_name
+                                    })
 
         except Exception:
             continue
@@ -94,12 +140,14 @@ def detect_class_usage(py_files, all_class_names):
     return unique
 
 
-def extract_facts(code, all_function_names_global):
+def extract_facts(code, all_function_names_global, tree=None):
     """
     Extract functions and calls from one file.
     Uses global function names for cross-file call detection.
+    Pass the already-parsed tree to skip parsing the code again.
     """
-    tree = ast.parse(code)
+    if tree is None:
+        tree = ast.parse(code)
     facts = {"classes": [], "functions": [], "calls": [], "imports": []}
 
     method_names = set()
@@ -156,6 +204,7 @@ def extract_facts(code, all_function_names_global):
         node.name for node in ast.walk(tree)
         if isinstance(node, ast.ClassDef)
     ]
+    matcher = ClassNameMatcher(all_class_names_local)
 
     for node in ast.walk(tree):
         if isinstance(node, ast.ClassDef):
@@ -172,19 +221,8 @@ def extract_facts(code, all_function_names_global):
                             arg_name = arg.arg.lower()
                             if arg_name == "self":
                                 continue
-                            for class_name in all_class_names_local:
-                                if class_name == node.name:
-                                    continue
-                                class_lower = class_name.lower()
-                                stripped = class_lower
-                                for suffix in ["service", "manager", "repository", "controller"]:
-                                    stripped = stripped.replace(suffix, "").strip()
-                                if (arg_name in class_lower or
-                                    class_lower in arg_name or
-                                    stripped in arg_name or
-                                    arg_name in stripped or
-                                    (len(arg_name) <= 4 and stripped.startswith(arg_name)) or
-                                    (len(arg_name) <= 4 and arg_name in stripped)):
+                            for class_name in matcher.match_init_arg(arg_name):
+                                if class_name != node.name:
                                     dependencies.add(class_name)
 
                     for sub_node in ast.walk(item):
@@ -193,17 +231,8 @@ def extract_facts(code, all_function_names_global):
                                 if isinstance(sub_node.value.value, ast.Name):
                                     if sub_node.value.value.id == "self":
                                         attr_name = sub_node.value.attr.lower()
-                                        for class_name in all_class_names_local:
-                                            if class_name == node.name:
-                                                continue
-                                            class_lower = class_name.lower()
-                                            stripped = class_lower
-                                            for suffix in ["service", "manager", "repository"]:
-                                                stripped = stripped.replace(suffix, "").strip()
-                                            if (attr_name in class_lower or
-                                                stripped in attr_name or
-                                                attr_name in stripped or
-                                                (len(attr_name) <= 4 and stripped.startswith(attr_name))):
+                                        for class_name in matcher.match_self_attr(attr_name):
+                                            if class_name != node.name:
                                                 dependencies.add(class_name)
 
             facts["classes"].append({
@@ -228,6 +257,8 @@ def extract_facts(code, all_function_names_global):
 def parse_folder(folder_path):
     """
     Multi-pass folder parser.
+    Pass 0  — read and parse every file once and build the symbol table;
+              later passes share the ASTs.
     Pass 1  — collect all class names globally.
     Pass 1b — collect all function names globally.
     Pass 1c — detect cross-class usage relationships.
@@ -258,43 +289,38 @@ def parse_folder(folder_path):
         print(f"  → {f.name}")
     print()
 
+    # Pass 0 — parse every file once
+    modules = parse_modules(py_files)
+    symbols = build_module_symbol_table(modules)
+
     # Pass 1 — collect all class names globally
-    all_class_names = get_all_class_names(py_files)
+    all_class_names = get_all_class_names(modules)
     print(f"Global classes found: {all_class_names}")
 
     # Pass 1b — collect all function names globally
     all_function_names_global = []
-    for py_file in py_files:
-        try:
-            code = py_file.read_text()
-            tree = ast.parse(code)
-            method_names = set()
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    for item in node.body:
-                        if isinstance(item, ast.FunctionDef):
-                            method_names.add(item.name)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    if node.name not in method_names and node.name != "__init__":
-                        all_function_names_global.append(node.name)
-        except Exception:
-            continue
+    for module in modules:
+        all_function_names_global.extend(module["functions"])
 
     all_function_names_global.append("main")
     print(f"Global functions found: {all_function_names_global}")
 
+    # Call sites test membership against the symbol table, not the list
+    global_functions = symbols.names("function") | {"main"}
+
     # Pass 1c — detect cross-class usage
-    class_relationships = detect_class_usage(py_files, all_class_names)
+    class_relationships = detect_class_usage(modules, all_class_names)
     print(f"Class relationships found: {class_relationships}")
     print()
 
     # Pass 2 — extract facts from each file
     all_facts = []
-    for py_file in py_files:
+    for module in modules:
+        py_file = module["path"]
         try:
-            code = py_file.read_text()
-            facts = extract_facts(code, all_function_names_global)
+            if module["error"] is not None:
+                raise module["error"]
+            facts = extract_facts(module["code"], global_functions, module["tree"])
             all_facts.append(facts)
             print(f"  {py_file.name} → functions: {facts['functions']}, calls: {facts['calls']}")
         except Exception as e:
@@ -12,7 +12,7 @@ def _force_remove(func, path, exc_info):
     os.chmod(path, stat.S_IWRITE)
     func(path)
 
-def parse_github_repo(repo_url):
+def parse_github_repo(repo_url, jobs=1, compact=False, report=None):
     temp_dir = None
     try:
         temp_dir = tempfile.mkdtemp(prefix="hiro_clone_")
@@ -21,7 +21,8 @@ def parse_github_repo(repo_url):
         Repo.clone_from(repo_url, temp_dir, depth=1)
         print(f"Cloned to {temp_dir}")
         print()
-        all_facts = parse_folder_multi_language(temp_dir)
+        all_facts = parse_folder_multi_language(temp_dir, jobs=jobs, compact=compact,
+                                                report=report)
         return all_facts
 
     except Exception as e:
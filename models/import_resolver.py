@@ -0,0 +1,262 @@
+"""
+Import Resolver — exact file-level dependency graph
+Maps every import / require in the facts to the repo file it loads:
+  - Python relative (from ..pkg import x) and absolute (import pkg.mod)
+    imports, the latter looked up from the import roots only
+  - JS/TS relative require() / import paths, with extensions and index files
+  - Java class, static and package (wildcard) imports
+Files are found through path indexes built once per analysis, so each
+import costs a few dict lookups. Imports of packages outside the analyzed
+files (npm modules, the standard library, ...) resolve to nothing.
+"""
+
+import os
+import sys
+from pathlib import PurePath
+
+from models.symbol_table import facts_file
+
+
+SCRIPT_LANGUAGES = {'javascript', 'typescript', 'tsx'}
+
+# Tried in order after the exact path, then as <dir>/index<ext>
+SCRIPT_EXTENSIONS = ['.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs']
+
+# TypeScript projects import './x.js' for a source file x.ts
+TS_SOURCE_FOR = {'.js': ['.ts', '.tsx'], '.jsx': ['.tsx'], '.mjs': ['.mts'], '.cjs': ['.cts']}
+
+# import json / import logging mean the standard library, even where a
+# project file shares the name
+STDLIB_MODULES = frozenset(getattr(sys, 'stdlib_module_names', ()))
+
+
+def _norm(path):
+    return os.path.normpath(str(path))
+
+
+def _common_depth(a, b):
+    depth = 0
+    for x, y in zip(PurePath(a).parts, PurePath(b).parts):
+        if x != y:
+            break
+        depth += 1
+    return depth
+
+
+class ImportResolver:
+    """Path indexes over one analysis' files."""
+
+    def __init__(self, files):
+        """files: [(path, language), ...]"""
+        self._paths   = set()
+        self._modules = {'python': {}, 'java': {}}   # python: module name, java: dotted suffix → [path]
+        self._java_packages = {}                     # dotted suffix → [path]
+
+        python_files = []
+        for path, language in files:
+            path = _norm(path)
+            self._paths.add(path)
+
+            if language == 'python':
+                python_files.append(path)
+            elif language == 'java':
+                pure  = PurePath(path).with_suffix('')
+                parts = list(pure.parts[1:] if pure.anchor else pure.parts)
+                self._index_suffixes(self._modules['java'], parts, path)
+                self._index_suffixes(self._java_packages, parts[:-1], path)
+        self._index_python(python_files)
+
+    def _index_python(self, paths):
+        """
+        Names every Python file by its module name under each import root
+        above it. The roots are the analyzed folder (the common directory
+        of all Python files) and the directory holding each top-level
+        package (the highest directory with an __init__.py above a file).
+        app/json.py is app.json, never json, unless app is itself a root.
+        """
+        if not paths:
+            return
+        roots = set()
+        try:
+            roots.add(os.path.commonpath([os.path.dirname(p) for p in paths]))
+        except ValueError:   # absolute and relative paths mixed
+            pass
+        for path in paths:
+            directory, top = os.path.dirname(path), None
+            while os.path.join(directory, '__init__.py') in self._paths:
+                top = directory
+                parent = os.path.dirname(directory)
+                if parent == directory:
+                    break
+                directory = parent
+            if top is not None:
+                roots.add(os.path.dirname(top))
+
+        index = self._modules['python']
+        for path in paths:
+            parts = list(PurePath(path).with_suffix('').parts)
+            if parts[-1] == '__init__':
+                parts = parts[:-1]
+            # Walk up from the module's directory: each root on the way names it
+            directory = os.path.dirname(os.path.join(*parts))
+            for depth in range(len(parts) - 1, 0, -1):
+                if directory in roots:
+                    index.setdefault('.'.join(parts[depth:]), []).append(path)
+                parent = os.path.dirname(directory)
+                if parent == directory:
+                    break
+                directory = parent
+
+    @staticmethod
+    def _index_suffixes(index, parts, path):
+        # Every dotted suffix of the path: a/b/C.java → C, b.C, a.b.C
+        for start in range(len(parts) - 1, -1, -1):
+            index.setdefault('.'.join(parts[start:]), []).append(path)
+
+    def _closest(self, candidates, importer):
+        """The candidate sharing the most leading directories with the importer."""
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        depths = [(_common_depth(c, importer), c) for c in candidates]
+        best   = max(depth for depth, _ in depths)
+        winners = [c for depth, c in depths if depth == best]
+        return winners[0] if len(winners) == 1 else None
+
+    # ── Python ────────────────────────────────────────────────────────
+
+    def resolve_python(self, module, importer):
+        if module.startswith('.'):
+            dots = len(module) - len(module.lstrip('.'))
+            base = os.path.dirname(importer)
+            for _ in range(dots - 1):
+                base = os.path.dirname(base)
+            rest   = module[dots:]
+            target = os.path.join(base, *rest.split('.')) if rest else base
+            for candidate in (target + '.py', os.path.join(target, '__init__.py')):
+                candidate = _norm(candidate)
+                if candidate in self._paths:
+                    return [candidate]
+            return []
+
+        if module.split('.')[0] in STDLIB_MODULES:
+            return []
+
+        # A script's own directory is first on the import path when it
+        # runs, so a file run as a script imports its siblings directly
+        local = os.path.join(os.path.dirname(importer), *module.split('.'))
+        for candidate in (local + '.py', os.path.join(local, '__init__.py')):
+            if candidate in self._paths:
+                return [candidate]
+
+        found = self._closest(self._modules['python'].get(module, []), importer)
+        return [found] if found else []
+
+    # ── JavaScript / TypeScript ───────────────────────────────────────
+
+    def resolve_script(self, spec, importer):
+        # Bare specifiers are packages (node_modules), not repo files
+        if not spec.startswith('.'):
+            return []
+        target = _norm(os.path.join(os.path.dirname(importer), spec))
+
+        candidates = [target]
+        candidates += [target + ext for ext in SCRIPT_EXTENSIONS]
+        root, ext = os.path.splitext(target)
+        candidates += [root + src for src in TS_SOURCE_FOR.get(ext, [])]
+        candidates += [os.path.join(target, 'index' + ext) for ext in SCRIPT_EXTENSIONS]
+
+        for candidate in candidates:
+            if candidate in self._paths:
+                return [candidate]
+        return []
+
+    # ── Java ──────────────────────────────────────────────────────────
+
+    def resolve_java(self, name, importer):
+        classes = self._modules['java']
+
+        # com.x.Service  (class)
+        found = self._closest(classes.get(name, []), importer)
+        if found:
+            return [found]
+
+        # com.x.Util.helper  (static import of a member)
+        owner = name.rpartition('.')[0]
+        if owner:
+            found = self._closest(classes.get(owner, []), importer)
+            if found:
+                return [found]
+
+        # com.x.*  (package import — every file of the package)
+        return sorted(self._java_packages.get(name, []))
+
+    def resolve(self, facts):
+        """Repo files one file's imports load, in import order, without repeats."""
+        importer = _norm(facts_file(facts))
+        language = facts.get('language')
+
+        if language == 'python':
+            specs, resolve = facts.get('imports', []), self.resolve_python
+        elif language in SCRIPT_LANGUAGES:
+            specs = list(dict.fromkeys(facts.get('requires', []) + facts.get('imports', [])))
+            resolve = self.resolve_script
+        elif language == 'java':
+            specs, resolve = facts.get('imports', []), self.resolve_java
+        else:
+            return []
+
+        targets = {}
+        for spec in specs:
+            for target in resolve(spec, importer):
+                if target != importer:
+                    targets.setdefault(target, None)
+        return list(targets)
+
+
+class DependencyGraphBuilder:
+    """
+    Collects files one at a time — keeping only their paths and import
+    specs — and resolves the graph once every file is known.
+    """
+
+    def __init__(self):
+        self._files   = {}   # normalized path → (facts_file, language)
+        self._imports = []   # per file: the facts fields resolve() reads
+
+    def add(self, facts, language):
+        if not isinstance(facts, dict):
+            return
+        file = facts_file(facts)
+        self._files[_norm(file)] = (file, facts.get('language', language))
+        self._imports.append({
+            'filepath': file,
+            'language': facts.get('language'),
+            'imports':  facts.get('imports', []),
+            'requires': facts.get('requires', []),
+        })
+
+    def build(self):
+        resolver = ImportResolver(
+            (path, language) for path, (_, language) in self._files.items()
+        )
+        graph = {}
+        for facts in self._imports:
+            graph[facts['filepath']] = [
+                self._files[target][0] for target in resolver.resolve(facts)
+            ]
+        return graph
+
+
+def build_dependency_graph(all_facts):
+    """
+    File-level dependency graph of an analysis: {file: [files it imports]}
+    keyed by each facts' filepath (filename when there is no path), with
+    an entry for every file.
+    """
+    builder = DependencyGraphBuilder()
+    for language, facts_list in all_facts.items():
+        for facts in facts_list:
+            builder.add(facts, language)
+    return builder.build()
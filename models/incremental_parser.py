@@ -0,0 +1,310 @@
+"""
+Incremental Parser for watch-mode sessions
+Keeps the previous tree-sitter Tree for every file of a local folder and
+re-parses saves with tree.edit + parser.parse(new_bytes, old_tree). The
+extractor only runs again when an edit touches a definition, import or call.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from models.universe_parser import detect_language, get_parser, iter_children
+from models.source_guard import check_size, check_source
+from models.multi_language_parser import (
+    EXTRACTORS,
+    discover_source_files,
+    extract_file_facts,
+    is_backend_file,
+)
+
+
+# Node types whose text feeds the extractors. An edit that touches none of
+# them cannot change the facts, so the previous facts are reused.
+_SCRIPT_TYPES = {
+    'function_declaration', 'class_declaration', 'method_definition',
+    'lexical_declaration', 'variable_declaration', 'variable_declarator',
+    'arrow_function', 'call_expression', 'import_statement',
+    'assignment_expression', 'jsx_element', 'jsx_self_closing_element',
+}
+
+STRUCTURAL_TYPES = {
+    'python': {
+        'class_definition', 'function_definition', 'call',
+        'import_statement', 'import_from_statement',
+    },
+    'java': {
+        'class_declaration', 'interface_declaration', 'method_declaration',
+        'constructor_declaration', 'field_declaration', 'import_declaration',
+        'marker_annotation', 'annotation',
+    },
+    'javascript': _SCRIPT_TYPES,
+    'typescript': _SCRIPT_TYPES | {
+        'interface_declaration', 'type_alias_declaration', 'enum_declaration',
+    },
+}
+STRUCTURAL_TYPES['tsx'] = STRUCTURAL_TYPES['typescript']
+
+# The JS extractor keeps a 50-character preview of `module.exports = ...`;
+# 4 bytes per character covers any UTF-8 text.
+EXPORT_PREVIEW_BYTES = 50 * 4
+
+# Edits inside these nodes' `body` only matter if they touch one of the
+# structural types themselves (a call, a nested definition, JSX, ...)
+FUNCTION_TYPES = {
+    'function_definition', 'function_declaration', 'arrow_function',
+    'method_definition', 'method_declaration', 'constructor_declaration',
+}
+
+
+def _point_at(code, byte_offset):
+    """(row, column) of a byte offset, as tree-sitter expects it."""
+    row = code.count(b'\n', 0, byte_offset)
+    line_start = code.rfind(b'\n', 0, byte_offset) + 1
+    return (row, byte_offset - line_start)
+
+
+def _common_prefix_len(a, b):
+    # Binary search over slice comparisons keeps the byte loop in C
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix_len(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def compute_edit(old_code, new_code):
+    """
+    Describe the change from old_code to new_code as one tree-sitter edit.
+    Returns (start_byte, old_end_byte, new_end_byte).
+    """
+    start = _common_prefix_len(old_code, new_code)
+    limit = min(len(old_code), len(new_code)) - start
+    suffix = _common_suffix_len(old_code, new_code, limit)
+    return start, len(old_code) - suffix, len(new_code) - suffix
+
+
+def _touches_structure(tree, start_byte, end_byte, language):
+    """
+    True if the byte range overlaps a node the extractor reads — either a
+    structural node inside the range, or a structural ancestor whose header
+    (name, parameters, arguments, ...) contains the range.
+    """
+    types = STRUCTURAL_TYPES[language]
+    root  = tree.root_node
+    node  = root.descendant_for_byte_range(start_byte, end_byte) or root
+
+    # Structural nodes inside the changed span
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.type in types:
+            return True
+        for child in iter_children(current):
+            if child.start_byte <= end_byte and child.end_byte >= start_byte:
+                stack.append(child)
+
+    # Edits near the start of an assignment's right-hand side change the
+    # exports preview, even deep inside a function body
+    if 'assignment_expression' in types:
+        current = node
+        while current is not None:
+            if current.type == 'assignment_expression':
+                right = current.child_by_field_name('right')
+                if right is not None and start_byte < right.start_byte + EXPORT_PREVIEW_BYTES:
+                    return True
+            current = current.parent
+
+    # Nearest structural ancestor — harmless only if we came through a
+    # function body
+    child, parent = node, node.parent
+    while parent is not None:
+        if parent.type in types:
+            body = parent.child_by_field_name('body')
+            return not (parent.type in FUNCTION_TYPES and body is not None
+                        and body.id == child.id)
+        child, parent = parent, parent.parent
+
+    return False
+
+
+class IncrementalSession:
+    """
+    Keeps the last tree, bytes and facts per file so re-analysis after a
+    save only costs an incremental parse, and usually no extractor run.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def __contains__(self, filepath):
+        return str(filepath) in self._entries
+
+    def forget(self, filepath):
+        self._entries.pop(str(filepath), None)
+
+    def parse(self, filepath):
+        """
+        Parse (or re-parse) one file.
+        Returns (facts, reextracted) — reextracted is False when the
+        previous facts were reused.
+        """
+        filepath = Path(filepath)
+        key      = str(filepath)
+        language = detect_language(filepath)
+        if language not in EXTRACTORS:
+            raise ValueError(f"No extractor for language: {language}")
+
+        # Whole bytes, not an mmap — they are kept to diff the next save
+        check_size(filepath)
+        with open(filepath, 'rb') as f:
+            code = f.read()
+        check_source(code)
+
+        parser = get_parser(language)
+        entry  = self._entries.get(key)
+
+        if entry is None or entry['language'] != language:
+            tree  = parser.parse(code)
+            facts = extract_file_facts(tree, language, code, filepath)
+            self._entries[key] = {'language': language, 'code': code,
+                                  'tree': tree, 'facts': facts}
+            return facts, True
+
+        old_code, old_tree = entry['code'], entry['tree']
+        if code == old_code:
+            return entry['facts'], False
+
+        start, old_end, new_end = compute_edit(old_code, code)
+
+        # Deletions only show up in the old tree, so check it before editing
+        touched = _touches_structure(old_tree, start, old_end, language)
+
+        old_tree.edit(
+            start_byte=start,
+            old_end_byte=old_end,
+            new_end_byte=new_end,
+            start_point=_point_at(old_code, start),
+            old_end_point=_point_at(old_code, old_end),
+            new_end_point=_point_at(code, new_end),
+        )
+        tree = parser.parse(code, old_tree)
+
+        if tree.root_node.has_error:
+            # Error recovery can settle differently when reusing an old
+            # tree; a fresh parse keeps the facts identical to a full run
+            tree, touched = parser.parse(code), True
+
+        if not touched:
+            # Ranges are in new-file coordinates, which the edited old tree
+            # shares — check both so structure that vanished is caught too
+            ranges = [(start, new_end)] + [
+                (r.start_byte, r.end_byte) for r in old_tree.changed_ranges(tree)
+            ]
+            touched = any(
+                _touches_structure(t, lo, hi, language)
+                for lo, hi in ranges
+                for t in (tree, old_tree)
+            )
+
+        if touched:
+            facts = extract_file_facts(tree, language, code, filepath)
+        else:
+            facts = entry['facts']
+
+        entry.update(code=code, tree=tree, facts=facts)
+        return facts, touched
+
+
+def _backend_files(folder_path):
+    files = []
+    for ext_files in discover_source_files(folder_path).values():
+        files.extend(f for f in ext_files if is_backend_file(f))
+    return files
+
+
+def watch_folder(folder_path, interval=0.5, on_change=None):
+    """
+    Watch a local folder and keep its facts current on every save.
+
+    Polls file mtimes every `interval` seconds. on_change(all_facts) is
+    called after the initial parse and whenever any file's facts change.
+    Runs until interrupted.
+    """
+    session = IncrementalSession()
+    mtimes  = {}
+    facts_by_file = {}
+
+    def snapshot():
+        all_facts = {}
+        for facts in facts_by_file.values():
+            all_facts.setdefault(facts['language'], []).append(facts)
+        return all_facts
+
+    for file in _backend_files(folder_path):
+        try:
+            facts, _ = session.parse(file)
+            facts_by_file[str(file)] = facts
+            mtimes[str(file)] = os.stat(file).st_mtime_ns
+        except Exception as e:
+            print(f"  ✗ {file.name}: {e}")
+
+    print(f"Watching {len(facts_by_file)} files in {folder_path} (Ctrl+C to stop)")
+    if on_change:
+        on_change(snapshot())
+
+    try:
+        while True:
+            time.sleep(interval)
+            changed = False
+            current = {str(f): f for f in _backend_files(folder_path)}
+
+            for key in list(mtimes):
+                if key not in current:
+                    session.forget(key)
+                    mtimes.pop(key)
+                    facts_by_file.pop(key, None)
+                    print(f"  − {Path(key).name} removed")
+                    changed = True
+
+            for key, file in current.items():
+                try:
+                    mtime = os.stat(file).st_mtime_ns
+                except OSError:
+                    continue
+                if mtimes.get(key) == mtime:
+                    continue
+                mtimes[key] = mtime
+
+                started = time.perf_counter()
+                try:
+                    facts, reextracted = session.parse(file)
+                except Exception as e:
+                    print(f"  ✗ {file.name}: {e}")
+                    continue
+                elapsed = (time.perf_counter() - started) * 1000
+
+                updated = reextracted and facts_by_file.get(key) != facts
+                facts_by_file[key] = facts
+                status = "facts updated" if updated else "facts unchanged"
+                print(f"  ↻ {file.name} — {elapsed:.1f} ms, {status}")
+                changed = changed or updated
+
+            if changed and on_change:
+                on_change(snapshot())
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
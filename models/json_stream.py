@@ -0,0 +1,202 @@
+"""
+Incremental JSON — parses a model's JSON answer while it streams in
+feed() takes the text as it arrives, in chunks of any size, and returns
+the items completed by it in the watched arrays (e.g. diagram.nodes), so
+each node or edge can be shown as soon as its closing brace arrives. A
+value cut by the end of a chunk is resumed by the next one. Text before
+the first "{" (a markdown fence) and after the closing "}" is ignored.
+
+A container is attached to its parent only once it is closed, so the
+document holds complete values only. For an answer cut short (the token
+limit) or broken by a syntax error, partial() is the document up to that
+point: every value written in full, in the objects and arrays still open.
+Trailing commas before "}" or "]" are accepted.
+"""
+
+import copy
+import json
+import re
+
+
+STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+NUMBER_CHARS = re.compile(r'[-+0-9.eE]+')
+SPACE  = re.compile(r'\s*')
+LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+class _Frame:
+    """An open object or array: its value so far and what may come next."""
+
+    __slots__ = ('container', 'path', 'key', 'state')
+
+    def __init__(self, container, path, state):
+        self.container = container
+        self.path      = path    # keys (and indexes) from the root
+        self.key       = None    # objects: the key whose value is being read
+        self.state     = state
+
+
+class JSONStreamParser:
+    """
+    watch: paths of arrays whose items are reported as they complete,
+    e.g. {("diagram", "nodes"), ("diagram", "edges")}.
+    """
+
+    def __init__(self, watch=()):
+        self.watch   = set(watch)
+        self.root    = None
+        self.done    = False     # the top-level object is closed
+        self.error   = None      # the first syntax error; parsing stops there
+        self._buffer = ""
+        self._stack  = []
+        self._events = []
+
+    def feed(self, text):
+        """Parses one more chunk. Returns [(array path, item), ...] completed by it."""
+        if self.done or self.error is not None:
+            return []
+        self._buffer += text
+        try:
+            self._buffer = self._buffer[self._parse(self._buffer):]
+        except ValueError as e:
+            self.error = str(e)
+        events, self._events = self._events, []
+        return events
+
+    # ── Parsing ───────────────────────────────────────────────
+
+    def _parse(self, text):
+        """Consumes as much of text as forms whole tokens. Returns where it stopped."""
+        pos = 0
+        end = len(text)
+        if self.root is None and not self._stack:
+            pos = text.find("{")
+            if pos == -1:
+                return end
+
+        while not self.done:
+            pos = SPACE.match(text, pos).end()
+            if pos == end:
+                break
+            char  = text[pos]
+            frame = self._stack[-1] if self._stack else None
+            state = frame.state if frame is not None else "value"
+
+            if state == "key_or_end":
+                if char == "}":
+                    self._close()
+                    pos += 1
+                    continue
+                if char != '"':
+                    raise ValueError(f"expected a key at {text[pos:pos + 20]!r}")
+                match = STRING.match(text, pos)
+                if match is None:
+                    break
+                frame.key   = json.loads(match.group(), strict=False)
+                frame.state = "colon"
+                pos = match.end()
+
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"expected ':' at {text[pos:pos + 20]!r}")
+                frame.state = "value"
+                pos += 1
+
+            elif state == "comma_or_end":
+                is_object = isinstance(frame.container, dict)
+                if char == ",":
+                    frame.state = "key_or_end" if is_object else "value_or_end"
+                elif char == ("}" if is_object else "]"):
+                    self._close()
+                else:
+                    raise ValueError(f"expected ',' at {text[pos:pos + 20]!r}")
+                pos += 1
+
+            else:   # a value, or the end of an empty array
+                if char == "]" and state == "value_or_end":
+                    self._close()
+                    pos += 1
+                    continue
+                consumed = self._value(text, pos, char)
+                if consumed is None:
+                    break
+                pos = consumed
+        return pos
+
+    def _value(self, text, pos, char):
+        """Reads the value starting at pos. Returns the position after it, or None for more text."""
+        if char in "{[":
+            parent = self._stack[-1] if self._stack else None
+            path   = () if parent is None else parent.path + (
+                parent.key if isinstance(parent.container, dict) else len(parent.container),
+            )
+            if char == "{":
+                self._stack.append(_Frame({}, path, "key_or_end"))
+            else:
+                self._stack.append(_Frame([], path, "value_or_end"))
+            return pos + 1
+
+        if char == '"':
+            match = STRING.match(text, pos)
+            if match is None:
+                return None
+            self._attach(json.loads(match.group(), strict=False))
+            return match.end()
+
+        if char == "-" or char.isdigit():
+            # A number at the end of the text may go on in the next chunk
+            extent = NUMBER_CHARS.match(text, pos).end()
+            if extent == len(text):
+                return None
+            if not NUMBER.fullmatch(text, pos, extent):
+                raise ValueError(f"invalid number {text[pos:extent]!r}")
+            self._attach(json.loads(text[pos:extent]))
+            return extent
+
+        for literal, value in LITERALS.items():
+            if text.startswith(literal, pos):
+                self._attach(value)
+                return pos + len(literal)
+            if literal.startswith(text[pos:]):
+                return None
+        raise ValueError(f"unexpected {text[pos:pos + 20]!r}")
+
+    def partial(self):
+        """
+        The document so far: the top-level object with every complete value,
+        including those inside objects and arrays not closed yet. An object
+        or array open inside an array (a half-written node) is left out, as
+        is a key whose value is incomplete. None before the first "{".
+        """
+        if self.done or not self._stack:
+            return self.root
+        child = None
+        for depth in range(len(self._stack) - 1, -1, -1):
+            frame     = self._stack[depth]
+            container = copy.copy(frame.container)
+            if child is not None:
+                container[frame.key] = child
+            parent = self._stack[depth - 1] if depth else None
+            # Open items of an array are dropped, open values of a key kept
+            child = None if isinstance(getattr(parent, "container", None), list) else container
+        return container
+
+    def _close(self):
+        frame = self._stack.pop()
+        self._attach(frame.container)
+
+    def _attach(self, value):
+        if not self._stack:
+            self.root = value
+            self.done = True
+            return
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            frame.container[frame.key] = value
+            frame.key = None
+        else:
+            frame.container.append(value)
+            if frame.path in self.watch:
+                self._events.append((frame.path, value))
+        frame.state = "comma_or_end"
@@ -2,27 +2,36 @@
 Multi-Language Parser
 """
 
+import copy
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from models.universe_parser import parse_file_universal, detect_language
+from models.universe_parser import parse_file_universal, detect_language, get_parser
 from models.extractors.py_extractor import extract_python
 from models.extractors.java_extractor import extract_java
 from models.extractors.js_extractor import extract_javascript
 from models.extractors.ts_extractor import extract_typescript
+from models import facts_cache, prefilter
+from models.file_facts import FactsList, FactsStore
+from models.source_guard import SkippedFile, load_source
 
 
-def parse_file_any_language(filepath):
-    filepath = Path(filepath)
-    tree, language, code = parse_file_universal(filepath)
+EXTRACTORS = {
+    'python':     extract_python,
+    'java':       extract_java,
+    'javascript': extract_javascript,
+    'typescript': extract_typescript,
+    'tsx':        extract_typescript,
+}
+
 
-    extractors = {
-        'python':     extract_python,
-        'java':       extract_java,
-        'javascript': extract_javascript,
-        'typescript': extract_typescript,
-        'tsx':        extract_typescript,
-    }
+def extract_file_facts(tree, language, code, filepath):
+    """Run the language's extractor on an already parsed tree."""
+    filepath = Path(filepath)
 
-    extractor = extractors.get(language)
+    extractor = EXTRACTORS.get(language)
     if not extractor:
         raise ValueError(f"No extractor for language: {language}")
 
@@ -34,6 +43,94 @@ def parse_file_any_language(filepath):
     return facts
 
 
+def parse_file_any_language(filepath, code=None):
+    filepath = Path(filepath)
+    tree, language, code = parse_file_universal(filepath, code=code)
+    return extract_file_facts(tree, language, code, filepath)
+
+
+def parse_file_cached(filepath, code=None, counters=None):
+    """
+    parse_file_any_language behind the persistent facts cache.
+    Files whose content, language and extractor version are unchanged
+    skip both tree-sitter and the extractor. counters, a CacheCounters,
+    counts the hit or miss.
+    """
+    filepath = Path(filepath)
+    language = detect_language(filepath)
+    if language == 'unknown':
+        return parse_file_any_language(filepath, code=code)
+
+    if code is None:
+        code = load_source(filepath)
+    key = facts_cache.compute_key(code, language)
+
+    facts = facts_cache.get_facts(key, counters)
+    if facts is None:
+        facts = parse_file_any_language(filepath, code=code)
+        facts_cache.put_facts(key, facts)
+    else:
+        facts['filepath'] = str(filepath)
+        facts['filename'] = filepath.name
+
+    return facts
+
+
+# Language → the facts its extractor produces for a file with no content
+_empty_facts = {}
+
+
+def empty_file_facts(language, filepath):
+    """The facts of a file the extractor would find nothing in."""
+    template = _empty_facts.get(language)
+    if template is None:
+        template = _empty_facts[language] = EXTRACTORS[language](
+            get_parser(language).parse(b''), b'')
+
+    filepath = Path(filepath)
+    facts = copy.deepcopy(template)
+    facts['language'] = language
+    facts['filepath'] = str(filepath)
+    facts['filename'] = filepath.name
+    return facts
+
+
+def parse_file_prefiltered(filepath, use_cache=False, counters=None):
+    """
+    parse_file_any_language (or parse_file_cached) behind the byte-level
+    pre-filter: a file without any of its language's fact keywords gets
+    its (empty) facts without being parsed. counters, a ParseCounters,
+    receives the scan and the cache lookups.
+    """
+    counters = counters or ParseCounters()
+    filepath = Path(filepath)
+    language = detect_language(filepath)
+    code     = load_source(filepath)
+
+    if language in EXTRACTORS and not prefilter.may_have_facts(code, language, counters.prefilter):
+        return empty_file_facts(language, filepath)
+
+    started = time.perf_counter()
+    if use_cache:
+        facts = parse_file_cached(filepath, code=code, counters=counters.cache)
+    else:
+        facts = parse_file_any_language(filepath, code=code)
+    prefilter.record_parse(len(code), time.perf_counter() - started, counters.prefilter)
+    return facts
+
+
+# Only backend-relevant extensions — no HTML, CSS
+SUPPORTED_EXTENSIONS = ['.py', '.java', '.js', '.jsx', '.ts', '.tsx']
+
+# Directories that never contain backend logic — build output, dependencies, tests
+EXCLUDED_DIRS = {
+    'node_modules', 'venv', '__pycache__', 'build',
+    'dist', '.git', 'target', 'out', '.next', '.nuxt',
+    'coverage', 'public', 'static', 'assets'
+}
+TEST_DIRS = {'test', 'tests', '__tests__', 'spec', 'specs'}
+
+
 def is_backend_file(filepath):
     """
     Returns True only for files that are actual backend logic.
@@ -44,7 +141,7 @@ def is_backend_file(filepath):
     parts = [p.lower() for p in path.parts]
 
     # Skip test files
-    if any(p in parts for p in ['test', 'tests', '__tests__', 'spec', 'specs']):
+    if any(p in TEST_DIRS for p in parts):
         return False
     if name.endswith('.test.js') or name.endswith('.spec.js'):
         return False
@@ -66,56 +163,311 @@ def is_backend_file(filepath):
         return False
 
     # Skip node_modules, build output, etc.
-    excluded_dirs = [
-        'node_modules', 'venv', '__pycache__', 'build',
-        'dist', '.git', 'target', 'out', '.next', '.nuxt',
-        'coverage', 'public', 'static', 'assets'
-    ]
-    if any(ex in parts for ex in excluded_dirs):
+    if any(p in EXCLUDED_DIRS for p in parts):
         return False
 
     return True
 
 
-def parse_folder_multi_language(folder_path):
-    folder = Path(folder_path)
+def discover_source_files(folder_path, extensions=SUPPORTED_EXTENSIONS):
+    """
+    Single-pass directory walk that buckets files by extension.
 
-    # Only backend-relevant extensions — no HTML, CSS
-    supported_extensions = ['.py', '.java', '.js', '.jsx', '.ts', '.tsx']
-    all_files = []
+    Excluded and test directories are pruned before descending, so a huge
+    node_modules or .git is never listed. Symlinked directories are not
+    followed. Returns {extension: [Path, ...]} with each bucket sorted so
+    the discovery order is stable across runs and filesystems.
+    """
+    buckets = {ext: [] for ext in extensions}
+    skip_dirs = EXCLUDED_DIRS | TEST_DIRS
+    stack = [os.fspath(folder_path)]
 
-    for ext in supported_extensions:
-        all_files.extend(folder.rglob(f'*{ext}'))
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name.lower() not in skip_dirs:
+                                stack.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
 
-    # Apply backend filter
-    filtered_files = [f for f in all_files if is_backend_file(f)]
+                    ext = os.path.splitext(entry.name)[1]
+                    bucket = buckets.get(ext)
+                    if bucket is not None:
+                        bucket.append(entry.path)
+        except OSError:
+            continue
 
-    print(f"Found {len(filtered_files)} backend files "
-          f"(filtered from {len(all_files)} total)")
+    return {ext: [Path(p) for p in sorted(paths)] for ext, paths in buckets.items()}
 
-    # Group by language
-    files_by_language = {}
-    for file in filtered_files:
-        lang = detect_language(file)
-        if lang not in files_by_language:
-            files_by_language[lang] = []
-        files_by_language[lang].append(file)
-
-    # Parse each file
-    all_facts = {}
-    for language, files in files_by_language.items():
-        print(f"\nAnalyzing {len(files)} {language} files...")
-        language_facts = []
 
+# Parallel parsing: each worker task gets a contiguous run of files holding
+# roughly this share of the total bytes, so one huge file doesn't leave the
+# other workers idle while small files still travel in batches.
+CHUNKS_PER_WORKER = 4
+
+# Chunks submitted to the pool but not yet consumed, per worker. Bounds the
+# parsed facts waiting in memory when the consumer is slower than the pool.
+PENDING_CHUNKS_PER_WORKER = 2
+
+
+class ParseCounters:
+    """
+    Pre-filter and facts cache counts of one parse run. Each run has its
+    own, so parses running at once on the API's thread pool never mix
+    their numbers; worker processes send theirs back with each chunk.
+    """
+
+    def __init__(self):
+        self.prefilter = prefilter.ScanCounters()
+        self.cache     = facts_cache.CacheCounters()
+
+    def add(self, other):
+        self.prefilter.add(other.prefilter)
+        self.cache.add(other.cache)
+
+
+def _parse_chunk(paths, use_cache=False, counters=None):
+    """
+    Process-pool task — parse a run of files without letting one bad
+    file fail the whole chunk. Returns ([(facts, error), ...] in input
+    order, the chunk's ParseCounters). error is a message, or the
+    SkippedFile for files the source guard turned away.
+    """
+    counters = counters or ParseCounters()
+    results = []
+    for path in paths:
+        try:
+            results.append((parse_file_prefiltered(path, use_cache, counters), None))
+        except SkippedFile as e:
+            results.append((None, e))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results, counters
+
+
+def _chunk_by_size(files, jobs):
+    """Split files into contiguous chunks of roughly equal total size."""
+    sizes = []
+    for file in files:
+        try:
+            sizes.append(file.stat().st_size)
+        except OSError:
+            sizes.append(0)
+
+    target = max(sum(sizes) // (jobs * CHUNKS_PER_WORKER), 1)
+    chunks, current, current_size = [], [], 0
+
+    for file, size in zip(files, sizes):
+        current.append(file)
+        current_size += size
+        if current_size >= target:
+            chunks.append(current)
+            current, current_size = [], 0
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def parse_files(files, jobs=1, use_cache=False, counters=None):
+    """
+    Parse files and yield (file, facts, error) in the same order as `files`.
+
+    jobs > 1 spreads the work over a process pool. Results are still
+    yielded in input order, so the facts — and the diagram cache hash built
+    from them — are identical to the serial path. use_cache puts the
+    persistent facts cache in front of every parse. Files the pre-filter
+    finds nothing to extract in are not parsed at all. counters, a
+    ParseCounters, receives the pre-filter and cache counts from all
+    workers.
+    """
+    counters = counters or ParseCounters()
+    if jobs <= 1 or len(files) < 2:
         for file in files:
-            try:
-                facts = parse_file_any_language(file)
-                language_facts.append(facts)
-                print(f"  ✓ {file.name}")
-            except Exception as e:
-                print(f"  ✗ {file.name}: {e}")
+            results, _ = _parse_chunk([file], use_cache, counters)
+            facts, error = results[0]
+            yield file, facts, error
+        return
+
+    chunks  = _chunk_by_size(files, jobs)
+    workers = min(jobs, len(chunks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_parse_chunk, chunk, use_cache)))
+            if len(pending) < workers * PENDING_CHUNKS_PER_WORKER:
                 continue
+            yield from _chunk_results(*pending.popleft(), counters)
+        while pending:
+            yield from _chunk_results(*pending.popleft(), counters)
+
+
+def _chunk_results(chunk, future, counters):
+    results, chunk_counters = future.result()
+    counters.add(chunk_counters)
+    for file, (facts, error) in zip(chunk, results):
+        yield file, facts, error
+
+
+def discover_backend_files(folder_path):
+    """
+    Backend files under folder_path grouped by language: {language: [Path]}.
+    Also returns how many source files were found before filtering.
+    """
+    all_files = []
+    for files in discover_source_files(folder_path).values():
+        all_files.extend(files)
+
+    files_by_language = {}
+    for file in all_files:
+        if is_backend_file(file):
+            files_by_language.setdefault(detect_language(file), []).append(file)
+
+    return files_by_language, len(all_files)
+
+
+def _relative(file, folder):
+    try:
+        return file.relative_to(folder).as_posix()
+    except ValueError:
+        return str(file)
+
+
+class ParseReport:
+    """
+    What a folder parse did besides producing facts. Pass one to
+    iter_folder_facts or parse_folder_multi_language to have it filled in.
+    """
+
+    def __init__(self):
+        # Every language with backend files, in discovery order
+        self.languages = []
+        # file: path relative to the parsed folder
+        self.parsed  = 0
+        self.failed  = []   # {'file', 'language', 'error'}
+        self.skipped = []   # {'file', 'language', 'reason'}
+        # ScanCounters.stats(): files the byte scan found nothing to
+        # extract in, and the parse time that saved
+        self.prefilter = {}
+        # Facts cache lookups of this parse: {'hits', 'misses'}
+        self.cache = {}
+
+    def as_dict(self):
+        return {
+            'parsed':    self.parsed,
+            'failed':    self.failed,
+            'skipped':   self.skipped,
+            'prefilter': self.prefilter,
+            'cache':     self.cache,
+        }
+
+
+def iter_folder_facts(folder_path, jobs=1, use_cache=True, verbose=False, report=None):
+    """
+    Parse every backend file under folder_path, yielding (language, facts)
+    for each file as soon as it is parsed. Files come grouped by language,
+    in the order parse_folder_multi_language lists them; files that fail
+    to parse are left out.
+
+    Only the facts of the file being yielded (and, with jobs > 1, of a few
+    chunks parsed ahead) are alive at once, so consumers that keep a digest
+    instead of every facts dict run in bounded memory. verbose prints the
+    same progress as parse_folder_multi_language. report, a ParseReport,
+    receives the files that failed or were skipped by the source guard,
+    the pre-filter's statistics and this run's facts cache hits and misses.
+    """
+    if report is None:
+        report = ParseReport()
+    folder = Path(folder_path)
+    files_by_language, total = discover_backend_files(folder)
+    report.languages = list(files_by_language)
+
+    if verbose:
+        found = sum(len(files) for files in files_by_language.values())
+        print(f"Found {found} backend files (filtered from {total} total)")
+        if jobs > 1:
+            print(f"Parsing with {jobs} worker processes")
+
+    # Parse each file — all languages go through one pool so it stays busy
+    ordered_files = [f for files in files_by_language.values() for f in files]
+    counters = ParseCounters()
+    results  = parse_files(ordered_files, jobs=jobs, use_cache=use_cache, counters=counters)
+
+    try:
+        for language, files in files_by_language.items():
+            if verbose:
+                print(f"\nAnalyzing {len(files)} {language} files...")
+
+            for _ in files:
+                file, facts, error = next(results)
+                if isinstance(error, SkippedFile):
+                    report.skipped.append(
+                        {'file': _relative(file, folder), 'language': language, 'reason': str(error)})
+                    if verbose:
+                        print(f"  ⊘ {file.name}: skipped — {error}")
+                    continue
+                if error is not None:
+                    report.failed.append(
+                        {'file': _relative(file, folder), 'language': language, 'error': error})
+                    if verbose:
+                        print(f"  ✗ {file.name}: {error}")
+                    continue
+                report.parsed += 1
+                if verbose:
+                    print(f"  ✓ {file.name}")
+                yield language, facts
+    finally:
+        results.close()
+        if verbose and report.skipped:
+            print(f"\nSkipped {len(report.skipped)} large or generated file(s)")
+        report.prefilter = counters.prefilter.stats()
+        if verbose and report.prefilter['skipped']:
+            stats = report.prefilter
+            print(f"\nPre-filter: {stats['skipped']} of {stats['scanned']} files had "
+                  f"nothing to extract ({stats['skip_rate']:.1%}), "
+                  f"~{stats['seconds_saved'] * 1000:.0f} ms of parsing saved")
+        if use_cache:
+            hits, misses = facts_cache.flush_stats(counters.cache)
+            report.cache = {'hits': hits, 'misses': misses}
+            if verbose:
+                print(f"\nFacts cache: {hits} reused, {misses} parsed")
+
+
+def parse_folder_multi_language(folder_path, jobs=1, use_cache=True, compact=False,
+                                report=None):
+    """
+    Parse every backend file under folder_path.
+
+    jobs > 1 parses files in that many worker processes; the result is the
+    same as the serial path. use_cache reuses facts for files that are
+    unchanged since an earlier run. compact returns a FactsStore, which
+    reads back the same facts but holds them in a fraction of the memory.
+    report, a ParseReport, receives the files that failed or were skipped.
+    Every language with backend files is in the result, with an empty list
+    when none of its files parsed.
+    """
+    if report is None:
+        report = ParseReport()
+    folder    = Path(folder_path)
+    all_facts = FactsStore(folder) if compact else {}
+
+    for language, facts in iter_folder_facts(folder, jobs=jobs, use_cache=use_cache,
+                                             verbose=True, report=report):
+        if compact:
+            all_facts.add(facts, language)
+        else:
+            all_facts.setdefault(language, []).append(facts)
 
-        all_facts[language] = language_facts
+    # Re-inserted in discovery order, so a language without facts keeps its place
+    for language in report.languages:
+        facts_list = all_facts.pop(language, None)
+        if facts_list is None:
+            facts_list = FactsList(all_facts) if compact else []
+        all_facts[language] = facts_list
 
-    return all_facts
\ No newline at end of file
+    return all_facts
@@ -4,6 +4,9 @@ Multi-Language Renderer - Backend Architecture Focus
 
 from pathlib import Path
 
+from models.import_resolver import build_dependency_graph
+from models.symbol_table import build_symbol_table, facts_file
+
 LANGUAGE_STYLES = {
     'python':     {'icon': '🐍'},
     'java':       {'icon': '☕'},
@@ -105,15 +108,15 @@ def has_renderable_content(facts):
 
 # ── AI DIAGRAM RENDERER ───────────────────────────────────────────────
 
-def render_ai_diagram(result, output_path="diagram.mmd"):
+def build_ai_mermaid(result):
     """
-    Renders the AI-generated architecture result as a production-quality Mermaid diagram.
-    Uses role-based shapes, colour styles, and semantic edge labels from the LLM.
+    The Mermaid code of an AI-generated architecture result: role-based
+    shapes, colour styles, and semantic edge labels from the LLM. Also
+    used for the partial diagrams streamed while the LLM is still writing.
     """
     diagram = result.get("diagram", {})
     nodes   = diagram.get("nodes", [])
     edges   = diagram.get("edges", [])
-    desc    = result.get("description", {})
 
     #  Shape map by role 
     ROLE_SHAPES = {
@@ -232,7 +235,16 @@ def render_ai_diagram(result, output_path="diagram.mmd"):
         style = ROLE_STYLES.get(role, ROLE_STYLES["module"])
         lines.append(f"    style {nid} {style}")
 
-    mermaid_code = "\n".join(lines)
+    return "\n".join(lines)
+
+
+def render_ai_diagram(result, output_path="diagram.mmd"):
+    """
+    Renders the AI-generated architecture result as a production-quality Mermaid diagram.
+    Uses role-based shapes, colour styles, and semantic edge labels from the LLM.
+    """
+    mermaid_code = build_ai_mermaid(result)
+    desc         = result.get("description", {})
 
     #Build text description
     overview    = desc.get("overview", "")
@@ -283,14 +295,25 @@ def render_ai_diagram(result, output_path="diagram.mmd"):
 
 #  LEGACY DIAGRAM BUILDER (used by --file mode)
 
-def build_mermaid_multi_language(all_facts):
+def build_mermaid_multi_language(all_facts, symbols=None, dependencies=None):
+    """
+    symbols is the analysis' SymbolTable and dependencies its file-level
+    dependency graph; each is built here when not passed. Files are
+    connected along resolved imports, then along cross-file calls.
+    """
+    if symbols is None:
+        symbols = build_symbol_table(all_facts)
+    if dependencies is None:
+        dependencies = build_dependency_graph(all_facts)
+
     lines = ["graph TD"]
     lines.append("")
     edges = []
 
     id_counter    = 1
     file_node_map = {}
-    all_calls     = []
+    file_language = {}
+    cross_calls   = []
 
     for language, facts_list in all_facts.items():
         if not facts_list:
@@ -308,11 +331,13 @@ def build_mermaid_multi_language(all_facts):
                 continue
 
             filename = facts.get('filename', 'unknown')
+            file_key = facts_file(facts)
             role, role_label = detect_file_role(filename, facts)
 
             file_id = str(id_counter)
             id_counter += 1
-            file_node_map[filename] = file_id
+            file_node_map[file_key] = file_id
+            file_language[file_key] = language
 
             display_name = filename.replace('.js', '').replace('.ts', '') \
                                    .replace('.py', '').replace('.java', '')
@@ -355,34 +380,32 @@ def build_mermaid_multi_language(all_facts):
                     lines.append(f'    {func_id}("{func}")')
                     edges.append(f'    {file_id} -->|defines| {func_id}')
 
-            for req in facts.get('requires', []):
-                if req.startswith('.'):
-                    all_calls.append({'from_file': filename, 'to_file': req})
+            for call in symbols.resolve_calls(facts, dependencies):
+                cross_calls.append({'from_file': file_key, 'to_file': call['file']})
 
         lines.append("")
 
     lines.append("    %% File connections")
     seen_edges = set()
 
-    for call in all_calls:
-        from_file = call['from_file']
-        to_path   = call['to_file']
-
-        matched = None
-        for known_file in file_node_map:
-            known_stem = Path(known_file).stem.lower()
-            to_stem    = Path(to_path).name.lower().replace('.js', '').replace('.ts', '')
-            if known_stem == to_stem or to_stem in known_stem:
-                matched = known_file
-                break
-
-        if matched and from_file in file_node_map:
-            edge_key = f"{from_file}->{matched}"
-            if edge_key not in seen_edges:
+    for from_file, from_id in file_node_map.items():
+        label = 'requires' if file_language[from_file] in ('javascript', 'typescript', 'tsx') \
+                else 'imports'
+        for to_file in dependencies.get(from_file, []):
+            edge_key = f"{from_file}->{to_file}"
+            if to_file in file_node_map and edge_key not in seen_edges:
                 seen_edges.add(edge_key)
-                from_id = file_node_map[from_file]
-                to_id   = file_node_map[matched]
-                edges.append(f'    {from_id} -->|requires| {to_id}')
+                edges.append(f'    {from_id} -->|{label}| {file_node_map[to_file]}')
+
+    # Calls into functions of other files, unless an import already links them
+    for call in cross_calls:
+        from_file, to_file = call['from_file'], call['to_file']
+        if to_file == from_file or to_file not in file_node_map:
+            continue
+        edge_key = f"{from_file}->{to_file}"
+        if edge_key not in seen_edges:
+            seen_edges.add(edge_key)
+            edges.append(f'    {file_node_map[from_file]} -->|calls| {file_node_map[to_file]}')
 
     lines.extend(edges)
     return "\n".join(lines)
@@ -427,6 +450,7 @@ def infer_project_domain(all_facts):
 
 
 def generate_description(all_facts, cross_deps):
+    """cross_deps is the file-level dependency graph: {file: [files it imports]}."""
     languages   = list(all_facts.keys())
     total_files = sum(len(fl) for fl in all_facts.values())
     project_name, _ = infer_project_domain(all_facts)
@@ -519,6 +543,9 @@ def generate_description(all_facts, cross_deps):
             funcs   = facts.get('functions', [])
             classes = [c for c in facts.get('classes', []) if isinstance(c, dict)]
 
+            # Files this one imports, from the dependency graph
+            imported = [Path(f).name for f in cross_deps.get(facts_file(facts), [])]
+
             if classes:
                 for cls in classes[:2]:
                     cls_type = cls.get('type', 'class')
@@ -539,6 +566,9 @@ def generate_description(all_facts, cross_deps):
                     if methods:
                         desc.append(f"     Operations: {', '.join(methods[:6])}")
 
+                    if imported and cls is classes[0]:
+                        desc.append(f"     Imports: {', '.join(imported[:4])}")
+
                     desc.append("")
 
             elif funcs:
@@ -546,6 +576,8 @@ def generate_description(all_facts, cross_deps):
                 desc.append(f"  {icon} {filename}")
                 desc.append(f"     Role: {role_label} — {role_desc}")
                 desc.append(f"     Functions: {', '.join(funcs[:6])}")
+                if imported:
+                    desc.append(f"     Imports: {', '.join(imported[:4])}")
                 desc.append("")
 
     desc.append("ARCHITECTURE PATTERN")
@@ -594,8 +626,9 @@ def render_multi_language(all_facts, project_name="Project"):
         print(f"✗ Error: Expected dict, got {type(all_facts)}")
         return
 
-    mermaid_code = build_mermaid_multi_language(all_facts)
-    description  = generate_description(all_facts, {})
+    dependencies = build_dependency_graph(all_facts)
+    mermaid_code = build_mermaid_multi_language(all_facts, dependencies=dependencies)
+    description  = generate_description(all_facts, dependencies)
 
     print("=== MERMAID CODE ===")
     print(mermaid_code)
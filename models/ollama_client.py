@@ -0,0 +1,167 @@
+"""
+Ollama Client — pooled, streaming, time-bounded
+One shared HTTP session per process (keep-alive connection pool) for the
+local Ollama server, with connect/read timeouts plus an overall deadline
+per generation. Tokens are consumed as Ollama streams them, so callers can
+forward them as they arrive. AsyncOllamaClient is the asyncio variant.
+"""
+
+import json
+import os
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from models.env_config import env_float, env_int
+
+
+OLLAMA_URL   = os.getenv("HIRO_OLLAMA_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("HIRO_OLLAMA_MODEL", "llama3.2")
+
+# Seconds to open a connection / to wait for the next streamed chunk /
+# for a whole generation
+CONNECT_TIMEOUT  = env_float("HIRO_OLLAMA_CONNECT_TIMEOUT", 5.0, above=0)
+READ_TIMEOUT     = env_float("HIRO_OLLAMA_READ_TIMEOUT", 60.0, above=0)
+GENERATE_TIMEOUT = env_float("HIRO_OLLAMA_GENERATE_TIMEOUT", 300.0, above=0)
+
+# Keep-alive connections kept open to the Ollama server
+POOL_SIZE = env_int("HIRO_OLLAMA_POOL_SIZE", 8, minimum=1)
+
+
+class OllamaError(RuntimeError):
+    """Ollama could not be reached, answered with an error, or ran too long."""
+
+
+def _chunk_text(line, started, deadline):
+    """Decode one streamed NDJSON line. Returns (text, done)."""
+    if time.monotonic() - started > deadline:
+        raise OllamaError(f"Ollama generation exceeded {deadline:.0f}s")
+    try:
+        chunk = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise OllamaError(f"Malformed Ollama stream chunk: {line[:80]!r}") from e
+    if "error" in chunk:
+        raise OllamaError(f"Ollama error: {chunk['error']}")
+    return chunk.get("response", ""), chunk.get("done", False)
+
+
+class OllamaClient:
+    """Thread-safe; share one instance (see get_client)."""
+
+    def __init__(self, base_url=OLLAMA_URL, model=OLLAMA_MODEL,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 generate_timeout=GENERATE_TIMEOUT, pool_size=POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.model    = model
+        self.timeout  = (connect_timeout, read_timeout)
+        self.generate_timeout = generate_timeout
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def stream_generate(self, prompt, model=None):
+        """Yield the completion's text pieces as Ollama produces them."""
+        started  = time.monotonic()
+        finished = False
+        try:
+            with self._session.post(
+                f"{self.base_url}/api/generate",
+                json={"model": model or self.model, "prompt": prompt, "stream": True},
+                stream=True,
+                timeout=self.timeout,
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line or finished:
+                        continue
+                    text, done = _chunk_text(line, started, self.generate_timeout)
+                    if text:
+                        yield text
+                    # Read on to the end of the body even after "done", so
+                    # the connection goes back to the pool instead of closing
+                    if done:
+                        finished = True
+        except requests.RequestException as e:
+            raise OllamaError(f"Ollama request failed: {e}") from e
+
+    def generate(self, prompt, model=None, on_token=None):
+        """Whole completion text. on_token(text) is called for every piece."""
+        pieces = []
+        for text in self.stream_generate(prompt, model=model):
+            pieces.append(text)
+            if on_token:
+                on_token(text)
+        return "".join(pieces)
+
+    def close(self):
+        self._session.close()
+
+
+class AsyncOllamaClient:
+    """asyncio variant over one pooled httpx.AsyncClient."""
+
+    def __init__(self, base_url=OLLAMA_URL, model=OLLAMA_MODEL,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 generate_timeout=GENERATE_TIMEOUT, pool_size=POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.model    = model
+        self.generate_timeout = generate_timeout
+        self._client  = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size,
+                                max_keepalive_connections=pool_size),
+        )
+
+    async def stream_generate(self, prompt, model=None):
+        """Async-iterate the completion's text pieces as Ollama produces them."""
+        started  = time.monotonic()
+        finished = False
+        try:
+            async with self._client.stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json={"model": model or self.model, "prompt": prompt, "stream": True},
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line or finished:
+                        continue
+                    text, done = _chunk_text(line, started, self.generate_timeout)
+                    if text:
+                        yield text
+                    # Read on to the end of the body even after "done", so
+                    # the connection goes back to the pool instead of closing
+                    if done:
+                        finished = True
+        except httpx.HTTPError as e:
+            raise OllamaError(f"Ollama request failed: {e}") from e
+
+    async def generate(self, prompt, model=None, on_token=None):
+        pieces = []
+        async for text in self.stream_generate(prompt, model=model):
+            pieces.append(text)
+            if on_token:
+                on_token(text)
+        return "".join(pieces)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+_client      = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide OllamaClient, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+    return _client
@@ -1,9 +1,10 @@
-import requests
 import json
 import ast
 import sys
 from pathlib import Path
 
+from models.ollama_client import AsyncOllamaClient, get_client
+
 
 def read_file(filepath):
     """Read a .py file and return its contents as a string."""
@@ -36,19 +37,29 @@ def extract_with_ast(code):
         if isinstance(node, ast.ClassDef)
     ]
 
-    method_names = set()
+    # Index built once: class name → its methods, and method name → the
+    # classes defining it (in class order), so self.x.method lookups are O(1)
+    class_methods = {}
     for node in ast.walk(tree):
         if isinstance(node, ast.ClassDef):
+            methods_of_class = class_methods.setdefault(node.name, set())
             for item in node.body:
                 if isinstance(item, ast.FunctionDef):
-                    method_names.add(item.name)
+                    methods_of_class.add(item.name)
+
+    method_owners = {}
+    for class_name, methods_of_class in class_methods.items():
+        for method_name in methods_of_class:
+            method_owners.setdefault(method_name, []).append(class_name)
+
+    method_names = set(method_owners)
 
     # Collecting all top level function names first
-    all_function_names = []
+    all_function_names = set()
     for node in ast.walk(tree):
         if isinstance(node, ast.FunctionDef):
             if node.name not in method_names and node.name != "__init__":
-                all_function_names.append(node.name)
+                all_function_names.add(node.name)
 
     for node in ast.walk(tree):
 
@@ -84,18 +95,9 @@ def extract_with_ast(code):
                                 if isinstance(sub_node.value.value, ast.Name):
                                     if sub_node.value.value.id == "self":
                                         method_called = sub_node.attr
-                                        for other_cls in all_class_names:
-                                            if other_cls == node.name:
-                                                continue
-                                            for other_node in ast.walk(tree):
-                                                if isinstance(other_node, ast.ClassDef):
-                                                    if other_node.name == other_cls:
-                                                        other_methods = [
-                                                            i.name for i in other_node.body
-                                                            if isinstance(i, ast.FunctionDef)
-                                                        ]
-                                                        if method_called in other_methods:
-                                                            dependencies.add(other_cls)
+                                        for other_cls in method_owners.get(method_called, ()):
+                                            if other_cls != node.name:
+                                                dependencies.add(other_cls)
 
             facts["classes"].append({
                 "name": node.name,
@@ -223,10 +225,10 @@ def extract_with_ai(facts):
     return {"nodes": nodes, "edges": edges}
 
 
-def generate_description(facts, diagram_data):
+def build_description_prompt(facts):
     """
-    Uses Ollama to generate a plain English description
-    of the codebase based on extracted facts.
+    The Ollama prompt describing a file's classes (or functions),
+    or None when there is nothing to describe.
     """
     class_summary = []
 
@@ -242,9 +244,9 @@ def generate_description(facts, diagram_data):
         subject = "functions"
 
     if not class_summary:
-        return "No analyzable structure found."
+        return None
 
-    prompt = f"""
+    return f"""
 You are an expert software architect reviewing a codebase.
 Based on these {subject}, write a clean plain English description.
 
@@ -265,16 +267,50 @@ Architecture Pattern:
 Keep it concise and professional. No markdown. No extra text.
 """
 
-    response = requests.post(
-        "http://localhost:11434/api/generate",
-        json={
-            "model": "llama3.2",
-            "prompt": prompt,
-            "stream": False
-        }
-    )
 
-    return response.json()["response"].strip()
+NO_STRUCTURE_DESCRIPTION = "No analyzable structure found."
+
+
+def generate_description(facts, diagram_data, on_token=None):
+    """
+    Uses Ollama to generate a plain English description
+    of the codebase based on extracted facts.
+    on_token(text) receives the description piece by piece as it streams in.
+    """
+    prompt = build_description_prompt(facts)
+    if prompt is None:
+        return NO_STRUCTURE_DESCRIPTION
+
+    return get_client().generate(prompt, on_token=on_token).strip()
+
+
+def stream_description(facts, diagram_data):
+    """Yields the description piece by piece as Ollama generates it."""
+    prompt = build_description_prompt(facts)
+    if prompt is None:
+        yield NO_STRUCTURE_DESCRIPTION
+        return
+
+    yield from get_client().stream_generate(prompt)
+
+
+async def generate_description_async(facts, diagram_data, client=None, on_token=None):
+    """
+    generate_description for asyncio callers. Pass a long-lived
+    AsyncOllamaClient to reuse its connections across calls.
+    """
+    prompt = build_description_prompt(facts)
+    if prompt is None:
+        return NO_STRUCTURE_DESCRIPTION
+
+    if client is not None:
+        return (await client.generate(prompt, on_token=on_token)).strip()
+
+    client = AsyncOllamaClient()
+    try:
+        return (await client.generate(prompt, on_token=on_token)).strip()
+    finally:
+        await client.aclose()
 
 
 def parse_file(filepath):
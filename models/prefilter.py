@@ -0,0 +1,108 @@
+"""
+Pre-filter — byte-level scan for files with nothing to extract
+Constant tables, fixtures and re-export shims produce empty facts but
+still cost a full tree-sitter parse and extractor run. Every extractor
+fact starts at a keyword (class, def, function, import, =>, ...), so a
+file where none of its language's keywords occur cannot yield any facts
+and skips the parse. The scan is one regex search over a memoryview of
+the file's bytes (or of its mmap).
+"""
+
+import re
+import time
+
+
+# A superset of what each extractor can turn into a fact: matching a
+# keyword in a comment or string only means the file gets parsed.
+# (whole-word keywords, other patterns)
+_SCRIPT_WORDS  = [b'function', b'class', b'import', b'require']
+_SCRIPT_OTHERS = [rb'=>', rb'\buse[A-Z]', rb'module\.exports']
+
+FACT_KEYWORDS = {
+    'python':     ([b'class', b'def', b'import'], []),
+    'java':       ([b'class', b'interface', b'import'], []),
+    'javascript': (_SCRIPT_WORDS, _SCRIPT_OTHERS),
+    'typescript': (_SCRIPT_WORDS + [b'interface', b'type', b'enum'], _SCRIPT_OTHERS),
+}
+FACT_KEYWORDS['tsx'] = FACT_KEYWORDS['typescript']
+
+
+def _compile(words, others):
+    """
+    (candidates, exact): a flat alternation without word boundaries, which
+    re scans several times faster, and the exact pattern, only tried where
+    a candidate starts.
+    """
+    candidates = b'|'.join(words + [other.replace(rb'\b', b'') for other in others])
+    exact = b'|'.join([rb'\b(?:' + b'|'.join(words) + rb')\b'] + others)
+    return re.compile(candidates), re.compile(exact)
+
+
+_PATTERNS = {language: _compile(*keywords) for language, keywords in FACT_KEYWORDS.items()}
+
+
+class ScanCounters:
+    """
+    Pre-filter counts of one parse run. Every run keeps its own, so runs
+    on concurrent threads never count each other's files; worker
+    processes return theirs with each chunk, like the facts cache counts.
+    """
+
+    __slots__ = ('scanned', 'skipped', 'skipped_bytes', 'scan_seconds',
+                 'parsed', 'parsed_bytes', 'parse_seconds')
+
+    def __init__(self):
+        for key in self.__slots__:
+            setattr(self, key, 0)
+
+    def add(self, other):
+        for key in self.__slots__:
+            setattr(self, key, getattr(self, key) + getattr(other, key))
+
+    def stats(self):
+        """
+        The run's pre-filter statistics as a dict. The time saved is an
+        estimate: the skipped bytes at the run's average parse cost per
+        byte, minus the time spent scanning.
+        """
+        stats = {key: getattr(self, key) for key in self.__slots__}
+        per_byte = stats['parse_seconds'] / stats['parsed_bytes'] if stats['parsed_bytes'] else 0.0
+        stats['skip_rate'] = stats['skipped'] / stats['scanned'] if stats['scanned'] else 0.0
+        stats['seconds_saved'] = max(stats['skipped_bytes'] * per_byte - stats['scan_seconds'], 0.0)
+        return stats
+
+
+def may_have_facts(code, language, counters=None):
+    """
+    False only when the file cannot produce any facts for its language.
+    counters, a ScanCounters, counts the scan.
+    """
+    patterns = _PATTERNS.get(language)
+    if patterns is None:
+        return True
+    candidates, keywords = patterns
+
+    started = time.perf_counter()
+    found   = False
+    with memoryview(code) as view:
+        hit = candidates.search(view)
+        while hit is not None:
+            # match() at a position still sees the byte before it for \b
+            if keywords.match(view, hit.start()):
+                found = True
+                break
+            hit = candidates.search(view, hit.start() + 1)
+    if counters is not None:
+        counters.scan_seconds += time.perf_counter() - started
+        counters.scanned += 1
+        if not found:
+            counters.skipped += 1
+            counters.skipped_bytes += len(code)
+    return found
+
+
+def record_parse(size, seconds, counters):
+    """Counts one file that was scanned and then parsed."""
+    counters.parsed += 1
+    counters.parsed_bytes += size
+    counters.parse_seconds += seconds
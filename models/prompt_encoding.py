@@ -0,0 +1,137 @@
+"""
+Prompt Encoding — the codebase summary as the model reads it
+json.dumps(summary, indent=2) spends most of its tokens on indentation,
+quotes, the same keys repeated for every file and empty lists. The
+compact encoding writes one line per file and per class, names each
+field once per line, leaves empty fields out and lists files under a
+directory tree, so a directory's path is written once for all its files:
+
+    ## javascript
+    src/
+      server.js | functions: start | requires: ./lib/db | depends_on: db.js
+      lib/
+        db.js | functions: connect
+    ## java
+    com/acme/service/
+      UserService.java
+        class UserService (class) @Service | methods: findAll | dependencies: UserRepo
+
+HIRO_PROMPT_ENCODING=json always sends the indented JSON instead.
+"""
+
+import json
+import os
+
+from models.token_budget import estimate_tokens
+
+
+ENCODING = os.getenv("HIRO_PROMPT_ENCODING", "compact")
+
+LEGEND = (
+    "Format: \"## language\" sections; lines ending in \"/\" are directories (nested by "
+    "indentation) holding the files indented below them. File line: name | field: a, b | ...; "
+    "indented \"class Name (type) @annotations | ...\" lines are its classes; "
+    "calls: caller -> callee; cross_file_calls: caller -> callee (file); "
+    "imports omits modules already in requires."
+)
+
+
+def _format(value):
+    if isinstance(value, dict):
+        if {"from", "to"} <= value.keys():
+            # One call: caller -> receiver.callee (file)
+            target = value["to"]
+            if value.get("receiver"):
+                target = f"{value['receiver']}.{target}"
+            call = f"{value['from']} -> {target}"
+            return f"{call} ({value['file']})" if value.get("file") else call
+        return "; ".join(f"{key}={_format(item)}" for key, item in value.items() if item)
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_format(item) for item in value)
+    return str(value)
+
+
+def _fields(record, skip):
+    return [f"{key}: {_format(value)}"
+            for key, value in record.items()
+            if key not in skip and value]
+
+
+def _file_lines(file_summary, indent):
+    # Script files list most modules under both requires and imports
+    requires = set(file_summary.get("requires", []))
+    if requires and file_summary.get("imports"):
+        file_summary = dict(file_summary, imports=[
+            spec for spec in file_summary["imports"] if spec not in requires
+        ])
+    lines = [indent + " | ".join(
+        [str(file_summary.get("filename", "unknown"))]
+        + _fields(file_summary, ("filename", "dir", "classes"))
+    )]
+    for cls in file_summary.get("classes", []):
+        head = f"class {cls.get('name')} ({cls.get('type', 'class')})"
+        annotations = " ".join("@" + str(a) for a in cls.get("annotations", []))
+        if annotations:
+            head += " " + annotations
+        lines.append(indent + "  " + " | ".join(
+            [head] + _fields(cls, ("name", "type", "annotations"))
+        ))
+    return lines
+
+
+def encode_summary(summary):
+    """The compact text encoding of a build_facts_summary() summary."""
+    lines = []
+    for language, files in summary.items():
+        lines.append(f"## {language}")
+
+        by_dir = {}   # directory parts → files, directories in first-seen order
+        for file_summary in files:
+            directory = file_summary.get("dir", "")
+            by_dir.setdefault(tuple(p for p in directory.split("/") if p), []).append(file_summary)
+
+        # Sorted, a directory comes right after its parent: print each one
+        # relative to the deepest directory above it still on the stack
+        stack = []
+        for parts in sorted(by_dir):
+            while stack and parts[:len(stack[-1])] != stack[-1]:
+                stack.pop()
+            below = parts[len(stack[-1]):] if stack else parts
+            if below:
+                lines.append("  " * len(stack) + "/".join(below) + "/")
+                stack.append(parts)
+            indent = "  " * len(stack)
+            for file_summary in by_dir[parts]:
+                lines.extend(_file_lines(file_summary, indent))
+    return "\n".join(lines)
+
+
+def render_summary(summary):
+    """
+    The summary as it goes into the prompt, in the configured encoding.
+    A summary of a few files is smaller as JSON than with the legend, and
+    goes as JSON.
+    """
+    return render_with_stats(summary)[0]
+
+
+def render_with_stats(summary):
+    """
+    (render_summary(summary), stats), rendering the summary once. stats
+    are the estimated tokens of the rendered summary against the indented
+    JSON.
+    """
+    as_json     = json.dumps(summary, indent=2)
+    json_tokens = estimate_tokens(as_json)
+    rendered, tokens = as_json, json_tokens
+    if ENCODING != "json":
+        compact = f"{LEGEND}\n\n{encode_summary(summary)}"
+        compact_tokens = estimate_tokens(compact)
+        if compact_tokens < json_tokens:
+            rendered, tokens = compact, compact_tokens
+    return rendered, {
+        "encoding":    "json" if rendered is as_json else "compact",
+        "tokens":      tokens,
+        "json_tokens": json_tokens,
+        "saved":       json_tokens - tokens,
+    }
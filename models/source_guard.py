@@ -0,0 +1,94 @@
+"""
+Source Guard — large-file and generated-code checks before parsing
+Bundles, minified builds, compiler output and generated code carry no
+architecture but cost the most to parse. Every file is checked before
+tree-sitter sees it:
+  - size above HIRO_MAX_FILE_KB
+  - a "generated" banner in the comments a file starts with (@generated,
+    DO NOT EDIT, "Generated by ...")
+  - mostly very long lines (minified / bundled code)
+  - a trailing sourceMappingURL comment (compiled output)
+Files that fail raise SkippedFile. Files that pass and are at least
+HIRO_MMAP_FILE_KB are memory-mapped instead of read into a bytes copy.
+"""
+
+import mmap
+import os
+import re
+
+from models.env_config import env_int
+
+
+MAX_FILE_BYTES  = env_int("HIRO_MAX_FILE_KB", 1024, minimum=1) * 1024
+MMAP_MIN_BYTES  = env_int("HIRO_MMAP_FILE_KB", 256, minimum=0) * 1024
+MAX_LINE_LENGTH = env_int("HIRO_MAX_LINE_LENGTH", 1000, minimum=1)
+
+# Bytes sampled from the start / end of a file by the content checks
+HEAD_BYTES   = 64 * 1024
+TAIL_BYTES   = 512
+BANNER_LINES = 20
+
+# A file is minified when lines longer than MAX_LINE_LENGTH hold at least
+# this share of the sampled bytes
+LONG_LINE_SHARE = 0.5
+
+# The comment and blank lines a file starts with, and the banners
+# generators put there
+LEADING_COMMENTS = re.compile(rb'\A(?:[ \t]*(?:(?:#|//|/\*|\*|<!--)[^\n]*)?\n){0,%d}' % BANNER_LINES)
+GENERATED_BANNER = re.compile(
+    rb'@generated|do not edit|'
+    rb'^[ \t]*(?:#|//|/\*|\*|<!--)[ \t]*(?:auto-?generated|generated by)|'
+    rb'(?:code|file) (?:is |was )?(?:auto-?|automatically )?generated',
+    re.IGNORECASE | re.MULTILINE,
+)
+SOURCE_MAP_COMMENT = re.compile(rb'^[ \t]*//[#@][ \t]*sourceMappingURL=', re.MULTILINE)
+LONG_LINE = re.compile(rb'[^\n]{%d,}' % (MAX_LINE_LENGTH + 1))
+
+
+class SkippedFile(ValueError):
+    """A file the guard keeps away from the parser. str() is the reason."""
+
+
+def check_size(filepath):
+    """The file's size in bytes. Raises SkippedFile above MAX_FILE_BYTES."""
+    size = os.path.getsize(filepath)
+    if size > MAX_FILE_BYTES:
+        raise SkippedFile(f"too large ({size // 1024} KB, limit {MAX_FILE_BYTES // 1024} KB)")
+    return size
+
+
+def check_source(code):
+    """Raises SkippedFile when the content looks generated, minified or compiled."""
+    head = code[:HEAD_BYTES]
+
+    leading = LEADING_COMMENTS.match(head).group()
+    if GENERATED_BANNER.search(leading):
+        raise SkippedFile("generated code (banner comment)")
+
+    long_bytes = sum(len(line) for line in LONG_LINE.findall(head))
+    if head and long_bytes >= len(head) * LONG_LINE_SHARE:
+        raise SkippedFile(f"minified or bundled (lines over {MAX_LINE_LENGTH} characters)")
+
+    if SOURCE_MAP_COMMENT.search(code[-TAIL_BYTES:]):
+        raise SkippedFile("compiled output (sourceMappingURL comment)")
+
+
+def load_source(filepath):
+    """
+    The file's content after the guard's checks: bytes, or a read-only mmap
+    for files of at least MMAP_MIN_BYTES. Both slice to bytes, which is all
+    the extractors need. Raises SkippedFile.
+    """
+    size = check_size(filepath)
+    with open(filepath, 'rb') as f:
+        if size and size >= MMAP_MIN_BYTES:
+            code = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            code = f.read()
+    try:
+        check_source(code)
+    except SkippedFile:
+        if isinstance(code, mmap.mmap):
+            code.close()
+        raise
+    return code
@@ -0,0 +1,193 @@
+"""
+Project Symbol Table
+Built once per analysis from every file's facts. Maps each class,
+interface, function, method, React component and Spring bean name to the
+files defining it, so cross-file questions ("which file defines the
+function this call goes to?") are dict lookups instead of scans.
+"""
+
+import sys
+from pathlib import Path
+
+
+# Languages whose files can call each other's functions
+LANGUAGE_FAMILIES = {
+    'python':     'python',
+    'java':       'java',
+    'javascript': 'script',
+    'typescript': 'script',
+    'tsx':        'script',
+}
+
+# Java class types (from the extractor's annotation detection) that Spring
+# instantiates and injects
+BEAN_TYPES = {'controller', 'service', 'repository'}
+
+SYMBOL_KINDS = ('class', 'interface', 'function', 'method', 'component', 'bean')
+
+
+class SymbolTable:
+    """
+    Every symbol is a dict: name, kind, language, file (full path when
+    known), filename, and owner (the class) for methods.
+    """
+
+    def __init__(self):
+        self._by_name = {}                                # name → [symbol]
+        self._by_kind = {kind: {} for kind in SYMBOL_KINDS}  # kind → name → [symbol]
+        self._size    = 0
+
+    def add(self, name, kind, file, language, owner=None):
+        if kind not in self._by_kind:
+            raise ValueError(f"Unknown symbol kind: {kind}")
+        # Interned: the same names and filenames recur across many symbols
+        symbol = {
+            'name':     sys.intern(name),
+            'kind':     kind,
+            'language': language,
+            'file':     str(file),
+            'filename': sys.intern(Path(str(file)).name),
+        }
+        if owner is not None:
+            symbol['owner'] = owner
+        self._by_name.setdefault(name, []).append(symbol)
+        self._by_kind[kind].setdefault(name, []).append(symbol)
+        self._size += 1
+        return symbol
+
+    def add_facts(self, facts, language):
+        """Adds every symbol one file defines. Files can be added as they are parsed."""
+        if not isinstance(facts, dict):
+            return
+        file       = facts_file(facts)
+        interfaces = set(facts.get('interfaces', []))
+
+        for cls in facts.get('classes', []):
+            if not isinstance(cls, dict) or not cls.get('name'):
+                continue
+            name = cls['name']
+            kind = 'interface' if name in interfaces else 'class'
+            self.add(name, kind, file, language)
+            interfaces.discard(name)
+
+            for method in cls.get('methods', []):
+                self.add(method, 'method', file, language, owner=name)
+
+            if language == 'java' and cls.get('type') in BEAN_TYPES:
+                self.add(name, 'bean', file, language)
+
+        # Interfaces the extractor does not list as classes (TypeScript)
+        for name in facts.get('interfaces', []):
+            if name in interfaces:
+                self.add(name, 'interface', file, language)
+
+        for name in facts.get('functions', []):
+            self.add(name, 'function', file, language)
+
+        for component in facts.get('components', []):
+            if isinstance(component, dict) and component.get('name'):
+                self.add(component['name'], 'component', file, language)
+
+    def lookup(self, name, kind=None):
+        """All symbols with this name (of one kind, if given)."""
+        if kind is None:
+            return list(self._by_name.get(name, ()))
+        return list(self._by_kind[kind].get(name, ()))
+
+    def defines(self, name, kind=None):
+        if kind is None:
+            return name in self._by_name
+        return name in self._by_kind[kind]
+
+    def names(self, kind):
+        """Set-like view of every name of one kind."""
+        return self._by_kind[kind].keys()
+
+    def count(self, kind=None):
+        """Number of definitions (of one kind, if given)."""
+        if kind is None:
+            return self._size
+        return sum(len(symbols) for symbols in self._by_kind[kind].values())
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __len__(self):
+        return self._size
+
+    def resolve_call(self, call, from_file, language, imported=None):
+        """
+        The function symbol an external call from `from_file` lands on, or
+        None. imported lists the project files `from_file` imports (the
+        dependency graph's entry for it).
+
+          helper()        the single file among the imported ones defining
+                          helper; without such a file, the single definition
+                          in any other file of the same language family
+          utils.helper()  helper in the imported file the receiver names
+                          (utils.py, utils/__init__.py, utils.js, utils/index.js);
+                          receivers that name no imported file (requests,
+                          self.session, this.api) never resolve
+        """
+        family = LANGUAGE_FAMILIES.get(language, language)
+        definers = {}
+        for symbol in self._by_kind['function'].get(call['to'], ()):
+            if symbol['file'] == from_file:
+                continue
+            if LANGUAGE_FAMILIES.get(symbol['language'], symbol['language']) != family:
+                continue
+            definers.setdefault(symbol['file'], symbol)
+
+        receiver = call.get('receiver')
+        if receiver is not None:
+            module  = receiver.split('.')[-1]
+            targets = [f for f in imported or () if _module_name(f) == module and f in definers]
+            return definers[targets[0]] if len(targets) == 1 else None
+
+        from_imports = [f for f in imported or () if f in definers]
+        if from_imports:
+            return definers[from_imports[0]] if len(from_imports) == 1 else None
+        return next(iter(definers.values())) if len(definers) == 1 else None
+
+    def resolve_calls(self, facts, dependencies=None):
+        """
+        Cross-file calls of one file: every external call that resolves to
+        a function in another project file, as {from, to, file, filename};
+        `to` keeps the receiver (utils.helper). dependencies is the
+        analysis' file-level dependency graph.
+        """
+        from_file = facts_file(facts)
+        language  = facts.get('language')
+        imported  = dependencies.get(from_file) if dependencies is not None else None
+        resolved  = []
+        for call in facts.get('external_calls', []):
+            symbol = self.resolve_call(call, from_file, language, imported)
+            if symbol is not None:
+                receiver = call.get('receiver')
+                resolved.append({
+                    'from':     call['from'],
+                    'to':       f"{receiver}.{call['to']}" if receiver else call['to'],
+                    'file':     symbol['file'],
+                    'filename': symbol['filename'],
+                })
+        return resolved
+
+
+def _module_name(file):
+    """The name a file is imported under: its stem, or its directory's for __init__ / index files."""
+    path = Path(file)
+    return path.parent.name if path.stem in ('__init__', 'index') else path.stem
+
+
+def facts_file(facts):
+    """The key identifying a facts' file: its path, or its name without one."""
+    return str(facts.get('filepath') or facts.get('filename', 'unknown'))
+
+
+def build_symbol_table(all_facts):
+    """Symbol table of a whole analysis: {language: [facts, ...]}."""
+    symbols = SymbolTable()
+    for language, facts_list in all_facts.items():
+        for facts in facts_list:
+            symbols.add_facts(facts, language)
+    return symbols
@@ -0,0 +1,140 @@
+"""
+Token Budget — sizes a Groq call before it is made
+Estimates the prompt's tokens locally and the diagram's tokens from the
+summary's files and classes, then picks the most detailed summary whose
+prompt plus expected output fits the model's limits, and the max_tokens
+to ask for. The estimator is a regex approximation of a BPE tokenizer
+(words split into pieces of up to 8 letters, numbers into groups of 3,
+each whitespace run and punctuation mark one token); it errs high, and
+the tokens Groq reports are kept on the plan next to the estimate.
+
+Limits:
+  HIRO_CONTEXT_TOKENS     model context window (prompt + output)
+  HIRO_MAX_OUTPUT_TOKENS  model cap on completion tokens
+  HIRO_REQUEST_TOKENS     tokens one request may use, e.g. an account's
+                          tokens-per-minute limit (defaults to the context)
+"""
+
+import math
+import re
+
+from models.env_config import env_int
+
+
+MIN_OUTPUT_TOKENS = 2000
+CONTEXT_TOKENS    = env_int("HIRO_CONTEXT_TOKENS", 131072, minimum=MIN_OUTPUT_TOKENS)
+MAX_OUTPUT_LIMIT  = env_int("HIRO_MAX_OUTPUT_TOKENS", 32768, minimum=MIN_OUTPUT_TOKENS)
+REQUEST_TOKENS    = min(env_int("HIRO_REQUEST_TOKENS", CONTEXT_TOKENS, minimum=MIN_OUTPUT_TOKENS),
+                        CONTEXT_TOKENS)
+
+PROMPT_MARGIN   = 1.1   # prompt estimate × this, for the estimator's error
+OUTPUT_HEADROOM = 1.3   # max_tokens = expected output × this, in steps of 1000
+
+# Expected output: every file and class is a node with a component entry,
+# plus the inferred infrastructure nodes, ~1.5 edges per node and the
+# overview / pattern text
+NODE_TOKENS      = 55
+COMPONENT_TOKENS = 40
+EDGE_TOKENS      = 22
+EDGES_PER_NODE   = 1.5
+INFERRED_NODES   = 6
+FIXED_TOKENS     = 450
+
+# Summary detail levels tried in order: (aggressive, files per language)
+DETAIL_LEVELS = [(False, 30), (False, 20), (True, 20), (True, 10)]
+
+TOKEN_PIECES = re.compile(r"[A-Za-z]{1,8}|\d{1,3}|\s+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text):
+    return len(TOKEN_PIECES.findall(text))
+
+
+def estimate_output_tokens(summary):
+    """Tokens of the architecture JSON the model writes for a summary."""
+    nodes = INFERRED_NODES
+    for files in summary.values():
+        for file_summary in files:
+            # A file with one class is usually drawn as one node
+            nodes += max(1, len(file_summary.get("classes", [])))
+    edges = math.ceil(nodes * EDGES_PER_NODE)
+    return FIXED_TOKENS + nodes * (NODE_TOKENS + COMPONENT_TOKENS) + edges * EDGE_TOKENS
+
+
+class TokenPlan:
+    """The detail level, file cap and output budget chosen for one call."""
+
+    def __init__(self, aggressive, file_cap, files, prompt_tokens, output_tokens, max_tokens, fits):
+        self.aggressive    = aggressive
+        self.file_cap      = file_cap
+        self.files         = files
+        self.prompt_tokens = prompt_tokens   # estimated, margin included
+        self.output_tokens = output_tokens   # estimated
+        self.max_tokens    = max_tokens
+        self.fits          = fits
+        # Filled in by the call: the summary's encoding, the response's usage
+        self.encoding             = None
+        self.actual_prompt_tokens = None
+        self.actual_output_tokens = None
+        self.finish_reason        = None
+
+    @property
+    def detail(self):
+        return "aggressive" if self.aggressive else "normal"
+
+    def retry_max_tokens(self):
+        """The doubled output budget for a retry, within the limits."""
+        return min(self.max_tokens * 2, MAX_OUTPUT_LIMIT, REQUEST_TOKENS - self.prompt_tokens)
+
+    def record_usage(self, usage, finish_reason=None):
+        if usage is not None:
+            self.actual_prompt_tokens = getattr(usage, "prompt_tokens", None)
+            self.actual_output_tokens = getattr(usage, "completion_tokens", None)
+        self.finish_reason = finish_reason
+
+    def describe(self):
+        fits = "" if self.fits else " — over budget, smallest summary used"
+        return (f"{self.detail} summary, {self.file_cap} files/language ({self.files} files), "
+                f"~{self.prompt_tokens} prompt + ~{self.output_tokens} output tokens, "
+                f"max_tokens={self.max_tokens}{fits}")
+
+    def as_dict(self):
+        return {
+            "detail":               self.detail,
+            "file_cap":             self.file_cap,
+            "files":                self.files,
+            "prompt_tokens":        self.prompt_tokens,
+            "output_tokens":        self.output_tokens,
+            "max_tokens":           self.max_tokens,
+            "fits":                 self.fits,
+            "request_tokens":       REQUEST_TOKENS,
+            "actual_prompt_tokens": self.actual_prompt_tokens,
+            "actual_output_tokens": self.actual_output_tokens,
+            "finish_reason":        self.finish_reason,
+            "encoding":             self.encoding,
+        }
+
+
+def plan_tokens(summarize, render_prompt, levels=DETAIL_LEVELS):
+    """
+    (plan, summary) for the most detailed level that fits.
+      summarize(aggressive, file_cap) → the summary at that level
+      render_prompt(summary)          → the full prompt text sent for it
+    When no level fits, the last (smallest) one is returned with the
+    largest output budget left, and plan.fits is False.
+    """
+    plan = summary = None
+    for aggressive, file_cap in levels:
+        summary = summarize(aggressive, file_cap)
+        prompt_tokens = math.ceil(estimate_tokens(render_prompt(summary)) * PROMPT_MARGIN)
+        output_tokens = estimate_output_tokens(summary)
+        available     = min(REQUEST_TOKENS - prompt_tokens, MAX_OUTPUT_LIMIT)
+
+        wanted     = math.ceil(output_tokens * OUTPUT_HEADROOM / 1000) * 1000
+        max_tokens = max(MIN_OUTPUT_TOKENS, min(wanted, available))
+        fits       = output_tokens <= available
+        plan = TokenPlan(aggressive, file_cap, sum(len(files) for files in summary.values()),
+                         prompt_tokens, output_tokens, max_tokens, fits)
+        if fits:
+            break
+    return plan, summary
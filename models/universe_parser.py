@@ -11,6 +11,10 @@ import tree_sitter_typescript as ts_typescript
 import tree_sitter_html as ts_html
 import tree_sitter_css as ts_css
 from pathlib import Path
+import mmap
+import threading
+
+from models.source_guard import load_source
 
 
 # Initialize language objects using the new API
@@ -32,6 +36,29 @@ LANGUAGES = {
     'css': CSS_LANGUAGE
 }
 
+# Memory-mapped files are handed to tree-sitter in pieces of this size
+READ_CHUNK_BYTES = 64 * 1024
+
+# Parsers are reused instead of being rebuilt for every file. A Parser must
+# not be shared between threads, and FastAPI runs the sync /analyze handlers
+# on a thread pool, so each thread keeps its own set keyed by language.
+# Worker processes start with fresh module state, so they get their own too.
+_parser_pool = threading.local()
+
+
+def get_parser(language):
+    """
+    Return this thread's Parser for a language, creating it on first use.
+    """
+    parsers = getattr(_parser_pool, 'parsers', None)
+    if parsers is None:
+        parsers = _parser_pool.parsers = {}
+
+    parser = parsers.get(language)
+    if parser is None:
+        parser = parsers[language] = Parser(LANGUAGES[language])
+    return parser
+
 
 def detect_language(filepath):
     """
@@ -56,11 +83,14 @@ def detect_language(filepath):
     return extension_map.get(ext, 'unknown')
 
 
-def parse_file_universal(filepath):
+def parse_file_universal(filepath, code=None):
     """
     Universal parser that works for ANY supported language.
+    Pass `code` when the file's bytes have already been read (bytes or a
+    read-only mmap). Otherwise the file is loaded through the source guard,
+    which raises SkippedFile for oversized or generated files.
     
-    Returns: (tree, language, code_bytes)
+    Returns: (tree, language, code) — code slices to bytes either way
     """
     # Detect language
     language = detect_language(filepath)
@@ -68,22 +98,34 @@ def parse_file_universal(filepath):
     if language == 'unknown':
         raise ValueError(f"Unsupported file type: {filepath}")
     
-    # Read file as bytes (tree-sitter requires bytes)
-    with open(filepath, 'rb') as f:
-        code = f.read()
-    
-    # Get the language object
-    lang_obj = LANGUAGES[language]
+    if code is None:
+        code = load_source(filepath)
     
-    # Create parser with the new API
-    parser = Parser(lang_obj)
+    # Reuse this thread's parser for the language
+    parser = get_parser(language)
     
-    # Parse code
-    tree = parser.parse(code)
+    # Parse code — a mapped file is read through a callback, never copied whole
+    if isinstance(code, mmap.mmap):
+        tree = parser.parse(lambda offset, _: code[offset:offset + READ_CHUNK_BYTES])
+    else:
+        tree = parser.parse(code)
     
     return tree, language, code
 
 
+def iter_children(node):
+    """
+    Yield a node's direct children through a TreeCursor, without building
+    the node.children list.
+    """
+    cursor = node.walk()
+    if not cursor.goto_first_child():
+        return
+    yield cursor.node
+    while cursor.goto_next_sibling():
+        yield cursor.node
+
+
 def get_node_text(node, code):
     """Extract text from a tree-sitter node."""
     return code[node.start_byte:node.end_byte].decode('utf-8', errors='ignore')
\ No newline at end of file